@@ -1,8 +1,7 @@
-from decimal import Decimal, getcontext
-getcontext().prec = 28
 from kernel.quota_methods import hare_quota, droop_quota, exact_droop_quota
 from kernel.divisor_methods import dhondt_divisor
-from kernel.lr_ties import lr_ties
+from kernel.lr_ties import lr_ties, derivar_semilla
+from kernel.topes import limites_partido, resolver_topes
 import numpy as np
 
 # Orquestador para la asignación de diputados (tipo asignadip_v2 de R)
@@ -35,6 +34,9 @@ def asignadip_v2(
     apply_caps: aplicar topes nacionales
     quota_method: 'hare', 'droop', 'droop_exact'
     divisor_method: 'dhondt'
+
+    Regresa además 'topes': tope por partido, partidos cuyo tope quedó
+    vinculante ('max_pp' o 'max_seats') y rondas de reparto usadas.
     """
     partidos = list(votos.keys())
     if S is None:
@@ -62,7 +64,7 @@ def asignadip_v2(
             # Usar lr_ties como en el código R
             votos_list = [votos_ok[p] for p in partidos]
             q = sum(votos_list) / m if m > 0 else None
-            s_rp_list = lr_ties(votos_list, m, q=q, seed=seed)
+            s_rp_list = lr_ties(votos_list, m, q=q, seed=derivar_semilla(seed, 0))
             s_rp = {partidos[i]: int(s_rp_list[i]) for i in range(len(partidos))}
         else:
             s_rp = {p: 0 for p in partidos}
@@ -76,7 +78,7 @@ def asignadip_v2(
             # Usar lr_ties para asignación inicial RP
             votos_list = [votos_ok[p] for p in partidos]
             q = sum(votos_list) / m if m > 0 else None
-            s_rp_list = lr_ties(votos_list, m, q=q, seed=seed)
+            s_rp_list = lr_ties(votos_list, m, q=q, seed=derivar_semilla(seed, 0))
             s_rp = {partidos[i]: int(s_rp_list[i]) for i in range(len(partidos))}
         else:
             s_rp = {p: 0 for p in partidos}
@@ -84,43 +86,28 @@ def asignadip_v2(
         s_tot = {p: s_mr[p] + s_rp[p] for p in partidos}
 
     # Topes nacionales solo si hay RP o mixto
+    topes = {'limite': {}, 'vinculantes': {}, 'rondas': 0}
     if apply_caps and (m > 0 or sum(ssd.values()) > 0):
         v_nacional = {p: votos_ok[p] / sum(votos_ok.values()) if sum(votos_ok.values()) > 0 else 0 for p in partidos}
-        lim_dist = {p: max(s_mr[p], int((v_nacional[p] + max_pp) * S)) for p in partidos}
-        lim_300 = {p: max_seats for p in partidos}
-        lim_max = {p: min(lim_dist[p], lim_300[p]) for p in partidos}
-        # Iterar para ajustar topes
-        iter_max = 16
-        for _ in range(iter_max):
-            over = [p for p in partidos if s_tot[p] > lim_max[p]]
-            if not over:
-                break
-            for p in over:
-                s_rp[p] = max(0, lim_max[p] - s_mr[p])
-            # Reasignar RP sobrantes
-            fixed = set(over)
-            v_eff = {p: v_nacional[p] if p not in fixed and ok[p] else 0 for p in partidos}
-            rp_fijos = sum(max(0, lim_max[p] - s_mr[p]) for p in fixed)
-            n_rest = m - rp_fijos
-            n_rest = max(0, int(n_rest))
-            if n_rest == 0 or sum(v_eff.values()) <= 0:
-                for p in partidos:
-                    if p not in fixed and ok[p]:
-                        s_rp[p] = 0
-            else:
-                # Reasignación usando lr_ties como en R
-                votos_eff_list = [v_eff[p] for p in partidos]
-                q_eff = sum(votos_eff_list) / n_rest if n_rest > 0 else None
-                s_rp_add_list = lr_ties(votos_eff_list, n_rest, q=q_eff, seed=seed)
-                
-                for i, p in enumerate(partidos):
-                    if p not in fixed and ok[p]:
-                        s_rp[p] = int(s_rp_add_list[i])
-                    elif p in fixed:
-                        s_rp[p] = max(0, lim_max[p] - s_mr[p])
-                    else:
-                        s_rp[p] = 0
-            s_tot = {p: s_mr[p] + s_rp[p] for p in partidos}
+        limite, tipo = limites_partido([v_nacional[p] for p in partidos], [s_mr[p] for p in partidos], S, max_pp, max_seats)
+        # Reparto acotado: los partidos que rebasan su tope quedan fijos en él
+        # y el resto de RP se reparte entre los demás (a lo más una ronda por partido)
+        rp_arr, vinculantes, rondas = resolver_topes(
+            [v_nacional[p] for p in partidos],
+            [s_mr[p] for p in partidos],
+            [s_rp[p] for p in partidos],
+            limite,
+            [ok[p] for p in partidos],
+            m,
+            seed=seed,
+        )
+        s_rp = {p: int(rp_arr[i]) for i, p in enumerate(partidos)}
+        s_tot = {p: s_mr[p] + s_rp[p] for p in partidos}
+        topes = {
+            'limite': {p: int(limite[i]) for i, p in enumerate(partidos)},
+            'vinculantes': {p: str(tipo[i]) for i, p in enumerate(partidos) if vinculantes[i]},
+            'rondas': rondas,
+        }
     # Salida
     if print_debug:
         print('MR:', s_mr)
@@ -163,5 +150,6 @@ def asignadip_v2(
         'tot': s_tot,
         'ok': ok,
         'votos': votos,
-        'votos_ok': votos_ok
+        'votos_ok': votos_ok,
+        'topes': topes
     }
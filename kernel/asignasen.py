@@ -13,6 +13,11 @@ Entradas:
 
 Devuelve: dict con curules por partido {'mr': ..., 'pm': ..., 'rp': ..., 'tot': ...}
 """
+import logging
+from kernel.divisor_methods import asignar_divisor, normalizar_metodo_divisor
+
+logger = logging.getLogger(__name__)
+
 def asignasen_v1(resultados_mr, resultados_pm, resultados_rp, total_rp_seats=32, total_mr_seats=None, umbral=0.03, quota_method='hare', divisor_method='dhondt', primera_minoria=True, limite_escanos_pm=None):
     # MR: cuenta triunfos por partido
     mr_count = {}
@@ -23,9 +28,9 @@ def asignasen_v1(resultados_mr, resultados_pm, resultados_rp, total_rp_seats=32,
     # Aplicar límite de escaños MR si está especificado
     if total_mr_seats is not None:
         total_mr = sum(mr_count.values())
-        print(f"[DEBUG] MR antes del límite: {total_mr} escaños, límite: {total_mr_seats}")
+        logger.debug('MR antes del límite: %s escaños, límite: %s', total_mr, total_mr_seats)
         if total_mr > total_mr_seats:
-            print(f"[DEBUG] Aplicando reducción de MR: {total_mr} -> {total_mr_seats}")
+            logger.debug('Aplicando reducción de MR: %s -> %s', total_mr, total_mr_seats)
             # Reducir escaños MR proporcionalmente
             factor = total_mr_seats / total_mr
             mr_count_original = mr_count.copy()
@@ -41,7 +46,7 @@ def asignasen_v1(resultados_mr, resultados_pm, resultados_rp, total_rp_seats=32,
                     mr_count[partidos_ordenados[i]] += 1
                 elif diferencia < 0 and i < len(partidos_ordenados) and mr_count[partidos_ordenados[i]] > 0:
                     mr_count[partidos_ordenados[i]] -= 1
-            print(f"[DEBUG] MR después del límite: {sum(mr_count.values())} escaños")
+            logger.debug('MR después del límite: %s escaños', sum(mr_count.values()))
     
     # PM: cuenta triunfos por partido, pero solo si primera_minoria es True
     pm_count = {}
@@ -53,9 +58,9 @@ def asignasen_v1(resultados_mr, resultados_pm, resultados_rp, total_rp_seats=32,
         # Aplicar límite de escaños PM si está especificado
         if limite_escanos_pm is not None:
             total_pm = sum(pm_count.values())
-            print(f"[DEBUG] PM antes del límite: {total_pm} escaños, límite: {limite_escanos_pm}")
+            logger.debug('PM antes del límite: %s escaños, límite: %s', total_pm, limite_escanos_pm)
             if total_pm > limite_escanos_pm:
-                print(f"[DEBUG] Aplicando reducción de PM: {total_pm} -> {limite_escanos_pm}")
+                logger.debug('Aplicando reducción de PM: %s -> %s', total_pm, limite_escanos_pm)
                 # Reducir escaños PM proporcionalmente
                 factor = limite_escanos_pm / total_pm
                 pm_count_original = pm_count.copy()
@@ -71,13 +76,13 @@ def asignasen_v1(resultados_mr, resultados_pm, resultados_rp, total_rp_seats=32,
                         pm_count[partidos_ordenados[i]] += 1
                     elif diferencia < 0 and i < len(partidos_ordenados) and pm_count[partidos_ordenados[i]] > 0:
                         pm_count[partidos_ordenados[i]] -= 1
-                print(f"[DEBUG] PM después del límite: {sum(pm_count.values())} escaños")
-                print(f"[DEBUG] PM original: {pm_count_original}")
-                print(f"[DEBUG] PM ajustado: {pm_count}")
+                logger.debug('PM después del límite: %s escaños', sum(pm_count.values()))
+                logger.debug('PM original: %s', pm_count_original)
+                logger.debug('PM ajustado: %s', pm_count)
             else:
-                print(f"[DEBUG] No se aplica límite PM (total {total_pm} <= límite {limite_escanos_pm})")
+                logger.debug('No se aplica límite PM (total %s <= límite %s)', total_pm, limite_escanos_pm)
     else:
-        print("[DEBUG] Primera minoría desactivada, no se asignan escaños PM")
+        logger.debug('Primera minoría desactivada, no se asignan escaños PM')
     # RP: solo partidos con >= umbral nacional
     total_votes = sum(r['votes'] for r in resultados_rp)
     votos_ok = {r['party']: r['votes'] for r in resultados_rp if total_votes > 0 and r['votes']/total_votes >= umbral}
@@ -86,9 +91,8 @@ def asignasen_v1(resultados_mr, resultados_pm, resultados_rp, total_rp_seats=32,
     if quota_method in ['hare', 'droop', 'droop_exact']:
         # Usar algoritmo LR exacto estilo R (como en asigna_senado_RP de R)
         s_rp = asignar_rp_estilo_r(votos_ok, total_rp_seats, umbral)
-    elif divisor_method == 'dhondt':
-        from kernel.divisor_methods import dhondt_divisor
-        s_rp = dhondt_divisor(total_rp_seats, votos_ok)
+    elif normalizar_metodo_divisor(divisor_method):
+        s_rp = asignar_divisor(total_rp_seats, votos_ok, divisor_method)
     else:
         s_rp = {p: 0 for p in votos_ok}
 
@@ -136,7 +140,7 @@ def asignasen_v1(resultados_mr, resultados_pm, resultados_rp, total_rp_seats=32,
                         salida[pmax]['tot'] -= 1
                     else:
                         # Si no hay partidos con RP > 0, romper el bucle para evitar bucle infinito
-                        print(f"[WARN] No hay partidos con RP > 0 para ajustar. Suma actual: {suma_corr}, Magnitud: {magnitud}")
+                        logger.warning('No hay partidos con RP > 0 para ajustar. Suma actual: %s, Magnitud: %s', suma_corr, magnitud)
                         break
                 suma_corr = sum(salida[p]['tot'] for p in salida)
     return salida
@@ -0,0 +1,87 @@
+"""
+Bitácora (logging) del backend.
+
+Cada módulo tiene su logger (logging.getLogger(__name__)) y pasa los valores
+como argumentos en vez de armar f-strings: logger.debug('votos: %s', votos)
+solo formatea el mensaje si el nivel DEBUG está habilitado, así que los
+mensajes de depuración apagados no cuestan nada en el camino de la petición.
+
+configurar_logging instala un único handler en la raíz que agrega a cada
+registro el id del escenario en curso (contexto por petición) y lo escribe
+en texto o en JSON, una línea por registro.
+
+Configuración (variables de entorno):
+- LOG_LEVEL: nivel mínimo (DEBUG, INFO, WARNING, ERROR; INFO por defecto)
+- LOG_FORMAT: 'texto' (por defecto) o 'json'
+"""
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+NIVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+FORMATO = os.environ.get("LOG_FORMAT", "texto").lower()
+FORMATO_TEXTO = "%(asctime)s %(levelname)s %(name)s [%(escenario)s] %(message)s"
+
+# Id del escenario (petición) que se está calculando; '-' fuera de una petición
+ESCENARIO_ID = contextvars.ContextVar("escenario_id", default="-")
+
+
+class FiltroEscenario(logging.Filter):
+    """Agrega record.escenario con el id del escenario en curso."""
+    def filter(self, record):
+        record.escenario = ESCENARIO_ID.get()
+        return True
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por registro: ts, nivel, logger, escenario, mensaje (y exc)."""
+    def format(self, record):
+        datos = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "nivel": record.levelname,
+            "logger": record.name,
+            "escenario": getattr(record, "escenario", ESCENARIO_ID.get()),
+            "mensaje": record.getMessage(),
+        }
+        if record.exc_info:
+            datos["exc"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+def configurar_logging(nivel=None, formato=None, stream=None):
+    """
+    Instala (o reemplaza) el handler de la bitácora en el logger raíz.
+    Llamarla de nuevo solo cambia nivel/formato; no duplica handlers.
+    """
+    nivel = (nivel or NIVEL).upper()
+    formato = (formato or FORMATO).lower()
+    raiz = logging.getLogger()
+    for handler in [h for h in raiz.handlers if getattr(h, "_bitacora", False)]:
+        raiz.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler._bitacora = True
+    handler.addFilter(FiltroEscenario())
+    handler.setFormatter(FormatoJSON() if formato == "json" else logging.Formatter(FORMATO_TEXTO))
+    raiz.addHandler(handler)
+    raiz.setLevel(nivel)
+    return handler
+
+
+def nuevo_escenario_id():
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def contexto_escenario(escenario_id):
+    """Fija el id de escenario para los registros emitidos dentro del bloque."""
+    token = ESCENARIO_ID.set(escenario_id or "-")
+    try:
+        yield
+    finally:
+        ESCENARIO_ID.reset(token)
@@ -0,0 +1,328 @@
+"""
+Caché de resultados de /simulacion por escenario canónico.
+
+Dos peticiones que el kernel interpreta igual (umbral=3 y umbral=0.03,
+sobrerrepresentacion=8 y 0.08, parámetros que no aplican a la cámara o al
+modelo, tope automático y sliders MR/RP ya ajustados) producen la misma
+llave. La caché es LRU con número máximo de entradas, lleva contadores de
+aciertos/fallos y se vacía sola cuando cambian los archivos de data/.
+
+Peticiones idénticas concurrentes se coalescen (single-flight): la primera
+calcula y las demás esperan ese mismo resultado en vez de recalcularlo.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from kernel.magnitud import tope_automatico, ajustar_sliders_mixto
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = "data"
+MAX_ENTRADAS = 512
+# Segundos entre revisiones de data/ (evita un stat por petición)
+INTERVALO_REVISION = 2.0
+
+# Parámetros de calcular_simulacion en el orden de la firma
+PARAMETROS_SIMULACION = (
+    'anio', 'camara', 'modelo', 'magnitud', 'sobrerrepresentacion', 'umbral',
+    'regla_electoral', 'mixto_mr_seats', 'mixto_rp_seats', 'sistema',
+    'quota_method', 'divisor_method', 'max_seats_per_party', 'primera_minoria',
+    'limite_escanos_pm',
+)
+
+
+def _proporcion(valor):
+    """Porcentaje o proporción -> proporción, con la misma regla que el kernel (>= 1 es porcentaje)."""
+    if valor is None:
+        return None
+    valor = float(valor)
+    return valor / 100 if valor >= 1 else valor
+
+
+def _texto(valor):
+    return valor.strip().lower() if isinstance(valor, str) else valor
+
+
+def escenario_canonico(params):
+    """
+    Forma canónica de los parámetros de /simulacion. El resultado se puede
+    pasar tal cual a calcular_simulacion y da la misma respuesta que los
+    parámetros originales.
+    """
+    p = {k: params.get(k) for k in PARAMETROS_SIMULACION}
+    p['anio'] = int(p['anio'])
+    p['camara'] = _texto(p['camara'])
+    p['modelo'] = _texto(p['modelo'])
+    p['sistema'] = _texto(p['sistema']) or 'mixto'
+    p['quota_method'] = p['quota_method'] or 'hare'
+    p['divisor_method'] = _texto(p['divisor_method']) or 'dhondt'
+    p['regla_electoral'] = _texto(p['regla_electoral'])
+    p['primera_minoria'] = True if p['primera_minoria'] is None else bool(p['primera_minoria'])
+
+    if p['modelo'] != 'personalizado':
+        # Modelos precalculados: solo importan año, cámara, modelo y (diputados) magnitud
+        canon = {k: None for k in PARAMETROS_SIMULACION}
+        canon.update(anio=p['anio'], camara=p['camara'], modelo=p['modelo'],
+                     sistema='mixto', quota_method='hare', divisor_method='dhondt',
+                     primera_minoria=True)
+        if p['camara'] != 'senado' and p['modelo'] != 'plan c':
+            canon['magnitud'] = p['magnitud'] if p['magnitud'] is not None else 500
+        return canon
+
+    if p['camara'] == 'diputados':
+        p['umbral'] = _proporcion(p['umbral'])
+        sobre = p['sobrerrepresentacion']
+        p['sobrerrepresentacion'] = _proporcion(sobre) if sobre is not None and sobre > 0 else None
+        p['max_seats_per_party'] = tope_automatico(p['magnitud'], p['max_seats_per_party'])
+        max_seats = p['magnitud'] if p['magnitud'] is not None else 300
+        p['mixto_mr_seats'], p['mixto_rp_seats'] = ajustar_sliders_mixto(
+            max_seats, p['mixto_mr_seats'], p['mixto_rp_seats'])
+        # Solo aplican al senado
+        p['primera_minoria'] = True
+        p['limite_escanos_pm'] = None
+    elif p['camara'] == 'senado':
+        p['umbral'] = _proporcion(p['umbral']) if p['umbral'] is not None else 0.03
+        p['magnitud'] = p['magnitud'] if p['magnitud'] is not None else 128
+        p['mixto_rp_seats'] = p['mixto_rp_seats'] if p['mixto_rp_seats'] is not None else 32
+        # Solo aplican a diputados
+        p['sobrerrepresentacion'] = None
+        p['max_seats_per_party'] = None
+        p['regla_electoral'] = None
+        p['sistema'] = 'mixto'
+    return p
+
+
+def llave_escenario(canon):
+    return tuple(canon[k] for k in PARAMETROS_SIMULACION)
+
+
+def firma_datos(data_dir=DATA_DIR):
+    """(nombre, tamaño, mtime) de cada archivo de data_dir; cambia si cambia cualquier archivo."""
+    if not os.path.isdir(data_dir):
+        return ()
+    firma = []
+    for entrada in os.scandir(data_dir):
+        if entrada.is_file():
+            st = entrada.stat()
+            firma.append((entrada.name, st.st_size, st.st_mtime_ns))
+    return tuple(sorted(firma))
+
+
+class CacheEscenarios:
+    """
+    LRU de resultados (contenido, status_code) por escenario canónico.
+    Solo se guardan respuestas 200; los errores se recalculan siempre.
+    al_invalidar: función opcional que se llama (en un hilo aparte) cuando
+    cambian los datos, p. ej. recargar el registro de datasets; la caché se
+    vacía cuando termina.
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, data_dir=DATA_DIR, al_invalidar=None):
+        self.max_entradas = max_entradas
+        self.data_dir = data_dir
+        self.al_invalidar = al_invalidar
+        self._entradas = OrderedDict()
+        # llave -> (Future, generación) del cálculo en curso (single-flight)
+        self._en_curso = {}
+        # Tareas de cálculo asíncronas vivas (referencia fuerte hasta que terminan)
+        self._tareas = set()
+        self._lock = threading.Lock()
+        self._firma = firma_datos(data_dir)
+        self._ultima_revision = time.monotonic()
+        # Las recargas corren de una en una, fuera del camino de la petición
+        self._recargador = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recarga-datos')
+        self._recarga = None
+        # Sube con cada recarga/limpieza; resultados de una generación anterior no se guardan
+        self.generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+        self.coalescidas = 0
+
+    def revisar_datos(self):
+        """
+        Si cambió data/ (a lo más una revisión cada INTERVALO_REVISION s),
+        programa la recarga en segundo plano. Mientras corre se sigue
+        respondiendo con los datos anteriores; al terminar se vacía la caché.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._ultima_revision < INTERVALO_REVISION:
+                return
+            self._ultima_revision = ahora
+        firma = firma_datos(self.data_dir)
+        with self._lock:
+            # Comparar y sustituir bajo el lock: un solo hilo detecta el cambio
+            if firma == self._firma:
+                return
+            self._firma = firma
+            self._recarga = self._recargador.submit(self._recargar, firma)
+        logger.info('Cambió %s/: recargando datos en segundo plano', self.data_dir)
+
+    def _recargar(self, firma):
+        try:
+            if self.al_invalidar is not None:
+                self.al_invalidar()
+        except Exception:
+            logger.exception('Falló la recarga de %s/; se siguen usando los datos anteriores', self.data_dir)
+            with self._lock:
+                if self._firma == firma:
+                    # La siguiente revisión vuelve a intentarlo
+                    self._firma = None
+            return
+        with self._lock:
+            self._entradas.clear()
+            self.generacion += 1
+            self.invalidaciones += 1
+        logger.info('Datos de %s/ recargados: caché de escenarios invalidada', self.data_dir)
+
+    def esperar_recarga(self, timeout=None):
+        """Espera a que termine la recarga en curso (si la hay)."""
+        recarga = self._recarga
+        if recarga is not None:
+            recarga.result(timeout)
+
+    def obtener(self, llave):
+        self.revisar_datos()
+        with self._lock:
+            valor = self._entradas.get(llave)
+            if valor is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(llave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, llave, valor, generacion=None):
+        with self._lock:
+            if generacion is not None and generacion != self.generacion:
+                # Calculado con datos anteriores a una recarga: no se guarda
+                return
+            self._entradas[llave] = valor
+            self._entradas.move_to_end(llave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def _reservar(self, llave):
+        """
+        (valor en caché, None) o (None, (futuro, generacion, propio)): propio
+        indica si este llamado debe calcular o esperar el cálculo en curso
+        de la misma generación de datos.
+        """
+        with self._lock:
+            # Pudo terminar otro cálculo entre la consulta y este punto
+            valor = self._entradas.get(llave)
+            if valor is not None:
+                return valor, None
+            en_curso = self._en_curso.get(llave)
+            if en_curso is not None and en_curso[1] == self.generacion:
+                self.coalescidas += 1
+                return None, (en_curso[0], en_curso[1], False)
+            futuro = Future()
+            self._en_curso[llave] = (futuro, self.generacion)
+            return None, (futuro, self.generacion, True)
+
+    def _publicar(self, llave, futuro, generacion, valor):
+        if valor[1] == 200:
+            self.guardar(llave, valor, generacion)
+        futuro.set_result(valor)
+
+    def _liberar(self, llave, futuro):
+        with self._lock:
+            if self._en_curso.get(llave, (None,))[0] is futuro:
+                del self._en_curso[llave]
+
+    def obtener_o_calcular(self, llave, calcular):
+        """
+        Valor en caché para llave o, si no está, calcular() (y se guarda si es 200).
+        Si ya hay un cálculo en curso para la misma llave, espera su resultado.
+        """
+        valor = self.obtener(llave)
+        if valor is not None:
+            return valor
+        valor, reserva = self._reservar(llave)
+        if valor is not None:
+            return valor
+        futuro, generacion, propio = reserva
+        if not propio:
+            return futuro.result()
+
+        try:
+            valor = calcular()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            self._publicar(llave, futuro, generacion, valor)
+            return valor
+        finally:
+            self._liberar(llave, futuro)
+
+    async def obtener_o_calcular_async(self, llave, calcular):
+        """
+        Igual que obtener_o_calcular, para el servidor asíncrono: calcular es
+        una corrutina y los duplicados esperan el Future sin bloquear el loop.
+        """
+        valor = self.obtener(llave)
+        if valor is not None:
+            return valor
+        valor, reserva = self._reservar(llave)
+        if valor is not None:
+            return valor
+        futuro, generacion, propio = reserva
+        if not propio:
+            return await asyncio.wrap_future(futuro)
+
+        # El cálculo corre en su propia tarea: si se cancela la petición que
+        # lo inició (cliente desconectado), los que esperan el mismo
+        # resultado lo reciben igual y queda guardado en la caché
+        tarea = asyncio.ensure_future(self._calcular_y_publicar(llave, calcular, futuro, generacion))
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tarea_terminada)
+        return await asyncio.shield(tarea)
+
+    async def _calcular_y_publicar(self, llave, calcular, futuro, generacion):
+        try:
+            valor = await calcular()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            self._publicar(llave, futuro, generacion, valor)
+            return valor
+        finally:
+            self._liberar(llave, futuro)
+
+    def _tarea_terminada(self, tarea):
+        self._tareas.discard(tarea)
+        if not tarea.cancelled():
+            # Marca la excepción como leída aunque ya nadie espere la tarea
+            tarea.exception()
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.generacion += 1
+
+    def estadisticas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 4) if total else 0.0,
+                "desalojos": self.desalojos,
+                "invalidaciones": self.invalidaciones,
+                "coalescidas": self.coalescidas,
+                "en_curso": len(self._en_curso),
+            }
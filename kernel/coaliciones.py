@@ -0,0 +1,181 @@
+"""
+Matriz de coaliciones × partidos construida una vez a partir del siglado.
+
+Cada fila es una coalición del siglado (en orden de aparición) y cada
+columna un grupo parlamentario. La membresía indica qué partidos forman la
+coalición y los pesos son la proporción de registros (candidaturas) de cada
+partido dentro de ella. Con esto la redistribución de votos por coalición
+es un producto matricial sobre el vector nacional de votos.
+
+IndiceSigladoMR es la tabla (distrito, coalición) -> grupo parlamentario del
+siglado, alineada con las filas de MatrizVotos, para atribuir los escaños MR
+del método híbrido con un solo indexado sobre los ganadores por distrito.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from kernel.entidades import id_entidad, ids_entidades
+
+
+def _solo_lectura(arr):
+    arr = np.ascontiguousarray(arr)
+    arr.flags.writeable = False
+    return arr
+
+
+class MatrizCoaliciones:
+    """
+    coaliciones: nombres de coalición en orden de aparición en el siglado
+    partidos: grupos parlamentarios (columnas), en orden alfabético
+    membresia: ndarray bool (coaliciones × partidos)
+    pesos: ndarray float (coaliciones × partidos), registros / total de la coalición
+    """
+
+    def __init__(self, coaliciones, partidos, membresia, pesos):
+        self.coaliciones = tuple(coaliciones)
+        self.partidos = tuple(partidos)
+        self.col: Dict[str, int] = {p: i for i, p in enumerate(self.partidos)}
+        self.membresia = _solo_lectura(np.asarray(membresia, dtype=bool))
+        self.pesos = _solo_lectura(np.asarray(pesos, dtype=np.float64))
+
+    @classmethod
+    def desde_siglado(cls, siglado: pd.DataFrame) -> Optional['MatrizCoaliciones']:
+        """
+        Siglado normalizado con columnas 'coalicion' y 'grupo_parlamentario'.
+        Regresa None si faltan columnas.
+        """
+        if 'grupo_parlamentario' not in siglado.columns or 'coalicion' not in siglado.columns:
+            return None
+        filas = siglado[siglado['coalicion'].notna() & siglado['grupo_parlamentario'].notna()]
+        coalicion = filas['coalicion'].astype(str).str.strip()
+        partido = filas['grupo_parlamentario'].astype(str).str.strip().str.upper()
+
+        coaliciones = list(pd.unique(coalicion))
+        partidos = sorted(pd.unique(partido))
+        idx_c = pd.Index(coaliciones).get_indexer(coalicion)
+        idx_p = pd.Index(partidos).get_indexer(partido)
+
+        registros = np.zeros((len(coaliciones), len(partidos)), dtype=np.int64)
+        np.add.at(registros, (idx_c, idx_p), 1)
+        totales = registros.sum(axis=1, keepdims=True)
+        pesos = np.divide(registros, totales, out=np.zeros(registros.shape), where=totales > 0)
+        return cls(coaliciones, partidos, registros > 0, pesos)
+
+    def miembros(self, coalicion) -> list:
+        fila = self.membresia[self.coaliciones.index(coalicion)]
+        return [p for p, m in zip(self.partidos, fila) if m]
+
+    def redistribuir(self, votos_partido: Dict[str, int], partidos_base: Sequence[str]) -> Dict[str, int]:
+        """
+        Suma los votos de cada coalición (producto membresía × votos) y los
+        reparte entre sus partidos según los pesos del siglado. Solo se
+        redistribuyen coaliciones con votos y con más de un partido con votos;
+        si un partido está en varias, prevalece la última coalición.
+        Los partidos fuera de partidos_base conservan sus votos.
+        """
+        resultado = dict(votos_partido)
+        if not self.coaliciones:
+            return resultado
+
+        presentes = np.array([p in votos_partido for p in self.partidos], dtype=bool)
+        v = np.array([votos_partido.get(p, 0) for p in self.partidos], dtype=np.int64)
+        miembros_con_votos = self.membresia & presentes
+
+        votos_coalicion = miembros_con_votos.astype(np.int64) @ v
+        activa = (votos_coalicion > 0) & (miembros_con_votos.sum(axis=1) > 1)
+        nuevos = np.floor(votos_coalicion[:, None].astype(np.float64) * self.pesos).astype(np.int64)
+
+        en_base = np.array([p in set(partidos_base) for p in self.partidos], dtype=bool)
+        asignar = activa[:, None] & self.membresia & en_base
+        if not asignar.any():
+            return resultado
+
+        # Última coalición activa de cada partido
+        n = len(self.coaliciones)
+        ultima = n - 1 - np.argmax(asignar[::-1], axis=0)
+        # Recorrido fila por fila para conservar el orden de inserción de llaves nuevas
+        for c, j in np.argwhere(asignar):
+            if c == ultima[j]:
+                resultado[self.partidos[j]] = int(nuevos[c, j])
+            elif self.partidos[j] not in resultado:
+                resultado[self.partidos[j]] = 0
+        return resultado
+
+
+class IndiceSigladoMR:
+    """
+    partidos: catálogo de partidos (columnas de la matriz de votos + grupos del siglado)
+    coalicion_partido: dict partido -> id de coalición (última aparición en el siglado)
+    tabla: ndarray int (distritos × coaliciones) -> id en partidos, -1 sin registro;
+           las filas siguen el orden de MatrizVotos
+    """
+
+    def __init__(self, partidos, coalicion_partido, tabla):
+        self.partidos = tuple(partidos)
+        self.id_partido: Dict[str, int] = {p: i for i, p in enumerate(self.partidos)}
+        self.coalicion_partido = dict(coalicion_partido)
+        self.tabla = _solo_lectura(np.asarray(tabla, dtype=np.intp))
+
+    @classmethod
+    def desde_siglado(cls, siglado: pd.DataFrame, matriz, coaliciones: MatrizCoaliciones) -> Optional['IndiceSigladoMR']:
+        """
+        Siglado normalizado con entidad_ascii, distrito, coalicion y
+        grupo_parlamentario. Regresa None si faltan columnas.
+        """
+        if coaliciones is None or not all(c in siglado.columns for c in ['entidad_ascii', 'distrito', 'coalicion', 'grupo_parlamentario']):
+            return None
+
+        con_grupo = siglado[siglado['coalicion'].notna() & siglado['grupo_parlamentario'].notna()]
+        id_coalicion = {c: i for i, c in enumerate(coaliciones.coaliciones)}
+        coalicion_partido = {
+            str(p).upper().strip(): id_coalicion[str(c).strip()]
+            for p, c in zip(con_grupo['grupo_parlamentario'], con_grupo['coalicion'])
+        }
+
+        grupos = siglado['grupo_parlamentario'].dropna().astype(str)
+        partidos = list(dict.fromkeys([*matriz.partidos, *grupos]))
+        id_partido = {p: i for i, p in enumerate(partidos)}
+
+        # (id de entidad, distrito) -> fila de la matriz de votos
+        entidades = [id_entidad(e) for e in matriz.entidades]
+        fila_distrito = {
+            (entidades[e], int(d)): i
+            for i, (e, d) in enumerate(zip(matriz.entidad_idx.tolist(), matriz.distrito.tolist()))
+        }
+
+        tabla = np.full((matriz.n_distritos, len(coaliciones.coaliciones)), -1, dtype=np.intp)
+        for entidad, distrito, coalicion, grupo in zip(
+            ids_entidades(siglado['entidad_ascii']).tolist(), siglado['distrito'], siglado['coalicion'], siglado['grupo_parlamentario']
+        ):
+            if pd.isna(distrito) or pd.isna(coalicion):
+                continue
+            fila = fila_distrito.get((entidad, int(distrito)))
+            c = id_coalicion.get(str(coalicion).strip())
+            if fila is None or c is None:
+                continue
+            tabla[fila, c] = id_partido[grupo] if pd.notna(grupo) else -1
+        return cls(partidos, coalicion_partido, tabla)
+
+    def atribuir(self, ganadores, partidos_ganadores: Sequence[str]) -> np.ndarray:
+        """
+        ganadores: índice en partidos_ganadores del ganador de cada distrito
+        (MatrizVotos.ganadores_mr). Regresa el id en self.partidos del grupo
+        parlamentario que se queda con cada distrito: el del siglado para la
+        coalición del ganador o, sin registro, el propio ganador.
+        """
+        coalicion = np.array([self.coalicion_partido.get(p, -1) for p in partidos_ganadores], dtype=np.intp)
+        propio = np.array([self.id_partido[p] for p in partidos_ganadores], dtype=np.intp)
+        if not self.tabla.shape[1]:
+            return propio[ganadores]
+        distritos = np.arange(len(ganadores))
+        c = coalicion[ganadores]
+        siglado = self.tabla[distritos, np.maximum(c, 0)]
+        return np.where((c >= 0) & (siglado >= 0), siglado, propio[ganadores])
+
+    def conteo(self, ganadores, partidos_ganadores: Sequence[str]) -> Dict[str, int]:
+        """Escaños MR por grupo parlamentario (solo partidos con al menos uno)."""
+        conteo = np.bincount(self.atribuir(ganadores, partidos_ganadores), minlength=len(self.partidos))
+        return {self.partidos[i]: int(conteo[i]) for i in np.flatnonzero(conteo)}
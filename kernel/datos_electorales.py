@@ -0,0 +1,295 @@
+"""
+Registro en memoria de las bases electorales (cómputos + siglado).
+
+Cada par (año, cámara) disponible en data/ se lee una sola vez, se normaliza
+(nombres de columna, entidad, distrito, siglado) y se guarda como un
+DatasetElectoral de solo lectura. Las funciones del kernel aceptan este objeto
+en lugar de rutas de archivo, de modo que la lectura de Parquet/CSV y la
+limpieza de texto quedan fuera del camino de cada petición.
+"""
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kernel.matriz_votos import MatrizVotos
+from kernel.coaliciones import MatrizCoaliciones, IndiceSigladoMR
+from kernel.entidades import normalizar_entidades
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = "data"
+
+# Siglados cuyo nombre no sigue el patrón siglado-{camara}-{anio}.csv
+SIGLADOS_ESPECIALES = {
+    (2018, 'senado'): 'ine_cg2018_senado_siglado_long_corregido.csv',
+}
+
+_PATRON_COMPUTOS = re.compile(r'^computos_(diputados|senado)_(\d{4})\.parquet$')
+
+
+@dataclass(frozen=True)
+class DatasetElectoral:
+    """
+    Base electoral ya normalizada para un año y cámara, con su matriz densa
+    de votos (MatrizVotos) y, para diputados con siglado, su matriz de
+    coaliciones (MatrizCoaliciones) y el índice distrito × coalición del
+    siglado para MR (IndiceSigladoMR), construidos una sola vez. Para senado
+    con siglado, el conteo de fórmulas MR/PM por partido (formulas_senado).
+
+    Los DataFrames se comparten entre peticiones: el kernel los trata como
+    solo lectura y copia antes de modificar cualquier columna.
+    """
+    anio: int
+    camara: str
+    path_parquet: str
+    path_siglado: Optional[str]
+    computos: pd.DataFrame
+    siglado: Optional[pd.DataFrame]
+    matriz: MatrizVotos
+    coaliciones: Optional[MatrizCoaliciones] = None
+    indice_mr: Optional[IndiceSigladoMR] = None
+    formulas_senado: Optional[pd.DataFrame] = None
+
+
+_REGISTRO: Dict[Tuple[int, str], DatasetElectoral] = {}
+_POR_RUTA: Dict[Tuple[str, Optional[str], str], DatasetElectoral] = {}
+_LOCK = threading.Lock()
+
+
+def _decodificar_bytes(df):
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].apply(lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x)
+    return df
+
+
+def _leer_parquet(path_parquet):
+    try:
+        df = pd.read_parquet(path_parquet)
+    except Exception as e:
+        logger.warning('Error leyendo Parquet normal, intentando forzar a string y decodificar UTF-8: %s', e)
+        import pyarrow.parquet as pq
+        df = pq.read_table(path_parquet).to_pandas()
+    return _decodificar_bytes(df)
+
+
+def _leer_csv(path_csv):
+    try:
+        return pd.read_csv(path_csv, encoding='utf-8')
+    except UnicodeDecodeError:
+        logger.warning('Error de codificación UTF-8, intentando con latin1...')
+        return pd.read_csv(path_csv, encoding='latin1')
+
+
+def _normalizar_diputados(df, sig):
+    from kernel.procesar_diputados import normalizar_texto
+
+    df.columns = [normalizar_texto(c) for c in df.columns]
+    if 'ENTIDAD' in df.columns:
+        df['ENTIDAD'] = normalizar_entidades(df['ENTIDAD'])
+    if 'DISTRITO' in df.columns:
+        df['DISTRITO'] = pd.to_numeric(df['DISTRITO'], errors='coerce').fillna(0).astype(int)
+
+    if sig is not None:
+        sig.columns = [c.lower().strip() for c in sig.columns]
+        if 'entidad_ascii' in sig.columns:
+            sig['entidad_ascii'] = normalizar_entidades(sig['entidad_ascii'], ascii=True)
+        if 'distrito' in sig.columns:
+            sig['distrito'] = pd.to_numeric(sig['distrito'], errors='coerce')
+        if 'grupo_parlamentario' in sig.columns:
+            sig['grupo_parlamentario'] = sig['grupo_parlamentario'].str.upper().str.strip()
+        if 'coalicion' in sig.columns:
+            sig['coalicion'] = sig['coalicion'].str.strip()
+    return df, sig
+
+
+def _normalizar_senado(df, sig):
+    from kernel.procesar_senadores import normalizar_texto
+
+    df.columns = [normalizar_texto(c) for c in df.columns]
+    if 'ENTIDAD' in df.columns:
+        df['ENTIDAD'] = normalizar_entidades(df['ENTIDAD'])
+
+    if sig is not None:
+        sig.columns = [normalizar_texto(c) for c in sig.columns]
+        if 'ENTIDAD_ASCII' in sig.columns:
+            sig['ENTIDAD'] = sig['ENTIDAD_ASCII']
+        elif 'ENTIDAD' not in sig.columns:
+            raise ValueError("El archivo de siglado no contiene columna 'ENTIDAD' ni 'ENTIDAD_ASCII'")
+        sig['ENTIDAD'] = normalizar_entidades(sig['ENTIDAD'])
+        # Columnas tipadas una vez: fórmula entera (nullable) y partido categórico
+        if 'FORMULA' in sig.columns:
+            sig['FORMULA'] = np.trunc(pd.to_numeric(sig['FORMULA'], errors='coerce')).astype('Int64')
+        if 'GRUPO_PARLAMENTARIO' in sig.columns:
+            sig['GRUPO_PARLAMENTARIO'] = sig['GRUPO_PARLAMENTARIO'].astype('category')
+    return df, sig
+
+
+def cargar_dataset(path_parquet, camara, anio=None, path_siglado=None) -> DatasetElectoral:
+    """
+    Lee y normaliza un par cómputos/siglado. No consulta el registro;
+    para reutilizar datos ya cargados usar resolver_dataset.
+    """
+    camara = camara.lower()
+    if not os.path.exists(path_parquet):
+        raise FileNotFoundError(f"El archivo Parquet no existe: {path_parquet}")
+    df = _leer_parquet(path_parquet)
+    sig = None
+    if path_siglado is not None and os.path.exists(path_siglado):
+        sig = _leer_csv(path_siglado) if path_siglado.lower().endswith('.csv') else pd.read_parquet(path_siglado)
+    else:
+        path_siglado = None
+
+    if camara == 'diputados':
+        df, sig = _normalizar_diputados(df, sig)
+    elif camara == 'senado':
+        df, sig = _normalizar_senado(df, sig)
+    else:
+        raise ValueError(f"Cámara desconocida: {camara}")
+
+    if anio is None:
+        m = re.search(r'(\d{4})', os.path.basename(path_parquet))
+        anio = int(m.group(1)) if m else 0
+
+    matriz = MatrizVotos.desde_dataframe(df)
+    coaliciones = indice_mr = None
+    if camara == 'diputados' and sig is not None:
+        coaliciones = MatrizCoaliciones.desde_siglado(sig)
+        indice_mr = IndiceSigladoMR.desde_siglado(sig, matriz, coaliciones)
+    formulas_senado = None
+    if camara == 'senado' and sig is not None and {'FORMULA', 'GRUPO_PARLAMENTARIO'} <= set(sig.columns):
+        from kernel.procesar_senadores import conteo_formulas_senado
+        formulas_senado = conteo_formulas_senado(sig)
+
+    return DatasetElectoral(
+        anio=int(anio), camara=camara,
+        path_parquet=path_parquet, path_siglado=path_siglado,
+        computos=df, siglado=sig,
+        matriz=matriz,
+        coaliciones=coaliciones,
+        indice_mr=indice_mr,
+        formulas_senado=formulas_senado,
+    )
+
+
+def _clave_ruta(path_parquet, path_siglado, camara):
+    return (
+        os.path.abspath(path_parquet),
+        os.path.abspath(path_siglado) if path_siglado else None,
+        camara.lower(),
+    )
+
+
+def rutas_disponibles(data_dir=DATA_DIR):
+    """
+    Descubre los pares (año, cámara) presentes en data_dir.
+    Regresa {(anio, camara): (path_parquet, path_siglado o None)}.
+    """
+    rutas = {}
+    if not os.path.isdir(data_dir):
+        return rutas
+    for nombre in sorted(os.listdir(data_dir)):
+        m = _PATRON_COMPUTOS.match(nombre)
+        if not m:
+            continue
+        camara, anio = m.group(1), int(m.group(2))
+        siglado = SIGLADOS_ESPECIALES.get((anio, camara), f"siglado-{camara}-{anio}.csv")
+        path_siglado = os.path.join(data_dir, siglado)
+        rutas[(anio, camara)] = (
+            os.path.join(data_dir, nombre),
+            path_siglado if os.path.exists(path_siglado) else None,
+        )
+    return rutas
+
+
+def cargar_registro(data_dir=DATA_DIR):
+    """
+    Carga todos los datasets de data_dir en el registro global: al arrancar
+    el servidor y de nuevo cuando cambia data/. El registro nuevo se arma
+    aparte y sustituye al anterior de una vez, así que mientras se lee se
+    sigue respondiendo con los datos anteriores. La sustitución es un solo
+    cambio de referencia: quien consulta sin lock nunca ve un registro vacío.
+    """
+    global _REGISTRO, _POR_RUTA
+    registro, por_ruta = {}, {}
+    for (anio, camara), (path_parquet, path_siglado) in rutas_disponibles(data_dir).items():
+        ds = cargar_dataset(path_parquet, camara, anio=anio, path_siglado=path_siglado)
+        registro[(anio, camara)] = ds
+        por_ruta[_clave_ruta(path_parquet, path_siglado, camara)] = ds
+        logger.info('Dataset cargado: %s %s (%s filas)', camara, anio, len(ds.computos))
+    with _LOCK:
+        _REGISTRO, _POR_RUTA = registro, por_ruta
+    return dict(registro)
+
+
+def obtener_dataset(anio, camara) -> Optional[DatasetElectoral]:
+    """Dataset precargado para (anio, camara), o None si no existe."""
+    return _REGISTRO.get((int(anio), camara.lower()))
+
+
+def resolver_dataset(fuente, camara, anio=None, path_siglado=None) -> DatasetElectoral:
+    """
+    Acepta un DatasetElectoral o una ruta a Parquet y regresa siempre un
+    DatasetElectoral. Las rutas se resuelven contra el registro y, si no
+    estaban precargadas, se cargan una vez y quedan en memoria.
+    """
+    if isinstance(fuente, DatasetElectoral):
+        return fuente
+    if path_siglado is not None and not os.path.exists(path_siglado):
+        path_siglado = None
+    clave = _clave_ruta(fuente, path_siglado, camara)
+    ds = _POR_RUTA.get(clave)
+    if ds is not None:
+        return ds
+    with _LOCK:
+        ds = _POR_RUTA.get(clave)
+        if ds is None:
+            ds = cargar_dataset(fuente, camara, anio=anio, path_siglado=path_siglado)
+            _POR_RUTA[clave] = ds
+    return ds
+
+
+def resolver_computos(fuente, camara, anio=None) -> pd.DataFrame:
+    """
+    Como resolver_dataset, pero solo para quien necesita los cómputos: una
+    ruta se resuelve contra cualquier dataset ya cargado con ese Parquet,
+    sin importar con qué siglado se haya registrado.
+    """
+    if isinstance(fuente, DatasetElectoral):
+        return fuente.computos
+    path_abs = os.path.abspath(fuente)
+    camara = camara.lower()
+    for (path_parquet, _, camara_ds), ds in list(_POR_RUTA.items()):
+        if path_parquet == path_abs and camara_ds == camara:
+            return ds.computos
+    return resolver_dataset(fuente, camara, anio=anio).computos
+
+
+def resolver_matriz(fuente, camara, anio=None) -> MatrizVotos:
+    """Matriz de votos para un DatasetElectoral, una ruta o un DataFrame de cómputos."""
+    if isinstance(fuente, DatasetElectoral):
+        return fuente.matriz
+    if isinstance(fuente, MatrizVotos):
+        return fuente
+    if isinstance(fuente, pd.DataFrame):
+        return MatrizVotos.desde_dataframe(fuente)
+    path_abs = os.path.abspath(fuente)
+    camara = camara.lower()
+    for (path_parquet, _, camara_ds), ds in list(_POR_RUTA.items()):
+        if path_parquet == path_abs and camara_ds == camara:
+            return ds.matriz
+    return resolver_dataset(fuente, camara, anio=anio).matriz
+
+
+def limpiar_registro():
+    """Vacía el registro (útil si cambian los archivos de data/)."""
+    global _REGISTRO, _POR_RUTA
+    with _LOCK:
+        _REGISTRO, _POR_RUTA = {}, {}
@@ -1,27 +1,177 @@
-from decimal import Decimal, getcontext
-getcontext().prec = 28
+"""
+Métodos de divisores con cola de prioridad y aritmética entera exacta.
 
-def dhondt_divisor(total_seats, votes):
+Cada método define su divisor para el siguiente escaño como fracción
+entera (num, den) en función de los escaños ya obtenidos s. El cociente de
+un partido es votos / divisor; dos cocientes se comparan por
+multiplicación cruzada de enteros, sin Decimal ni flotantes.
+
+Métodos:
+- dhondt:                  s + 1
+- sainte_lague:            s + 1/2
+- sainte_lague_modificado: 7/5 para el primer escaño, luego s + 1/2
+- danes:                   3s + 1
+- huntington_hill:         sqrt(s(s+1))  (se compara el cociente al cuadrado)
+- adams:                   s
+
+Desempate determinista: a igual cociente gana el partido con más votos y,
+si también empatan en votos, el que aparece primero en la entrada.
+"""
+
+import heapq
+from fractions import Fraction
+from math import lcm
+
+
+def _divisor_dhondt(s):
+    return s + 1, 1
+
+
+def _divisor_sainte_lague(s):
+    return 2 * s + 1, 2
+
+
+def _divisor_sainte_lague_modificado(s):
+    return (7, 5) if s == 0 else (2 * s + 1, 2)
+
+
+def _divisor_danes(s):
+    return 3 * s + 1, 1
+
+
+def _divisor_huntington_hill(s):
+    # Divisor al cuadrado: s(s+1); 0 en el primer escaño (prioridad infinita)
+    return s * (s + 1), 1
+
+
+def _divisor_adams(s):
+    return s, 1
+
+
+# metodo -> (divisor(s) -> (num, den), compara el cociente al cuadrado)
+DIVISORES = {
+    'dhondt': (_divisor_dhondt, False),
+    'sainte_lague': (_divisor_sainte_lague, False),
+    'sainte_lague_modificado': (_divisor_sainte_lague_modificado, False),
+    'danes': (_divisor_danes, False),
+    'huntington_hill': (_divisor_huntington_hill, True),
+    'adams': (_divisor_adams, False),
+}
+
+ALIAS_DIVISORES = {
+    'd_hondt': 'dhondt',
+    'jefferson': 'dhondt',
+    'sainte': 'sainte_lague',
+    'sainte-lague': 'sainte_lague',
+    'webster': 'sainte_lague',
+    'sainte_modificado': 'sainte_lague_modificado',
+    'sainte_lague_mod': 'sainte_lague_modificado',
+    'danish': 'danes',
+    'hill': 'huntington_hill',
+    'huntington': 'huntington_hill',
+}
+
+
+def normalizar_metodo_divisor(metodo):
+    """Nombre canónico del método de divisores, o None si no se reconoce."""
+    if not metodo:
+        return None
+    metodo = str(metodo).strip().lower().replace("'", "")
+    metodo = ALIAS_DIVISORES.get(metodo, metodo)
+    return metodo if metodo in DIVISORES else None
+
+
+def _votos_enteros(valores):
+    """Escala los votos a enteros exactos (los flotantes se convierten sin pérdida)."""
+    if all(float(v).is_integer() for v in valores):
+        return [int(v) for v in valores]
+    fracciones = [Fraction(v) for v in valores]
+    escala = lcm(*(f.denominator for f in fracciones))
+    return [int(f * escala) for f in fracciones]
+
+
+class _Cociente:
     """
-    Método de divisores D'Hondt para asignar escaños.
+    Entrada del heap: cociente votos/divisor como fracción num/den.
+    Menor en el heap = mayor prioridad para el siguiente escaño.
+    """
+    __slots__ = ('num', 'den', 'votos', 'orden')
+
+    def __init__(self, num, den, votos, orden):
+        self.num = num
+        self.den = den
+        self.votos = votos
+        self.orden = orden
+
+    def __lt__(self, otro):
+        # num/den > otro.num/otro.den  <=>  num*otro.den > otro.num*den (den >= 0)
+        izq = self.num * otro.den
+        der = otro.num * self.den
+        if izq != der:
+            return izq > der
+        if self.votos != otro.votos:
+            return self.votos > otro.votos
+        return self.orden < otro.orden
+
+
+def orden_asignacion(total_seats, votes, metodo='dhondt'):
+    """
+    Secuencia de partidos en el orden en que reciben cada escaño.
+    :param total_seats: número de escaños a repartir (int)
+    :param votes: dict {partido: votos}
+    :param metodo: nombre del método de divisores (ver DIVISORES)
+    :return: lista de partidos, uno por escaño
+    """
+    canonico = normalizar_metodo_divisor(metodo)
+    if canonico is None:
+        raise ValueError(f"Método de divisores desconocido: {metodo}")
+    if not votes or total_seats <= 0:
+        return []
+
+    divisor, cuadrado = DIVISORES[canonico]
+    partidos = list(votes)
+    enteros = _votos_enteros([max(0, votes[p]) for p in partidos])
+    numeradores = [v * v if cuadrado else v for v in enteros]
+
+    heap = []
+    for i, v in enumerate(enteros):
+        num, den = divisor(0)
+        heap.append(_Cociente(numeradores[i] * den, num, v, i))
+    heapq.heapify(heap)
+
+    escanos = [0] * len(partidos)
+    secuencia = []
+    for _ in range(total_seats):
+        mejor = heap[0]
+        i = mejor.orden
+        secuencia.append(partidos[i])
+        escanos[i] += 1
+        num, den = divisor(escanos[i])
+        heapq.heapreplace(heap, _Cociente(numeradores[i] * den, num, mejor.votos, i))
+    return secuencia
+
+
+def asignar_divisor(total_seats, votes, metodo='dhondt'):
+    """
+    Asigna escaños con el método de divisores indicado.
     :param total_seats: número total de escaños a repartir (int)
     :param votes: dict {partido: votos}
+    :param metodo: nombre del método de divisores (ver DIVISORES)
     :return: dict {partido: escaños}
     """
-    # Si no hay votos válidos o no hay escaños que asignar, retornar dict vacío
     if not votes or total_seats <= 0:
         return {}
-    
     seats = {p: 0 for p in votes}
-    quotients = {p: Decimal(v) for p, v in votes.items()}
-    
-    for _ in range(total_seats):
-        # Encuentra el partido con el mayor cociente (solo si hay partidos)
-        if not quotients:
-            break
-        max_party = max(quotients, key=lambda p: (quotients[p], p))
-        seats[max_party] += 1
-        # Actualiza el cociente de ese partido
-        seats_so_far = seats[max_party]
-        quotients[max_party] = Decimal(votes[max_party]) / (seats_so_far + 1)
+    for p in orden_asignacion(total_seats, votes, metodo):
+        seats[p] += 1
     return seats
+
+
+def dhondt_divisor(total_seats, votes):
+    """
+    Método de divisores D'Hondt para asignar escaños.
+    :param total_seats: número total de escaños a repartir (int)
+    :param votes: dict {partido: votos}
+    :return: dict {partido: escaños}
+    """
+    return asignar_divisor(total_seats, votes, 'dhondt')
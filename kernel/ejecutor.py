@@ -0,0 +1,191 @@
+"""
+Ejecución de simulaciones pesadas fuera del proceso del servidor.
+
+Los escenarios personalizados (pandas/numpy, CPU) se mandan a un
+ProcessPoolExecutor acotado; cada worker precarga el registro de datasets
+al arrancar. Si muere un proceso, el pool roto se cambia por uno nuevo.
+Un semáforo limita cuántos escenarios se están calculando a la vez y el
+resto espera en cola; los contadores permiten ver la profundidad de la
+cola y el trabajo en curso.
+
+Configuración (variables de entorno):
+- SIMULACION_WORKERS: procesos del pool (0 = sin pool, hilos del servidor)
+- SIMULACION_CONCURRENCIA: escenarios en cálculo simultáneo
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from kernel.bitacora import configurar_logging
+from kernel.datos_electorales import cargar_registro
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("SIMULACION_WORKERS", os.cpu_count() or 1))
+CONCURRENCIA = int(os.environ.get("SIMULACION_CONCURRENCIA", max(1, WORKERS) * 2))
+
+# Procesos sin fork: el servidor tiene hilos (anyio, recarga de datos) y un
+# proceso bifurcado heredaría sus locks tomados, p. ej. el del registro de
+# datasets a media lectura, y se quedaría bloqueado al cargar el registro
+_CONTEXTO = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+# Generación de datos con la que arrancó este proceso del pool
+_GENERACION = 0
+
+
+def _inicializar_worker(generacion=0):
+    # Cada proceso lee los datasets una vez y los reutiliza en todas sus tareas
+    global _GENERACION
+    _GENERACION = generacion
+    configurar_logging()
+    cargar_registro()
+
+
+def generacion_worker():
+    """Generación de datos del proceso que la ejecuta (diagnóstico y pruebas)."""
+    return _GENERACION
+
+
+class EjecutorSimulaciones:
+    """
+    Pool de procesos + límite de concurrencia con métricas de cola.
+    Sin iniciar (o con workers=0) las tareas corren en hilos del servidor.
+    """
+
+    def __init__(self, workers=WORKERS, concurrencia=CONCURRENCIA):
+        self.workers = workers
+        self.concurrencia = concurrencia
+        self._pool = None
+        self._semaforo = None
+        # Sube con cada reinicio; los procesos nuevos la reciben al arrancar
+        self.generacion = 0
+        self._lock = threading.Lock()
+        self.en_espera = 0
+        self.en_ejecucion = 0
+        self.max_espera = 0
+        self.completadas = 0
+        self.errores = 0
+        self.pools_rotos = 0
+        self._segundos_total = 0.0
+
+    def _crear_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=_CONTEXTO,
+            initializer=_inicializar_worker, initargs=(self.generacion,)
+        )
+
+    def iniciar(self):
+        if self.workers > 0 and self._pool is None:
+            self._pool = self._crear_pool()
+            logger.info('Pool de simulación: %s procesos, concurrencia %s', self.workers, self.concurrencia)
+
+    def reiniciar(self):
+        """
+        Cambia el pool por uno nuevo cuyos procesos vuelven a leer data/ (tras
+        una recarga). Las tareas ya enviadas terminan en los procesos viejos.
+        """
+        with self._lock:
+            self.generacion += 1
+            viejo = self._pool
+            if viejo is None:
+                return
+            self._pool = self._crear_pool()
+        viejo.shutdown(wait=False)
+        logger.info('Pool de simulación reiniciado (generación %s)', self.generacion)
+
+    def _reponer(self, roto):
+        """Cambia un pool roto (murió uno de sus procesos) por uno nuevo."""
+        with self._lock:
+            if self._pool is not roto:
+                # Ya lo cambió otra tarea, un reinicio o detener()
+                return
+            self._pool = self._crear_pool()
+            self.pools_rotos += 1
+        roto.shutdown(wait=False)
+        logger.error('Murió un proceso del pool de simulación: se creó un pool nuevo')
+
+    def detener(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def ejecutar(self, funcion, *args):
+        """Corre funcion(*args) en el pool respetando el límite de concurrencia."""
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.concurrencia)
+        with self._lock:
+            self.en_espera += 1
+            self.max_espera = max(self.max_espera, self.en_espera)
+        try:
+            await self._semaforo.acquire()
+        finally:
+            with self._lock:
+                self.en_espera -= 1
+        inicio = time.perf_counter()
+        with self._lock:
+            self.en_ejecucion += 1
+        try:
+            pool = self._pool
+            if pool is not None:
+                resultado = await self._ejecutar_en_pool(pool, funcion, *args)
+            else:
+                resultado = await asyncio.to_thread(funcion, *args)
+        except BaseException:
+            with self._lock:
+                self.errores += 1
+            raise
+        finally:
+            self._semaforo.release()
+            with self._lock:
+                self.en_ejecucion -= 1
+                self.completadas += 1
+                self._segundos_total += time.perf_counter() - inicio
+        return resultado
+
+    async def _ejecutar_en_pool(self, pool, funcion, *args):
+        try:
+            return await asyncio.wrap_future(self._enviar(pool, funcion, *args))
+        except BrokenProcessPool:
+            # Un pool roto rechaza todas las tareas siguientes: se cambia por
+            # uno nuevo y la tarea se reintenta una vez
+            self._reponer(pool)
+        pool = self._pool
+        if pool is None:
+            raise BrokenProcessPool('El pool de simulación se detuvo')
+        try:
+            return await asyncio.wrap_future(self._enviar(pool, funcion, *args))
+        except BrokenProcessPool:
+            self._reponer(pool)
+            raise
+
+    def _enviar(self, pool, funcion, *args):
+        try:
+            return pool.submit(funcion, *args)
+        except RuntimeError:
+            # El pool se reinició entre leerlo y enviar la tarea
+            if self._pool is pool or self._pool is None:
+                raise
+            return self._pool.submit(funcion, *args)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "workers": self.workers if self._pool is not None else 0,
+                "concurrencia": self.concurrencia,
+                "en_espera": self.en_espera,
+                "max_espera": self.max_espera,
+                "en_ejecucion": self.en_ejecucion,
+                "completadas": self.completadas,
+                "errores": self.errores,
+                "pools_rotos": self.pools_rotos,
+                "segundos_promedio": round(self._segundos_total / self.completadas, 4) if self.completadas else 0.0,
+            }
@@ -0,0 +1,128 @@
+"""
+Catálogo único de las 32 entidades federativas.
+
+Cada entidad tiene un id entero (clave INEGI, 1-32), su nombre canónico con
+acentos (el que usan los cómputos y las respuestas), su forma ASCII (la de
+los siglados) y las variantes conocidas (nombres oficiales largos, siglas,
+nombres con espacios partidos en los CSV). La normalización de texto se
+hace una vez por nombre distinto: las columnas se factorizan y solo los
+valores únicos pasan por la tabla.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# id -> nombre canónico
+ENTIDADES = {
+    1: 'AGUASCALIENTES',
+    2: 'BAJA CALIFORNIA',
+    3: 'BAJA CALIFORNIA SUR',
+    4: 'CAMPECHE',
+    5: 'COAHUILA',
+    6: 'COLIMA',
+    7: 'CHIAPAS',
+    8: 'CHIHUAHUA',
+    9: 'CIUDAD DE MÉXICO',
+    10: 'DURANGO',
+    11: 'GUANAJUATO',
+    12: 'GUERRERO',
+    13: 'HIDALGO',
+    14: 'JALISCO',
+    15: 'MÉXICO',
+    16: 'MICHOACÁN',
+    17: 'MORELOS',
+    18: 'NAYARIT',
+    19: 'NUEVO LEÓN',
+    20: 'OAXACA',
+    21: 'PUEBLA',
+    22: 'QUERÉTARO',
+    23: 'QUINTANA ROO',
+    24: 'SAN LUIS POTOSÍ',
+    25: 'SINALOA',
+    26: 'SONORA',
+    27: 'TABASCO',
+    28: 'TAMAULIPAS',
+    29: 'TLAXCALA',
+    30: 'VERACRUZ',
+    31: 'YUCATÁN',
+    32: 'ZACATECAS',
+}
+
+# Variantes que no se reducen al nombre canónico solo quitando acentos y espacios
+ALIAS_ENTIDADES = {
+    'COAHUILA DE ZARAGOZA': 5,
+    'DISTRITO FEDERAL': 9,
+    'DF': 9,
+    'CDMX': 9,
+    'ESTADO DE MEXICO': 15,
+    'EDO MEX': 15,
+    'EDOMEX': 15,
+    'MICHOACAN DE OCAMPO': 16,
+    'QUERETARO DE ARTEAGA': 22,
+    'VERACRUZ DE IGNACIO DE LA LLAVE': 30,
+}
+
+
+def _ascii(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('ASCII')
+
+
+def _llave(texto):
+    """Mayúsculas, sin acentos y solo letras: 'Estad o de México' -> 'ESTADODEMEXICO'."""
+    return re.sub(r'[^A-Z]', '', _ascii(str(texto)).upper())
+
+
+ENTIDADES_ASCII = {i: _ascii(nombre) for i, nombre in ENTIDADES.items()}
+
+_POR_LLAVE = {_llave(nombre): i for i, nombre in ENTIDADES.items()}
+_POR_LLAVE.update({_llave(alias): i for alias, i in ALIAS_ENTIDADES.items()})
+
+
+@lru_cache(maxsize=None)
+def id_entidad(nombre) -> Optional[int]:
+    """Id de la entidad para cualquier variante de su nombre, o None si no se reconoce."""
+    if nombre is None or (isinstance(nombre, float) and np.isnan(nombre)):
+        return None
+    return _POR_LLAVE.get(_llave(nombre))
+
+
+def _texto_limpio(nombre):
+    # Nombres fuera del catálogo: se conservan en mayúsculas con espacios simples
+    if pd.isnull(nombre):
+        return ''
+    return re.sub(r'\s+', ' ', str(nombre).strip().upper())
+
+
+def nombre_entidad(nombre) -> str:
+    """Nombre canónico (con acentos)."""
+    i = id_entidad(nombre)
+    return ENTIDADES[i] if i is not None else _texto_limpio(nombre)
+
+
+def ascii_entidad(nombre) -> str:
+    """Nombre canónico sin acentos, como en los siglados."""
+    i = id_entidad(nombre)
+    return ENTIDADES_ASCII[i] if i is not None else _ascii(_texto_limpio(nombre))
+
+
+def normalizar_entidades(serie: pd.Series, ascii: bool = False) -> pd.Series:
+    """
+    Columna de entidades -> nombres canónicos (o ASCII). Se factoriza la
+    columna y solo los valores distintos pasan por el catálogo.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    convertir = ascii_entidad if ascii else nombre_entidad
+    nombres = np.array([convertir(u) for u in unicos], dtype=object)
+    return pd.Series(nombres[codigos], index=serie.index, name=serie.name)
+
+
+def ids_entidades(serie) -> np.ndarray:
+    """Columna (o lista) de entidades -> ids enteros; -1 si no se reconoce."""
+    codigos, unicos = pd.factorize(pd.Series(serie), use_na_sentinel=False)
+    ids = np.array([id_entidad(u) or -1 for u in unicos], dtype=np.intp)
+    return ids[codigos]
@@ -9,11 +9,101 @@
 # 2. Ordenar por residuo (mayor a menor)
 # 3. En caso de empate en residuo: ordenar por votos totales 
 # 4. En caso de empate en votos: aleatorización con seed
+#
+# El azar sale siempre de un generador local derivado de la semilla
+# (nunca del estado global de random/np.random), así que llamadas
+# concurrentes en hilos no se afectan entre sí y la misma semilla da
+# siempre el mismo resultado.
 # ============================================================
 
-import random
 import numpy as np
 
+# Tolerancia para considerar dos residuos iguales
+_TOL_RESIDUO = 1e-12
+
+# Semilla de escenario cuando no se especifica una
+SEMILLA_POR_DEFECTO = 0
+
+
+def derivar_semilla(seed, *claves):
+    """
+    Flujo de semilla independiente para una llamada dentro de un escenario
+    (p. ej. claves=(estado,) o (iteracion,)). Misma semilla y mismas claves
+    dan siempre el mismo flujo; claves distintas, flujos independientes.
+    seed puede ser None (semilla por defecto), un entero o una SeedSequence.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return np.random.SeedSequence(seed.entropy, spawn_key=tuple(seed.spawn_key) + tuple(claves))
+    return np.random.SeedSequence(SEMILLA_POR_DEFECTO if seed is None else seed, spawn_key=tuple(claves))
+
+
+def lr_ties_batch(V, n, q=None, seed=None):
+    """
+    Versión vectorizada de lr_ties para muchos vectores de votos a la vez.
+    
+    Cada fila de V (estados × partidos, escenarios × partidos, ...) se
+    asigna de forma independiente con la misma regla que lr_ties. El orden
+    de restos se obtiene con un único lexsort sobre
+    (grupo de residuo, votos totales, llave aleatoria), sin bucles Python.
+    
+    Args:
+        V: matriz (k × p) de votos absolutos
+        n: escaños por fila (escalar o arreglo de longitud k)
+        q: cuota por fila (escalar, arreglo o None => sum(V[i])/n[i])
+        seed: semilla (entero o SeedSequence) para la llave aleatoria de
+              desempate; None usa SEMILLA_POR_DEFECTO. Una lista con una
+              semilla por fila da a cada fila el mismo flujo que tendría
+              en una llamada lr_ties propia con esa semilla.
+    
+    Returns:
+        ndarray int (k × p) con escaños por fila y partido
+    """
+    V = np.array(V, dtype=float, ndmin=2)
+    V[~np.isfinite(V)] = 0.0
+    k, p = V.shape
+    n = np.broadcast_to(np.asarray(n, dtype=float), (k,))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if q is None:
+            q = V.sum(axis=1) / n
+        q = np.broadcast_to(np.asarray(q, dtype=float), (k,))
+        validas = np.isfinite(q) & (q > 0) & (n > 0)
+        q_ok = np.where(validas, q, 1.0)[:, None]
+        
+        # Asignación inicial por cuota y residuos
+        t = np.floor(V / q_ok)
+        rem = V % q_ok
+    
+    t = np.where(validas[:, None], t, 0).astype(int)
+    u = np.where(validas, n - t.sum(axis=1), 0).astype(int)
+    if p == 0 or not (u > 0).any():
+        return t
+    
+    # Grupos de residuo (mayor a menor): residuos a menos de la tolerancia
+    # del anterior comparten grupo
+    filas = np.arange(k)[:, None]
+    orden_rem = np.argsort(-rem, axis=1, kind='stable')
+    rem_ord = rem[filas, orden_rem]
+    nuevo = np.ones((k, p), dtype=bool)
+    nuevo[:, 1:] = np.abs(np.diff(rem_ord, axis=1)) >= _TOL_RESIDUO
+    grupo = np.empty((k, p), dtype=int)
+    grupo[filas, orden_rem] = np.cumsum(nuevo, axis=1)
+    
+    # Desempate: residuo, luego votos totales (mayor a menor), luego aleatorio
+    if isinstance(seed, (list, tuple)):
+        llave = np.stack([np.random.default_rng(derivar_semilla(s)).random(p) for s in seed])
+    else:
+        llave = np.random.default_rng(derivar_semilla(seed)).random((k, p))
+    rank = np.lexsort((llave, -V, grupo), axis=-1)
+    
+    # Posición de cada partido en el ranking; recibe escaño adicional si
+    # queda dentro de los u primeros
+    posicion = np.empty((k, p), dtype=int)
+    posicion[filas, rank] = np.arange(p)
+    add = posicion < np.minimum(u, p)[:, None]
+    
+    return (t + add).astype(int)
+
 
 def lr_ties(v_abs, n, q=None, seed=None):
     """
@@ -29,107 +119,13 @@ def lr_ties(v_abs, n, q=None, seed=None):
         v_abs: lista/array de votos absolutos por partido
         n: número total de escaños a asignar
         q: cuota (si None, se calcula como sum(v_abs)/n)
-        seed: semilla para reproducibilidad en empates
+        seed: semilla para reproducibilidad en empates (entero, SeedSequence o None)
     
     Returns:
-        lista de enteros con escaños asignados por partido
+        array de enteros con escaños asignados por partido
     """
-    # Convertir a array numpy para facilitar operaciones
-    v_abs = np.array(v_abs, dtype=float)
-    
-    # Manejar valores no finitos
-    v_abs[~np.isfinite(v_abs)] = 0.0
-    
-    # Calcular cuota si no se proporciona
-    if q is None:
-        q = np.sum(v_abs) / n
-    
-    # Validaciones
-    if not np.isfinite(q) or q <= 0 or n <= 0:
-        return np.zeros(len(v_abs), dtype=int)
-    
-    # Asignación inicial por cuota
-    t = np.floor(v_abs / q).astype(int)
-    u = int(n - np.sum(t))
-    
-    # Si ya asignamos todo, retornar
-    if u <= 0:
-        return t
-    
-    # Calcular residuos
-    rem = v_abs % q
-    
-    # Crear índices base ordenados por residuo (mayor a menor)
-    base_ord = np.argsort(-rem)  # negativo para orden descendente
-    
-    # Establecer semilla si se proporciona
-    if seed is not None:
-        random.seed(seed)
-        np.random.seed(seed)
-    
-    # Procesar empates en residuos
-    rank = np.zeros(len(v_abs), dtype=int)
-    i = 0
-    
-    while i < len(base_ord):
-        # Encontrar grupo con el mismo residuo
-        j = i
-        while (j < len(base_ord) and 
-               abs(rem[base_ord[j]] - rem[base_ord[i]]) < 1e-12):
-            j += 1
-        
-        # Índices del grupo con mismo residuo
-        idx = base_ord[i:j]
-        
-        if len(idx) > 1:
-            # Hay empate en residuo, desempatar por votos totales
-            vbloc = v_abs[idx]
-            
-            # Ordenar por votos totales (mayor a menor)
-            o2_indices = np.argsort(-vbloc)
-            o2 = idx[o2_indices]
-            
-            # Verificar empates en votos totales
-            vbloc_sorted = vbloc[o2_indices]
-            
-            # Identificar grupos con mismos votos
-            unique_votes, inverse_indices = np.unique(vbloc_sorted, return_inverse=True)
-            
-            if len(unique_votes) < len(vbloc_sorted):
-                # Hay empates en votos, aplicar aleatorización
-                final_order = []
-                
-                for vote_value in unique_votes:
-                    # Encontrar todos los índices con este valor de votos
-                    tied_mask = vbloc_sorted == vote_value
-                    tied_indices = o2[tied_mask]
-                    
-                    if len(tied_indices) > 1:
-                        # Aplicar aleatorización a este grupo
-                        tied_list = list(tied_indices)
-                        random.shuffle(tied_list)
-                        final_order.extend(tied_list)
-                    else:
-                        final_order.extend(tied_indices)
-                
-                idx = np.array(final_order)
-            else:
-                # No hay empates en votos, usar orden por votos
-                idx = o2
-        
-        # Asignar ranks
-        for k, partido_idx in enumerate(idx):
-            rank[i + k] = partido_idx
-        
-        i = j
-    
-    # Asignar escaños adicionales según ranking
-    add = np.zeros(len(v_abs), dtype=int)
-    for k in range(min(u, len(rank))):
-        if rank[k] < len(add):
-            add[rank[k]] += 1
-    
-    return (t + add).astype(int)
+    return lr_ties_batch(np.asarray(v_abs, dtype=float)[None, :], n,
+                         q=None if q is None else [q], seed=seed)[0]
 
 
 def test_lr_ties():
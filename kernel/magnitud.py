@@ -3,6 +3,10 @@ Módulo de magnitud de cámara para el tablero electoral.
 Permite definir y devolver la magnitud (número de escaños) de la cámara según parámetros.
 """
 
+import logging
+
+logger = logging.getLogger(__name__)
+
 def get_magnitud(camara: str, modelo: str = "Vigente") -> int:
     """
     Devuelve la magnitud (número de escaños) para la cámara y modelo especificados.
@@ -21,3 +25,143 @@ def get_magnitud(camara: str, modelo: str = "Vigente") -> int:
         return 128
     else:
         raise ValueError(f"Cámara desconocida: {camara}")
+
+
+def barrido_magnitudes(votos: dict, magnitud_max: int, divisor_method: str = "dhondt", umbral: float = None) -> dict:
+    """
+    Asignación para todas las magnitudes 1..magnitud_max en una sola pasada.
+    Los métodos de divisores son monótonos en la magnitud: la asignación con
+    m escaños es la de m-1 más un escaño, así que basta con la secuencia de
+    escaños hasta la magnitud máxima.
+
+    Es una referencia del reparto proporcional puro: no reproduce ninguna
+    regla de /simulacion (reparto RP por estado con cuotas, MR, topes por
+    partido ni límite de sobrerrepresentación), así que sus escaños no
+    coinciden con los de /simulacion para la misma magnitud.
+
+    votos: dict {partido: votos}
+    umbral: proporción mínima (0.03) o porcentaje (3.0); None = sin umbral
+    Devuelve dict con 'partidos', 'votos' (ya con umbral) y 'orden': índice del
+    partido que recibe el escaño k (k = 1..magnitud_max). Los escaños de la
+    magnitud m son el conteo de cada índice en orden[:m].
+    """
+    from kernel.divisor_methods import normalizar_metodo_divisor, orden_asignacion
+
+    metodo = normalizar_metodo_divisor(divisor_method)
+    if metodo is None:
+        raise ValueError(f"Método de divisores desconocido: {divisor_method}")
+    if umbral is not None and umbral >= 1:
+        umbral = umbral / 100
+
+    partidos = list(votos.keys())
+    total = sum(votos.values())
+    votos_ok = {
+        p: (votos[p] if total > 0 and (not umbral or votos[p] / total >= umbral) else 0)
+        for p in partidos
+    }
+
+    indice = {p: i for i, p in enumerate(partidos)}
+    orden = []
+    if sum(votos_ok.values()) > 0:
+        orden = [indice[p] for p in orden_asignacion(magnitud_max, votos_ok, metodo)]
+    return {
+        "partidos": partidos,
+        "votos": votos_ok,
+        "divisor_method": metodo,
+        "orden": orden,
+    }
+
+
+def tope_automatico(magnitud, max_seats_per_party=None):
+    """
+    Tope de escaños por partido derivado de la magnitud cuando no viene en la
+    petición: 60% de la magnitud (evita mayorías absolutas), solo si es de al
+    menos 10 escaños. Si ya viene un tope, se respeta.
+    """
+    # INTELIGENCIA: Si no se especifica tope, derivarlo automáticamente
+    if max_seats_per_party is None and magnitud is not None:
+        # Tope automático: 60% de la magnitud (evita mayorías absolutas)
+        max_seats_per_party_auto = int(magnitud * 0.6)
+        logger.debug('🤖 Tope automático calculado: %s (60%% de %s)', max_seats_per_party_auto, magnitud)
+        # Solo aplicar si es razonable (mínimo 10 escaños)
+        if max_seats_per_party_auto >= 10:
+            max_seats_per_party = max_seats_per_party_auto
+            logger.debug('✅ Aplicando tope automático: %s', max_seats_per_party)
+        else:
+            logger.debug('❌ Tope automático muy bajo (%s), no se aplica', max_seats_per_party_auto)
+    return max_seats_per_party
+
+
+def ajustar_sliders_mixto(max_seats, mixto_mr_seats=None, mixto_rp_seats=None):
+    """
+    Validaciones de los sliders MR/RP de diputados: completa el que falte,
+    fuerza que sumen max_seats y mantiene cada uno entre 10% y 90%.
+    Devuelve (mixto_mr_seats, mixto_rp_seats).
+    """
+    # ✨ VALIDACIONES INTELIGENTES Y ROBUSTAS ✨
+    logger.debug('Aplicando validaciones inteligentes...')
+
+    # === 1. VALIDAR QUE LA SUMA NO EXCEDA EL TOTAL ===
+    if mixto_mr_seats is not None and mixto_rp_seats is not None:
+        suma_total = mixto_mr_seats + mixto_rp_seats
+        if suma_total != max_seats:
+            logger.error('Suma inválida: MR(%s) + RP(%s) = %s ≠ %s total', mixto_mr_seats, mixto_rp_seats, suma_total, max_seats)
+            # AJUSTE INTELIGENTE: Si se especificaron ambos pero no suman bien, ajustar RP
+            if suma_total > max_seats:
+                mixto_rp_seats = max_seats - mixto_mr_seats
+                logger.debug('Auto-ajustando RP: %s para que sume %s', mixto_rp_seats, max_seats)
+            elif suma_total < max_seats:
+                mixto_rp_seats = max_seats - mixto_mr_seats  
+                logger.debug('Auto-completando RP: %s para que sume %s', mixto_rp_seats, max_seats)
+
+    # === 2. SLIDERS INTELIGENTES (si solo se especifica uno) ===
+    elif mixto_mr_seats is not None and mixto_rp_seats is None:
+        # Usuario movió slider MR → ajustar RP automáticamente
+        mixto_rp_seats = max_seats - mixto_mr_seats
+        logger.debug('Slider inteligente: MR=%s → RP auto-ajustado a %s', mixto_mr_seats, mixto_rp_seats)
+
+    elif mixto_rp_seats is not None and mixto_mr_seats is None:
+        # Usuario movió slider RP → ajustar MR automáticamente  
+        mixto_mr_seats = max_seats - mixto_rp_seats
+        logger.debug('Slider inteligente: RP=%s → MR auto-ajustado a %s', mixto_rp_seats, mixto_mr_seats)
+
+    # === 3. VALIDACIONES DE RANGOS SENSATOS ===
+    if mixto_mr_seats is not None:
+        # Validar que MR esté en rango sensato (mínimo 10%, máximo 90%)
+        min_mr = max(1, max_seats // 10)  # Mínimo 10% pero al menos 1
+        max_mr = max_seats - max(1, max_seats // 10)  # Máximo 90%
+
+        if mixto_mr_seats < min_mr:
+            logger.warning('mixto_mr_seats=%s muy bajo (min %s), ajustando...', mixto_mr_seats, min_mr)
+            mixto_mr_seats = min_mr
+            mixto_rp_seats = max_seats - mixto_mr_seats
+        elif mixto_mr_seats > max_mr:
+            logger.warning('mixto_mr_seats=%s muy alto (max %s), ajustando...', mixto_mr_seats, max_mr)
+            mixto_mr_seats = max_mr
+            mixto_rp_seats = max_seats - mixto_mr_seats
+
+    if mixto_rp_seats is not None:
+        # Validar que RP esté en rango sensato (mínimo 10%, máximo 90%)
+        min_rp = max(1, max_seats // 10)
+        max_rp = max_seats - max(1, max_seats // 10)
+
+        if mixto_rp_seats < min_rp:
+            logger.warning('mixto_rp_seats=%s muy bajo (min %s), ajustando...', mixto_rp_seats, min_rp)
+            mixto_rp_seats = min_rp
+            mixto_mr_seats = max_seats - mixto_rp_seats
+        elif mixto_rp_seats > max_rp:
+            logger.warning('mixto_rp_seats=%s muy alto (max %s), ajustando...', mixto_rp_seats, max_rp)
+            mixto_rp_seats = max_rp
+            mixto_mr_seats = max_seats - mixto_rp_seats
+
+    # === 4. VALIDACIÓN FINAL: ASEGURAR QUE SUMA SEA EXACTA ===
+    if mixto_mr_seats is not None and mixto_rp_seats is not None:
+        suma_final = mixto_mr_seats + mixto_rp_seats
+        if suma_final != max_seats:
+            # Esto no debería pasar, pero por seguridad
+            logger.error('Suma final incorrecta: %s ≠ %s', suma_final, max_seats)
+            mixto_rp_seats = max_seats - mixto_mr_seats
+            logger.debug('Forzando corrección: RP = %s', mixto_rp_seats)
+
+    logger.debug('Validaciones completadas: MR=%s, RP=%s, Total=%s', mixto_mr_seats, mixto_rp_seats, max_seats)
+    return mixto_mr_seats, mixto_rp_seats
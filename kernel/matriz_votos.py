@@ -0,0 +1,134 @@
+"""
+Matriz densa de votos distrito × partido.
+
+Representación compacta de los cómputos de un año: una matriz int64 contigua
+(una fila por distrito, una columna por partido) más arreglos enteros de
+entidad y distrito, y el mapa nombre de partido <-> columna. Ganadores MR,
+totales por estado y totales nacionales se obtienen como reducciones
+argmax/sum sobre ella, sin reconstruir DataFrames en cada petición.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Columnas numéricas de los cómputos que no son votos por partido
+COLUMNAS_NO_PARTIDO = {'DISTRITO', 'TOTAL_BOLETAS', 'TOTAL_PARTIDOS_SUM', 'ANIO'}
+
+
+def _solo_lectura(arr):
+    arr = np.ascontiguousarray(arr)
+    arr.flags.writeable = False
+    return arr
+
+
+class MatrizVotos:
+    """
+    votos: ndarray int64 (distritos × partidos), filas ordenadas por (entidad, distrito)
+    partidos: nombres de columna en el orden de los cómputos
+    entidades: nombres de entidad; entidad_idx indexa esta lista
+    entidad_idx: ndarray int por fila
+    distrito: ndarray int por fila
+    """
+
+    def __init__(self, votos, partidos, entidades, entidad_idx, distrito):
+        self.votos = _solo_lectura(np.asarray(votos, dtype=np.int64))
+        self.partidos = tuple(partidos)
+        self.col: Dict[str, int] = {p: i for i, p in enumerate(self.partidos)}
+        self.entidades = tuple(entidades)
+        self.entidad_idx = _solo_lectura(np.asarray(entidad_idx, dtype=np.intp))
+        self.distrito = _solo_lectura(np.asarray(distrito, dtype=np.int64))
+        # Las filas vienen agrupadas por entidad: inicio de cada bloque para reduceat
+        cambios = np.flatnonzero(self.entidad_idx[1:] != self.entidad_idx[:-1]) + 1
+        self._inicios_entidad = np.concatenate(([0], cambios)) if self.n_distritos else np.zeros(0, dtype=np.intp)
+        # Reducciones ya calculadas, compartidas entre escenarios y peticiones
+        # (la matriz es inmutable, así que nunca se invalidan)
+        self._memo: Dict[tuple, np.ndarray] = {}
+
+    def _memorizar(self, nombre, partidos, calcular):
+        clave = (nombre, tuple(partidos))
+        res = self._memo.get(clave)
+        if res is None:
+            res = _solo_lectura(calcular())
+            self._memo[clave] = res
+        return res
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, partidos: Optional[Sequence[str]] = None) -> 'MatrizVotos':
+        """
+        Construye la matriz a partir de cómputos ya normalizados (columna
+        ENTIDAD y, si existe, DISTRITO). Las filas quedan ordenadas por
+        (entidad, distrito), el mismo orden que groupby(['ENTIDAD','DISTRITO']).
+        """
+        if partidos is None:
+            partidos = [
+                c for c in df.columns
+                if c not in COLUMNAS_NO_PARTIDO and c != 'ENTIDAD' and pd.api.types.is_numeric_dtype(df[c])
+            ]
+        else:
+            partidos = [c for c in df.columns if c in partidos]
+
+        if 'ENTIDAD' in df.columns:
+            entidad_idx, entidades = pd.factorize(df['ENTIDAD'], sort=True)
+            entidades = list(entidades)
+        else:
+            entidad_idx, entidades = np.zeros(len(df), dtype=np.intp), ['']
+        if 'DISTRITO' in df.columns:
+            distrito = pd.to_numeric(df['DISTRITO'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+        else:
+            distrito = np.zeros(len(df), dtype=np.int64)
+
+        votos = df[partidos].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        votos = np.rint(votos).astype(np.int64)
+
+        orden = np.lexsort((distrito, entidad_idx))
+        return cls(votos[orden], partidos, entidades, entidad_idx[orden], distrito[orden])
+
+    # --- Selección de columnas ---
+    def columnas(self, partidos: Sequence[str]) -> List[str]:
+        """Partidos presentes en la matriz, en el orden de sus columnas."""
+        return [p for p in self.partidos if p in set(partidos)]
+
+    def indices(self, partidos: Sequence[str]) -> np.ndarray:
+        return np.array([self.col[p] for p in partidos], dtype=np.intp)
+
+    def submatriz(self, partidos: Sequence[str]) -> np.ndarray:
+        """Votos distrito × partido solo para las columnas pedidas (en ese orden)."""
+        return self.votos[:, self.indices(partidos)]
+
+    # --- Reducciones ---
+    @property
+    def n_distritos(self) -> int:
+        return self.votos.shape[0]
+
+    @property
+    def n_entidades(self) -> int:
+        return len(self.entidades)
+
+    def totales_nacionales(self, partidos: Sequence[str]) -> np.ndarray:
+        return self._memorizar('nacional', partidos, lambda: self.submatriz(partidos).sum(axis=0))
+
+    def totales_estado(self, partidos: Sequence[str]) -> np.ndarray:
+        """Votos entidad × partido (filas en el orden de self.entidades)."""
+        def calcular():
+            sub = self.submatriz(partidos)
+            if not self.n_distritos:
+                return np.zeros((self.n_entidades, sub.shape[1]), dtype=np.int64)
+            return np.add.reduceat(sub, self._inicios_entidad, axis=0)
+        return self._memorizar('estado', partidos, calcular)
+
+    def distritos_por_estado(self) -> np.ndarray:
+        return np.bincount(self.entidad_idx, minlength=self.n_entidades)
+
+    def ganadores_mr(self, partidos: Sequence[str]) -> np.ndarray:
+        """
+        Índice (dentro de `partidos`) del partido más votado en cada distrito.
+        Empates: gana el primero en el orden de `partidos`, igual que idxmax.
+        """
+        return self._memorizar('ganadores', partidos, lambda: np.argmax(self.submatriz(partidos), axis=1))
+
+    def conteo_ganadores(self, partidos: Sequence[str]) -> Dict[str, int]:
+        """Triunfos MR por partido (solo partidos con al menos uno)."""
+        conteo = np.bincount(self.ganadores_mr(partidos), minlength=len(partidos))
+        return {p: int(c) for p, c in zip(partidos, conteo) if c > 0}
@@ -1,9 +1,18 @@
+import logging
 import pandas as pd
+import numpy as np
 import unicodedata
 import re
 import os
 from kernel.asignadip import asignadip_v2
+from kernel.topes import redistribuir_con_topes
 from kernel.asignacion_por_estado import asignar_rp_por_estado, procesar_diputados_por_estado
+from kernel.datos_electorales import resolver_dataset
+from kernel.coaliciones import MatrizCoaliciones
+from kernel.entidades import nombre_entidad
+from kernel.tiempos import etapa
+
+logger = logging.getLogger(__name__)
 
 # --- Utilidades de texto y normalización ---
 def normalizar_texto(x):
@@ -14,22 +23,11 @@ def normalizar_texto(x):
     return x
 
 def normalize_entidad(x):
-    x = normalizar_texto(x)
-    x = x.replace('MEXICO', 'MÉXICO')
-    x = x.replace('NUEVO LEON', 'NUEVO LEÓN')
-    x = x.replace('QUERETARO', 'QUERÉTARO')
-    x = x.replace('SAN LUIS POTOSI', 'SAN LUIS POTOSÍ')
-    x = x.replace('MICHOACAN', 'MICHOACÁN')
-    x = x.replace('YUCATAN', 'YUCATÁN')
-    x = x.replace('CIUDAD DE MEXICO', 'CIUDAD DE MÉXICO')
-    x = x.replace('ESTADO DE MÉXICO', 'MÉXICO')
-    x = x.replace('MICHOACÁN DE OCAMPO', 'MICHOACÁN')
-    x = x.replace('VERACRUZ DE IGNACIO DE LA LLAVE', 'VERACRUZ')
-    x = x.replace('COAHUILA DE ZARAGOZA', 'COAHUILA')
-    return x
+    # Catálogo único de entidades (kernel/entidades.py)
+    return nombre_entidad(x)
 
 # --- FIX CRÍTICO: Distribución proporcional de votos por coaliciones ---
-def distribuir_votos_coaliciones(votos_partido, df_votos, path_siglado, partidos_base, anio):
+def distribuir_votos_coaliciones(votos_partido, df_votos, siglado, partidos_base, anio):
     """
     FUNCIÓN CRÍTICA: Distribuye votos de coaliciones a partidos individuales
     
@@ -43,250 +41,145 @@ def distribuir_votos_coaliciones(votos_partido, df_votos, path_siglado, partidos
     - Sumar votos de todos los partidos de una coalición
     - Redistribuir proporcionalmente según registros en siglado
     - Resultado: MC tendrá suficientes votos para superar umbral RP
-    """
     
-    import os
+    siglado: MatrizCoaliciones precargada (DatasetElectoral.coaliciones),
+    DataFrame de siglado ya normalizado o ruta al CSV.
+    """
     
-    if not os.path.exists(path_siglado):
-        print(f"[FIX] Sin siglado disponible, manteniendo votos originales")
+    if siglado is None or (isinstance(siglado, str) and not os.path.exists(siglado)):
+        logger.debug('Sin siglado disponible, manteniendo votos originales')
         return votos_partido
     
     try:
-        # Leer siglado
-        df_siglado = pd.read_csv(path_siglado)
-        df_siglado.columns = [c.lower().strip() for c in df_siglado.columns]
+        if isinstance(siglado, MatrizCoaliciones):
+            coaliciones = siglado
+        else:
+            if isinstance(siglado, str):
+                df_siglado = pd.read_csv(siglado)
+                df_siglado.columns = [c.lower().strip() for c in df_siglado.columns]
+            else:
+                df_siglado = siglado
+            coaliciones = MatrizCoaliciones.desde_siglado(df_siglado)
         
         # Verificar columnas mínimas
-        if 'grupo_parlamentario' not in df_siglado.columns or 'coalicion' not in df_siglado.columns:
-            print(f"[FIX] Siglado sin columnas necesarias para distribución")
+        if coaliciones is None:
+            logger.debug('Siglado sin columnas necesarias para distribución')
             return votos_partido
         
-        print(f"[FIX] Iniciando NUEVA ESTRATEGIA de distribución proporcional...")
-        
-        # Detectar coaliciones reales en el siglado
-        coaliciones_reales = {}
-        for _, row in df_siglado.iterrows():
-            coalicion = row['coalicion']
-            partido = row['grupo_parlamentario']
-            
-            if pd.notna(coalicion) and pd.notna(partido):
-                coalicion = str(coalicion).strip()
-                partido = str(partido).strip().upper()
-                
-                if coalicion not in coaliciones_reales:
-                    coaliciones_reales[coalicion] = []
-                if partido not in coaliciones_reales[coalicion]:
-                    coaliciones_reales[coalicion].append(partido)
-        
-        print(f"[FIX] Coaliciones detectadas: {coaliciones_reales}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Coaliciones detectadas: %s', {c: coaliciones.miembros(c) for c in coaliciones.coaliciones})
         
-        # Contar registros por partido en cada coalición (proporción)
-        conteos_coalition = df_siglado.groupby(['coalicion', 'grupo_parlamentario']).size().reset_index(name='registros')
-        
-        # Copiar votos originales
-        votos_distribuidos = votos_partido.copy()
-        
-        # Para cada coalición, redistribuir votos proporcionalmente
-        for coalicion, partidos_coal in coaliciones_reales.items():
-            print(f"[FIX] Procesando coalición: {coalicion}")
-            print(f"[FIX] Partidos en coalición: {partidos_coal}")
-            
-            # NUEVA ESTRATEGIA: Sumar votos de todos los partidos de la coalición
-            votos_coalicion_total = 0
-            partidos_con_votos = []
-            
-            for partido in partidos_coal:
-                if partido in votos_partido:
-                    votos_p = votos_partido[partido]
-                    votos_coalicion_total += votos_p
-                    partidos_con_votos.append(partido)
-                    print(f"[FIX]   {partido}: {votos_p:,} votos")
-            
-            print(f"[FIX] TOTAL votos coalición: {votos_coalicion_total:,}")
-            
-            if votos_coalicion_total > 0 and len(partidos_con_votos) > 1:
-                # Calcular registros totales en la coalición
-                coalition_conteos = conteos_coalition[conteos_coalition['coalicion'] == coalicion]
-                total_registros = coalition_conteos['registros'].sum()
-                
-                print(f"[FIX] Redistribuyendo proporcionalmente...")
-                
-                if total_registros > 0:
-                    # Redistribuir proporcionalmente
-                    for _, row in coalition_conteos.iterrows():
-                        partido = str(row['grupo_parlamentario']).strip().upper()
-                        registros = row['registros']
-                        
-                        if partido in partidos_base:
-                            proporcion = registros / total_registros
-                            votos_partido_nuevo = int(votos_coalicion_total * proporcion)
-                            
-                            # REEMPLAZAR votos (no sumar)
-                            votos_distribuidos[partido] = votos_partido_nuevo
-                            
-                            print(f"[FIX]   {partido}: {registros}/{total_registros} ({proporcion:.1%}) = {votos_partido_nuevo:,} votos (antes: {votos_partido.get(partido, 0):,})")
-            else:
-                print(f"[FIX] Coalición con un solo partido o sin votos, no se redistribuye")
+        # Votos por coalición = membresía × votos nacionales; reparto por registros del siglado
+        votos_distribuidos = coaliciones.redistribuir(votos_partido, partidos_base)
+        if logger.isEnabledFor(logging.DEBUG):
+            for partido, votos in votos_distribuidos.items():
+                if votos != votos_partido.get(partido):
+                    logger.debug('%s: %s votos (antes: %s)', partido, format(votos, ','), format(votos_partido.get(partido, 0), ','))
         
-        print(f"[FIX] Redistribución completada.")
+        logger.debug('Redistribución completada.')
         return votos_distribuidos
         
     except Exception as e:
-        print(f"[ERROR] Error en distribución de coaliciones: {e}")
+        logger.error('Error en distribución de coaliciones: %s', e)
         return votos_partido
 
 # --- Procesamiento principal para diputados ---
 def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=None, max_seats=300, sistema='mixto', mr_seats=None, rp_seats=None, regla_electoral=None, quota_method='hare', divisor_method='dhondt', umbral=None, max_seats_per_party=None):
     """
-    Lee y procesa la base Parquet de diputados, regresa dicts listos para el orquestador.
-    - path_parquet: ruta al archivo Parquet
+    Procesa la base de diputados, regresa dicts listos para el orquestador.
+    - path_parquet: DatasetElectoral precargado o ruta al archivo Parquet
     - partidos_base: lista de partidos válidos
     - anio: año de elección
-    - path_siglado: CSV de siglado por distrito (opcional, para MR)
+    - path_siglado: CSV de siglado por distrito (opcional, para MR; se ignora
+      si path_parquet ya es un DatasetElectoral)
     """
     try:
-        try:
-            print(f"[DEBUG] Leyendo Parquet Diputados: {path_parquet}")
-            df = pd.read_parquet(path_parquet)
-        except Exception as e:
-            print(f"[WARN] Error leyendo Parquet normal, intentando forzar a string y decodificar UTF-8: {e}")
-            import pyarrow.parquet as pq
-            table = pq.read_table(path_parquet)
-            df = table.to_pandas()
-            for col in df.columns:
-                if df[col].dtype == object:
-                    df[col] = df[col].apply(lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x)
-        print(f"[DEBUG] Parquet Diputados columnas: {df.columns.tolist()}")
-        print(f"[DEBUG] Parquet Diputados shape: {df.shape}")
-        # Normaliza nombres de columnas
-        df.columns = [normalizar_texto(c) for c in df.columns]
-        # Normaliza entidad y distrito
-        if 'ENTIDAD' in df.columns:
-            df['ENTIDAD'] = df['ENTIDAD'].apply(lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x)
-            df['ENTIDAD'] = df['ENTIDAD'].apply(normalize_entidad)
-        if 'DISTRITO' in df.columns:
-            df['DISTRITO'] = pd.to_numeric(df['DISTRITO'], errors='coerce').fillna(0).astype(int)
+        with etapa('datos'):
+            dataset = resolver_dataset(path_parquet, 'diputados', anio=anio, path_siglado=path_siglado)
+        logger.debug('Dataset Diputados: %s', dataset.path_parquet)
+        df = dataset.computos
+        sig = dataset.siglado
+        matriz = dataset.matriz
+        logger.debug('Parquet Diputados columnas: %s', df.columns.tolist())
+        logger.debug('Parquet Diputados shape: %s', df.shape)
     except Exception as e:
-        print(f"[ERROR] procesar_diputados_parquet: {e}")
+        logger.error('procesar_diputados_parquet: %s', e)
         return []
     # Suma votos por partido (solo columnas de partidos)
-    votos_cols = [c for c in df.columns if c in partidos_base]
-    print(f"[DEBUG] Columnas de votos detectadas Diputados: {votos_cols}")
+    votos_cols = matriz.columnas(partidos_base)
+    logger.debug('Columnas de votos detectadas Diputados: %s', votos_cols)
     if not votos_cols:
-        print(f"[WARN] No se detectaron columnas de votos válidas en Diputados. Partidos base: {partidos_base}")
-    votos_partido = df[votos_cols].sum().to_dict()
-    print(f"[DEBUG] votos_partido Diputados (ANTES de distribución coaliciones): {votos_partido}")
+        logger.warning('No se detectaron columnas de votos válidas en Diputados. Partidos base: %s', partidos_base)
+    votos_partido = dict(zip(votos_cols, matriz.totales_nacionales(votos_cols).tolist()))
+    logger.debug('votos_partido Diputados (ANTES de distribución coaliciones): %s', votos_partido)
     
     # FIX CRÍTICO: Distribuir votos de coaliciones a partidos individuales
-    if path_siglado and os.path.exists(path_siglado):
-        print(f"[FIX] Aplicando distribución proporcional de votos por coaliciones...")
-        votos_partido = distribuir_votos_coaliciones(votos_partido, df, path_siglado, partidos_base, anio)
-        print(f"[DEBUG] votos_partido Diputados (DESPUÉS de distribución coaliciones): {votos_partido}")
+    if sig is not None:
+        logger.debug('Aplicando distribución proporcional de votos por coaliciones...')
+        with etapa('coaliciones'):
+            votos_partido = distribuir_votos_coaliciones(votos_partido, df, dataset.coaliciones or sig, partidos_base, anio)
+        logger.debug('votos_partido Diputados (DESPUÉS de distribución coaliciones): %s', votos_partido)
     
-    indep = int(df['CI'].sum()) if 'CI' in df.columns else 0
-    print(f"[DEBUG] Independientes Diputados: {indep}")
+    indep = int(matriz.totales_nacionales(['CI'])[0]) if 'CI' in matriz.col else 0
+    logger.debug('Independientes Diputados: %s', indep)
     # CÁLCULO CORRECTO DE MR: Ganador por distrito basado en votos
-    print(f"[DEBUG] Calculando ganadores MR por distrito...")
+    logger.debug('Calculando ganadores MR por distrito...')
     
-    # Calcular ganador por distrito usando los votos del parquet
-    ganadores_por_distrito = df.groupby(['ENTIDAD','DISTRITO'])[votos_cols].sum().idxmax(axis=1)
-    mr_calculado = ganadores_por_distrito.value_counts().to_dict()
-    print(f"[DEBUG] MR Diputados (calculado por votos): {mr_calculado}")
-    print(f"[DEBUG] Total distritos MR: {sum(mr_calculado.values())}")
+    # Calcular ganador por distrito: argmax por fila de la matriz de votos
+    # (filas en orden (ENTIDAD, DISTRITO), columnas restringidas a votos_cols)
+    with etapa('mr'):
+        mr_calculado = matriz.conteo_ganadores(votos_cols)
+    logger.debug('MR Diputados (calculado por votos): %s', mr_calculado)
+    logger.debug('Total distritos MR: %s', sum(mr_calculado.values()))
     
     # Si hay siglado, SIEMPRE usar método híbrido (FIX CRÍTICO)
-    if path_siglado is not None and os.path.exists(path_siglado):
-        print(f"[FIX] FORZANDO método híbrido con siglado: {path_siglado}")
-        sig = pd.read_csv(path_siglado)
-        print(f"[DEBUG] Siglado Diputados columnas: {sig.columns.tolist()}")
-        print(f"[DEBUG] Siglado Diputados shape: {sig.shape}")
-        
-        # Normalizar columnas siglado
-        sig.columns = [c.lower().strip() for c in sig.columns]
+    if sig is not None:
+        logger.debug('FORZANDO método híbrido con siglado: %s', dataset.path_siglado)
+        logger.debug('Siglado Diputados columnas: %s', sig.columns.tolist())
+        logger.debug('Siglado Diputados shape: %s', sig.shape)
         
         # INTENTAR MÉTODO HÍBRIDO COMPLETO PRIMERO
-        if all(col in sig.columns for col in ['entidad_ascii', 'distrito', 'coalicion', 'grupo_parlamentario']):
-            print(f"[FIX] Aplicando método híbrido COMPLETO (votos + siglado + coaliciones)")
-            
-            # Construir mapeo de partido a coalición desde el siglado del año específico
-            def construir_mapeo_coaliciones(sig_df):
-                """Construye mapeo partido->coalición dinámicamente desde el siglado"""
-                mapeo = {}
-                for _, row in sig_df.iterrows():
-                    partido = row['grupo_parlamentario']
-                    coalicion = row['coalicion']
-                    if pd.notna(partido) and pd.notna(coalicion):
-                        partido = str(partido).upper().strip()
-                        coalicion = str(coalicion).strip()
-                        mapeo[partido] = coalicion
-                return mapeo
-            
-            mapeo_partido_coalicion = construir_mapeo_coaliciones(sig)
-            print(f"[DEBUG] Mapeo partido->coalición detectado: {mapeo_partido_coalicion}")
-            
-            def coalicion_de_partido(partido):
-                """Obtiene coalición del partido usando mapeo dinámico del año"""
-                return mapeo_partido_coalicion.get(str(partido).upper().strip(), None)
-            
-            # Preparar datos de ganadores por votos
-            ganadores_lista = ganadores_por_distrito.tolist()
-            df_ganadores = pd.DataFrame({
-                'entidad_ascii': df['ENTIDAD'].apply(lambda x: normalize_entidad(x).replace("MÉXICO", "MEXICO").replace("NUEVO LEÓN", "NUEVO LEON").replace("QUERÉTARO", "QUERETARO").replace("SAN LUIS POTOSÍ", "SAN LUIS POTOSI").replace("MICHOACÁN", "MICHOACAN").replace("YUCATÁN", "YUCATAN")),
-                'distrito': df['DISTRITO'],
-                'partido_ganador': ganadores_lista,
-                'coalicion': [coalicion_de_partido(p) for p in ganadores_lista]
-            })
-            
-            # Normalizar siglado
-            sig['entidad_ascii'] = sig['entidad_ascii'].str.upper().str.strip()
-            sig['distrito'] = pd.to_numeric(sig['distrito'], errors='coerce')
-            sig['grupo_parlamentario'] = sig['grupo_parlamentario'].str.upper().str.strip()
-            sig['coalicion'] = sig['coalicion'].str.strip()
-            
-            # Merge híbrido
-            df_hibrido = pd.merge(
-                df_ganadores,
-                sig,
-                on=['entidad_ascii', 'distrito', 'coalicion'],
-                how='left'
-            )
-            
-            # Usar grupo_parlamentario si hay match, sino partido_ganador
-            df_hibrido['partido_final'] = df_hibrido['grupo_parlamentario'].fillna(df_hibrido['partido_ganador'])
+        if dataset.indice_mr is not None:
+            logger.debug('Aplicando método híbrido COMPLETO (votos + siglado + coaliciones)')
+            indice = dataset.indice_mr
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Mapeo partido->coalición detectado: %s', {p: dataset.coaliciones.coaliciones[c] for p, c in indice.coalicion_partido.items()})
             
-            # Actualizar conteo MR con resultado híbrido
-            mr_diputados_hibrido = df_hibrido['partido_final'].value_counts().to_dict()
-            print(f"[DEBUG] MR Diputados (método híbrido COMPLETO): {mr_diputados_hibrido}")
+            # Ganador de cada distrito -> grupo parlamentario del siglado para
+            # (distrito, coalición del ganador); sin registro se queda el ganador
+            with etapa('mr'):
+                mr_diputados_hibrido = indice.conteo(matriz.ganadores_mr(votos_cols), votos_cols)
+            logger.debug('MR Diputados (método híbrido COMPLETO): %s', mr_diputados_hibrido)
             
             # Usar resultado híbrido
             mr = mr_diputados_hibrido
             
         # FALLBACK: Si no tiene todas las columnas, usar siglado directo
         elif 'grupo_parlamentario' in sig.columns:
-            print(f"[FIX] Aplicando método híbrido SIMPLE (solo siglado)")
+            logger.debug('Aplicando método híbrido SIMPLE (solo siglado)')
             mr_siglado_count = sig['grupo_parlamentario'].value_counts().to_dict()
-            print(f"[DEBUG] MR Diputados (siglado directo): {mr_siglado_count}")
+            logger.debug('MR Diputados (siglado directo): %s', mr_siglado_count)
             mr = mr_siglado_count
             
         else:
-            print(f"[WARN] Siglado sin columnas mínimas, usando cálculo por votos")
+            logger.warning('Siglado sin columnas mínimas, usando cálculo por votos')
             mr = mr_calculado
         
         # mr ya se asignó dentro del if/else anterior
     else:
-        print(f"[DEBUG] Sin siglado - usando cálculo directo por votos")
+        logger.debug('Sin siglado - usando cálculo directo por votos')
         mr = mr_calculado
     mr_aligned = {p: int(mr.get(p, 0)) for p in partidos_base}
     
     # ESCALADO INTELIGENTE: Redimensionar MR según mr_seats si está especificado
     if mr_seats is not None and mr_seats != sum(mr_aligned.values()):
         total_mr_original = sum(mr_aligned.values())
-        print(f"[DEBUG] 🎯 ESCALADO INTELIGENTE: {total_mr_original} → {mr_seats} escaños")
+        logger.debug('🎯 ESCALADO INTELIGENTE: %s → %s escaños', total_mr_original, mr_seats)
         
         if total_mr_original > 0:
             # Calcular factor de escalado
             factor_escalado = mr_seats / total_mr_original
-            print(f"[DEBUG] 📊 Factor de escalado: {factor_escalado:.3f}")
+            logger.debug('📊 Factor de escalado: %.3f', factor_escalado)
             
             # PASO 1: Aplicar escalado básico con decimales
             mr_flotante = {}
@@ -295,7 +188,7 @@ def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=N
                 escanos_escalados = escanos_originales * factor_escalado
                 mr_flotante[partido] = escanos_escalados
                 if escanos_originales > 0:  # Solo mostrar partidos con escaños
-                    print(f"[DEBUG] 📈 {partido}: {escanos_originales} × {factor_escalado:.3f} = {escanos_escalados:.2f}")
+                    logger.debug('📈 %s: %s × %.3f = %.2f', partido, escanos_originales, factor_escalado, escanos_escalados)
             
             # PASO 2: Redondeo inteligente (mantener proporciones)
             mr_adjusted = {}
@@ -314,7 +207,7 @@ def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=N
             
             # PASO 3: Distribuir escaños restantes por decimales más altos
             escanos_restantes = mr_seats - escanos_asignados
-            print(f"[DEBUG] 🔢 Escaños por decimales: {escanos_restantes}")
+            logger.debug('🔢 Escaños por decimales: %s', escanos_restantes)
             
             # Ordenar por decimal descendente
             decimales_pendientes.sort(key=lambda x: x[1], reverse=True)
@@ -322,14 +215,14 @@ def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=N
             for i in range(min(escanos_restantes, len(decimales_pendientes))):
                 partido, decimal = decimales_pendientes[i]
                 mr_adjusted[partido] += 1
-                print(f"[DEBUG] 🎲 {partido} gana 1 escaño adicional (decimal: {decimal:.3f})")
+                logger.debug('🎲 %s gana 1 escaño adicional (decimal: %.3f)', partido, decimal)
             
             # Verificación final
             total_final = sum(mr_adjusted.values())
             if total_final == mr_seats:
-                print(f"[DEBUG] ✅ Escalado perfecto: {total_final} escaños")
+                logger.debug('✅ Escalado perfecto: %s escaños', total_final)
             else:
-                print(f"[DEBUG] ⚠️ Ajuste pendiente: {total_final} vs {mr_seats}")
+                logger.debug('⚠️ Ajuste pendiente: %s vs %s', total_final, mr_seats)
                 
                 # Ajuste fino si hay diferencia
                 diferencia = mr_seats - total_final
@@ -345,11 +238,11 @@ def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=N
                             mr_adjusted[partidos_ordenados[i % len(partidos_ordenados)]] -= 1
             
             mr_aligned = mr_adjusted
-            print(f"[DEBUG] 🏆 RESULTADO ESCALADO: {mr_aligned}")
+            logger.debug('🏆 RESULTADO ESCALADO: %s', mr_aligned)
         else:
-            print(f"[DEBUG] ❌ No se puede escalar desde 0 escaños")
+            logger.debug('❌ No se puede escalar desde 0 escaños')
     
-    print(f"[DEBUG] MR Diputados alineado: {mr_aligned}")
+    logger.debug('MR Diputados alineado: %s', mr_aligned)
     
     # Usar umbral del parámetro o valor por defecto
     if umbral is None:
@@ -357,22 +250,21 @@ def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=N
     
     # Normaliza umbral: si es >=1, interpreta como porcentaje (3 -> 0.03)
     if umbral >= 1:
-        print(f"[WARN] El umbral recibido es {umbral}, se interpreta como porcentaje: {umbral/100}")
+        logger.warning('El umbral recibido es %s, se interpreta como porcentaje: %s', umbral, umbral / 100)
         umbral = umbral / 100
-    print(f"[DEBUG] Umbral usado para filtro: {umbral}")
+    logger.debug('Umbral usado para filtro: %s', umbral)
     
     # Aplica umbral a votos_ok
     total_votos_validos = sum(votos_partido.values())
     votos_ok = {p: int(votos_partido.get(p, 0)) if total_votos_validos > 0 and (votos_partido.get(p, 0)/total_votos_validos) >= umbral else 0 for p in partidos_base}
     ssd = {p: int(mr_aligned.get(p, 0)) for p in partidos_base}
-    print(f"[DEBUG] votos_ok Diputados: {votos_ok}")
-    print(f"[DEBUG] ssd Diputados: {ssd}")
+    logger.debug('votos_ok Diputados: %s', votos_ok)
+    logger.debug('ssd Diputados: %s', ssd)
 
     # Validar suma de votos_ok tras aplicar umbral
     suma_votos_ok = sum(votos_ok.values())
     if suma_votos_ok == 0:
-        import logging
-        logging.error("[ERROR] La suma de votos tras aplicar el umbral es cero. No se pueden calcular escaños.")
+        logger.error('La suma de votos tras aplicar el umbral es cero. No se pueden calcular escaños.')
         raise ValueError("La suma de votos tras aplicar el umbral es cero. No se pueden calcular escaños.")
     # Determinar m (RP) y S (total) según sistema
     sistema_tipo = sistema.lower() if sistema else 'mixto'
@@ -385,12 +277,13 @@ def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=N
     else:  # mixto
         m = rp_seats if rp_seats is not None else (max_seats // 2)
         S = mr_seats + m if mr_seats is not None else max_seats
-    print(f"[DEBUG] sistema: {sistema_tipo}, m (RP): {m}, S (S): {S}, max_seats: {max_seats}")
+    logger.debug('sistema: %s, m (RP): %s, S (S): %s, max_seats: %s', sistema_tipo, m, S, max_seats)
     
     # Si es sistema RP puro, usar asignación por estado
     if sistema_tipo == 'rp' and m > 0:
-        print(f"[DEBUG] Sistema RP puro - usando asignación por estado")
-        resultado_por_estado = asignar_rp_por_estado(df, partidos_base, quota_method, divisor_method, umbral)
+        logger.debug('Sistema RP puro - usando asignación por estado')
+        with etapa('asignacion'):
+            resultado_por_estado = asignar_rp_por_estado(matriz, partidos_base, quota_method, divisor_method, umbral)
         
         # Para RP puro, usar directamente los resultados por estado
         res = {
@@ -405,87 +298,68 @@ def procesar_diputados_parquet(path_parquet, partidos_base, anio, path_siglado=N
         
     # Si es sistema mixto, usar método tradicional nacional con topes
     elif sistema_tipo == 'mixto':
-        print(f"[DEBUG] Sistema mixto - usando método tradicional nacional con topes")
+        logger.debug('Sistema mixto - usando método tradicional nacional con topes')
         # Usar asignadip_v2 con MR reales + RP nacional + topes
-        res = asignadip_v2(
-            votos_ok, ssd, indep=indep, nulos=0, no_reg=0, m=m, S=S,
-            threshold=umbral, max_seats=max_seats, max_pp=0.08, apply_caps=True,
-            quota_method=quota_method, divisor_method=divisor_method
-        )
+        with etapa('asignacion'):
+            res = asignadip_v2(
+                votos_ok, ssd, indep=indep, nulos=0, no_reg=0, m=m, S=S,
+                threshold=umbral, max_seats=max_seats, max_pp=0.08, apply_caps=True,
+                quota_method=quota_method, divisor_method=divisor_method
+            )
         
     else:
         # Sistema MR puro o fallback al método original
-        res = asignadip_v2(
-            votos_ok, ssd, indep=indep, nulos=0, no_reg=0, m=m, S=S,
-            threshold=umbral, max_seats=max_seats, max_pp=0.08, apply_caps=True,
-            quota_method=quota_method, divisor_method=divisor_method
-        )
-    print(f"[DEBUG] Resultado asignadip_v2: {res}")
+        with etapa('asignacion'):
+            res = asignadip_v2(
+                votos_ok, ssd, indep=indep, nulos=0, no_reg=0, m=m, S=S,
+                threshold=umbral, max_seats=max_seats, max_pp=0.08, apply_caps=True,
+                quota_method=quota_method, divisor_method=divisor_method
+            )
+    logger.debug('Resultado asignadip_v2: %s', res)
     
     # APLICAR TOPE DE ESCAÑOS POR PARTIDO si está especificado
     if max_seats_per_party is not None and max_seats_per_party > 0:
-        print(f"[DEBUG] 🎚️ APLICANDO tope de escaños por partido: {max_seats_per_party}")
+        logger.debug('🎚️ APLICANDO tope de escaños por partido: %s', max_seats_per_party)
         
         # 1. Calcular totales iniciales
         for partido in res['tot']:
             res['tot'][partido] = res['mr'][partido] + res['rp'][partido]
         
-        # 2. Identificar partidos que superan el tope y acumular sobrantes
-        total_sobrantes = 0
-        partidos_con_tope = []
+        # 2. Recortar partidos que superan el tope y repartir los sobrantes entre
+        # los partidos con votos que no han alcanzado el tope (proporcional a votos)
+        partidos = list(res['tot'])
+        tot_antes = np.array([res['tot'][p] for p in partidos], dtype=np.int64)
+        with etapa('topes'):
+            tot_nuevo = redistribuir_con_topes(
+                tot_antes,
+                [votos_ok[p] for p in partidos],
+                max_seats_per_party,
+                elegibles=[votos_ok[p] > 0 for p in partidos],
+            )
         
-        for partido in res['tot']:
-            if res['tot'][partido] > max_seats_per_party:
-                sobrante = res['tot'][partido] - max_seats_per_party
-                total_sobrantes += sobrante
-                partidos_con_tope.append(partido)
-                
+        for partido, total_original, total_nuevo in zip(partidos, tot_antes, tot_nuevo):
+            if total_original > max_seats_per_party:
                 # Reducir proporcionalmente MR y RP para llegar al tope
-                total_original = res['tot'][partido]
                 factor_reduccion = max_seats_per_party / total_original
                 
                 mr_nuevo = int(res['mr'][partido] * factor_reduccion)
                 rp_nuevo = max_seats_per_party - mr_nuevo
                 
-                print(f"[WARN] Tope aplicado: {partido} tenía {total_original} (MR:{res['mr'][partido]}, RP:{res['rp'][partido]}) → {max_seats_per_party} (MR:{mr_nuevo}, RP:{rp_nuevo})")
+                logger.warning('Tope aplicado: %s tenía %s (MR:%s, RP:%s) → %s (MR:%s, RP:%s)', partido, total_original, res['mr'][partido], res['rp'][partido], max_seats_per_party, mr_nuevo, rp_nuevo)
                 
                 res['mr'][partido] = mr_nuevo
                 res['rp'][partido] = rp_nuevo
                 res['tot'][partido] = max_seats_per_party
+            elif total_nuevo > total_original:
+                # Los sobrantes se asignan a RP
+                res['rp'][partido] += int(total_nuevo - total_original)
+                res['tot'][partido] = int(total_nuevo)
+        total_sobrantes = int(tot_antes.sum() - tot_nuevo.sum())
         
-        # 3. Redistribuir sobrantes a partidos que no han alcanzado el tope
-        if total_sobrantes > 0:
-            partidos_elegibles = [p for p in res['tot'] if res['tot'][p] < max_seats_per_party and votos_ok[p] > 0]
-            
-            if partidos_elegibles:
-                print(f"[DEBUG] Redistribuyendo {total_sobrantes} escaños sobrantes entre {len(partidos_elegibles)} partidos elegibles")
-                
-                # Redistribución proporcional por votos entre partidos elegibles
-                votos_elegibles = {p: votos_ok[p] for p in partidos_elegibles}
-                total_votos_elegibles = sum(votos_elegibles.values())
-                
-                if total_votos_elegibles > 0:
-                    for partido in partidos_elegibles:
-                        proporcion = votos_elegibles[partido] / total_votos_elegibles
-                        asignar = min(int(total_sobrantes * proporcion), max_seats_per_party - res['tot'][partido])
-                        
-                        # Asignar preferentemente a RP
-                        res['rp'][partido] += asignar
-                        res['tot'][partido] += asignar
-                        total_sobrantes -= asignar
-                    
-                    # Asignar escaños restantes uno por uno (round-robin)
-                    while total_sobrantes > 0:
-                        for partido in partidos_elegibles:
-                            if total_sobrantes > 0 and res['tot'][partido] < max_seats_per_party:
-                                res['rp'][partido] += 1
-                                res['tot'][partido] += 1
-                                total_sobrantes -= 1
-        
-        print(f"[DEBUG] ✅ Tope aplicado correctamente - Sobrantes redistribuidos: {total_sobrantes == 0}")
+        logger.debug('✅ Tope aplicado correctamente - Sobrantes redistribuidos: %s', total_sobrantes == 0)
     else:
-        print(f"[DEBUG] 🎚️ TOPE DE ESCAÑOS max_seats_per_party: {max_seats_per_party}")
-        print(f"[DEBUG] ❌ No se aplica tope de escaños (valor={max_seats_per_party})")
+        logger.debug('🎚️ TOPE DE ESCAÑOS max_seats_per_party: %s', max_seats_per_party)
+        logger.debug('❌ No se aplica tope de escaños (valor=%s)', max_seats_per_party)
     
     # Retornar el resultado en formato diccionario (compatible con wrapper)
     return res
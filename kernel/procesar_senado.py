@@ -1,23 +1,17 @@
+import logging
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import os
 import re
+from functools import lru_cache
+from kernel.entidades import id_entidad, ascii_entidad, normalizar_entidades
+
+logger = logging.getLogger(__name__)
 
 def normalize_entidad_ascii(entidad: str) -> str:
-    """Normaliza nombres de entidad como hace R"""
-    entidad = str(entidad).upper().strip()
-    
-    # Aplicar mismas reglas que R
-    entidad = entidad.replace("CIUDAD DE MÉXICO", "CIUDAD DE MEXICO")
-    entidad = entidad.replace("MÉXICO", "MEXICO") 
-    entidad = entidad.replace("NUEVO LEÓN", "NUEVO LEON")
-    entidad = entidad.replace("QUERÉTARO", "QUERETARO")
-    entidad = entidad.replace("SAN LUIS POTOSÍ", "SAN LUIS POTOSI")
-    entidad = entidad.replace("MICHOACÁN", "MICHOACAN")
-    entidad = entidad.replace("YUCATÁN", "YUCATAN")
-    
-    return entidad
+    """Normaliza nombres de entidad como hace R (catálogo único, sin acentos)"""
+    return ascii_entidad(entidad)
 
 def canonizar_siglado(texto: str) -> str:
     """Canoniza texto de siglado como hace R"""
@@ -113,7 +107,7 @@ def leer_siglado_senado(ruta_siglado: str) -> pd.DataFrame:
     """Lee el archivo de siglado de senado (formato largo)"""
     try:
         df = pd.read_csv(ruta_siglado, encoding='utf-8')
-        print(f"Columnas encontradas en siglado: {list(df.columns)}")
+        logger.debug('Columnas encontradas en siglado: %s', list(df.columns))
         
         df.columns = df.columns.str.upper()
         
@@ -129,7 +123,7 @@ def leer_siglado_senado(ruta_siglado: str) -> pd.DataFrame:
         
         # Normalizar datos
         if 'ENTIDAD_ASCII' not in df.columns:
-            df['ENTIDAD_ASCII'] = df['ENTIDAD'].apply(normalize_entidad_ascii)
+            df['ENTIDAD_ASCII'] = normalizar_entidades(df['ENTIDAD'], ascii=True)
         
         df['COALICION'] = df['COALICION'].astype(str).str.upper().str.strip()
         df['FORMULA'] = df['FORMULA'].astype(int)
@@ -143,7 +137,7 @@ def leer_siglado_senado(ruta_siglado: str) -> pd.DataFrame:
         return df[['ENTIDAD_ASCII', 'COALICION', 'FORMULA', 'GRUPO_PARLAMENTARIO', 'PARTIDO_ORIGEN']]
     
     except Exception as e:
-        print(f"Error leyendo siglado senado: {e}")
+        logger.error('Error leyendo siglado senado: %s', e)
         return pd.DataFrame()
 
 def procesar_votos_senado(df_raw: pd.DataFrame, anio: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -168,7 +162,7 @@ def procesar_votos_senado(df_raw: pd.DataFrame, anio: int) -> Tuple[pd.DataFrame
     df_boleta = df_raw[keep_cols].copy()
     
     # Normalizar entidad
-    df_boleta['ENTIDAD'] = df_boleta['ENTIDAD'].apply(normalize_entidad_ascii)
+    df_boleta['ENTIDAD'] = normalizar_entidades(df_boleta['ENTIDAD'], ascii=True)
     
     # Convertir a numérico
     for col in candidatura_cols:
@@ -196,167 +190,193 @@ def procesar_votos_senado(df_raw: pd.DataFrame, anio: int) -> Tuple[pd.DataFrame
     
     return df_boleta, df_acred
 
-def determinar_coalicion_ganadora(entidad: str, df_boleta: pd.DataFrame, anio: int) -> str:
-    """Determina la coalición ganadora en una entidad"""
+@lru_cache(maxsize=None)
+def membresia_candidaturas(columnas: Tuple[str, ...], anio: int) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """
+    Contendientes por entidad y su matriz de membresía (contendientes × columnas).
+    
+    Contendientes: las coaliciones del año (en su orden) y después los
+    partidos que compiten solos, en el orden de sus columnas. Una columna de
+    candidatura (p. ej. 'PAN_PRD') cuenta para una coalición si todos sus
+    partidos están en ella. Se calcula una vez por conjunto de columnas.
+    """
     coaliciones = obtener_coaliciones_por_anio(anio)
+    partidos = obtener_partidos_por_anio(anio)
+    en_coalicion = {p for partidos_coal in coaliciones.values() for p in partidos_coal}
+    
+    contendientes = list(coaliciones)
+    filas = [
+        [all(token in partidos_coal for token in col.split('_') if token) for col in columnas]
+        for partidos_coal in coaliciones.values()
+    ]
+    for j, col in enumerate(columnas):
+        tokens = col.split('_')
+        if len(tokens) == 1 and tokens[0] in partidos and tokens[0] not in en_coalicion:
+            contendientes.append(tokens[0])
+            filas.append([k == j for k in range(len(columnas))])
+    
+    membresia = np.array(filas, dtype=float).reshape(len(contendientes), len(columnas))
+    membresia.flags.writeable = False
+    return tuple(contendientes), membresia
+
+
+def primeros_lugares(df_boleta: pd.DataFrame, anio: int) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Primer y segundo lugar de todas las entidades en una pasada.
+    
+    Votos por contendiente = votos por candidatura (entidades × columnas) por
+    la membresía transpuesta; el orden sale de un solo argsort estable (a
+    igualdad de votos queda primero el contendiente listado antes).
     
-    # Obtener fila de la entidad
+    Retorna: (entidades, ganadores, segundos); '' si no hay contendiente
+    """
+    columnas = tuple(c for c in df_boleta.columns if c != 'ENTIDAD')
+    contendientes, membresia = membresia_candidaturas(columnas, anio)
+    entidades = df_boleta['ENTIDAD'].tolist()
+    if not contendientes:
+        return entidades, [''] * len(entidades), [''] * len(entidades)
+    
+    votos = df_boleta[list(columnas)].to_numpy(dtype=float) @ membresia.T
+    orden = np.argsort(-votos, axis=1, kind='stable')
+    nombres = np.array(contendientes + ('',), dtype=object)
+    ganadores = nombres[orden[:, 0]].tolist()
+    segundos = nombres[orden[:, 1] if len(contendientes) > 1 else np.full(len(entidades), -1)].tolist()
+    return entidades, ganadores, segundos
+
+
+def determinar_coalicion_ganadora(entidad: str, df_boleta: pd.DataFrame, anio: int) -> str:
+    """Determina la coalición ganadora en una entidad"""
     fila = df_boleta[df_boleta['ENTIDAD'] == entidad]
     if fila.empty:
         return ''
+    return primeros_lugares(fila.iloc[:1], anio)[1][0]
+
+def _clave_entidad(entidad):
+    # Id del catálogo de entidades; nombres fuera del catálogo se comparan en ASCII
+    i = id_entidad(entidad)
+    return i if i is not None else ascii_entidad(entidad)
+
+
+class IndiceSigladoSenado:
+    """
+    Siglado de senado indexado por (entidad, coalición, fórmula) -> grupo parlamentario.
     
-    fila = fila.iloc[0]
-    votos_coalicion = {}
+    La entidad se identifica por su id del catálogo (kernel/entidades.py).
+    Para cada llave se guarda el primer registro del siglado ya resuelto
+    (GRUPO_PARLAMENTARIO o, si viene vacío, PARTIDO_ORIGEN); '' si ninguno.
+    """
     
-    # Calcular votos por coalición
-    for nombre_coalicion, partidos in coaliciones.items():
-        votos = 0
-        for col in df_boleta.columns:
-            if col == 'ENTIDAD':
-                continue
-            tokens = col.split('_')
-            if all(token in partidos for token in tokens if token):
-                votos += fila[col]
-        votos_coalicion[nombre_coalicion] = votos
+    def __init__(self, grupos: Dict[Tuple, str]):
+        self.grupos = grupos
     
-    # Agregar partidos independientes
-    for col in df_boleta.columns:
-        if col == 'ENTIDAD':
+    @classmethod
+    def desde_siglado(cls, df_siglado: pd.DataFrame) -> 'IndiceSigladoSenado':
+        grupos = {}
+        if df_siglado is None or df_siglado.empty:
+            return cls(grupos)
+        
+        claves_entidad = {e: _clave_entidad(e) for e in df_siglado['ENTIDAD_ASCII'].unique()}
+        if 'PARTIDO_ORIGEN' in df_siglado.columns:
+            origenes = df_siglado['PARTIDO_ORIGEN']
+        else:
+            origenes = [None] * len(df_siglado)
+        
+        for entidad, coalicion, formula, gp, po in zip(
+            df_siglado['ENTIDAD_ASCII'], df_siglado['COALICION'], df_siglado['FORMULA'],
+            df_siglado['GRUPO_PARLAMENTARIO'], origenes
+        ):
+            clave = (claves_entidad[entidad], coalicion, int(formula))
+            if clave in grupos:
+                continue
+            if pd.notna(gp) and gp.strip():
+                grupos[clave] = gp.strip()
+            elif pd.notna(po) and po.strip():
+                grupos[clave] = po.strip()
+            else:
+                grupos[clave] = ''
+        return cls(grupos)
+    
+    def grupo(self, entidad: str, coalicion: str, formula: int,
+              respaldo: Dict[Tuple, str], anio: int) -> str:
+        """
+        Grupo parlamentario de una fórmula: siglado, luego el partido más
+        votado de la coalición en la entidad (respaldo), luego el propio
+        partido si compitió solo; '' si no se puede determinar.
+        """
+        clave = _clave_entidad(entidad)
+        coalicion_norm = coalicion.upper().strip()
+        gp = self.grupos.get((clave, coalicion_norm, formula)) or respaldo.get((clave, coalicion_norm))
+        if gp:
+            return gp
+        return coalicion_norm if coalicion_norm in obtener_partidos_por_anio(anio) else ''
+
+
+def respaldos_coalicion(df_acred: pd.DataFrame, anio: int) -> Dict[Tuple, str]:
+    """
+    (entidad, coalición) -> partido de la coalición con más votos en la
+    entidad, para todas las entidades a la vez. Empates: el partido listado
+    antes en la coalición.
+    """
+    respaldo = {}
+    claves = [_clave_entidad(e) for e in df_acred['ENTIDAD']]
+    for nombre_coalicion, partidos_coal in obtener_coaliciones_por_anio(anio).items():
+        disponibles = [p for p in partidos_coal if p in df_acred.columns]
+        if not disponibles:
             continue
-        tokens = col.split('_')
-        if len(tokens) == 1 and tokens[0] in obtener_partidos_por_anio(anio):
-            # Ver si ya está en alguna coalición
-            en_coalicion = False
-            for partidos in coaliciones.values():
-                if tokens[0] in partidos:
-                    en_coalicion = True
-                    break
-            if not en_coalicion:
-                votos_coalicion[tokens[0]] = fila[col]
-    
-    # Retornar coalición con más votos
-    if votos_coalicion:
-        return max(votos_coalicion.items(), key=lambda x: x[1])[0]
-    return ''
+        mejor = np.argmax(df_acred[disponibles].to_numpy(dtype=float), axis=1)
+        for clave, i in zip(claves, mejor):
+            respaldo[(clave, nombre_coalicion)] = disponibles[i]
+    return respaldo
+
 
 def buscar_grupo_parlamentario(entidad: str, coalicion: str, formula: int, 
-                             df_siglado: pd.DataFrame, df_acred_fila: pd.Series, 
+                             df_siglado, df_acred_fila: pd.Series, 
                              anio: int) -> str:
     """
     Busca el grupo parlamentario usando siglado, con fallback a lógica de coaliciones
     Replica la función gp_lookup del script de R
+    df_siglado: IndiceSigladoSenado o DataFrame de leer_siglado_senado
     """
-    entidad_norm = normalize_entidad_ascii(entidad)
-    coalicion_norm = coalicion.upper().strip()
-    
-    # 1. Buscar en siglado primero
-    mask = (
-        (df_siglado['ENTIDAD_ASCII'] == entidad_norm) & 
-        (df_siglado['COALICION'] == coalicion_norm) & 
-        (df_siglado['FORMULA'] == formula)
-    )
-    hits = df_siglado[mask]
-    
-    if not hits.empty:
-        gp = hits.iloc[0]['GRUPO_PARLAMENTARIO']
-        if pd.notna(gp) and gp.strip():
-            return gp.strip()
-        
-        # Intentar con PARTIDO_ORIGEN si existe
-        if 'PARTIDO_ORIGEN' in hits.columns:
-            po = hits.iloc[0]['PARTIDO_ORIGEN']
-            if pd.notna(po) and po.strip():
-                return po.strip()
-    
-    # 2. Fallback: usar lógica de coaliciones
-    coaliciones = obtener_coaliciones_por_anio(anio)
-    
-    if coalicion_norm in coaliciones:
-        # Es una coalición, buscar el partido con más votos
-        partidos_coalicion = coaliciones[coalicion_norm]
-        partidos_disponibles = [p for p in partidos_coalicion if p in df_acred_fila.index]
-        
-        if partidos_disponibles:
-            votos_partidos = {p: df_acred_fila[p] for p in partidos_disponibles}
-            return max(votos_partidos.items(), key=lambda x: x[1])[0]
-    
-    # 3. Si es un partido individual
-    partidos_validos = obtener_partidos_por_anio(anio)
-    if coalicion_norm in partidos_validos:
-        return coalicion_norm
-    
-    return ''
+    indice = df_siglado if isinstance(df_siglado, IndiceSigladoSenado) else IndiceSigladoSenado.desde_siglado(df_siglado)
+    respaldo = respaldos_coalicion(pd.DataFrame([df_acred_fila]), anio)
+    return indice.grupo(entidad, coalicion, formula, respaldo, anio)
 
 def calcular_mr_senado(df_boleta: pd.DataFrame, df_acred: pd.DataFrame, 
-                      df_siglado: pd.DataFrame, anio: int, 
+                      df_siglado, anio: int, 
                       formulas_por_entidad: int = 2) -> Dict[str, int]:
     """
     Calcula escaños de Mayoría Relativa para senado
     formulas_por_entidad: número de fórmulas MR por entidad (ej: 2 para Plan C, 3 para Sistema Vigente MR+PM)
     Replica la lógica de conteo_senado_MR_PM_sigladoF y conteo_senado_MR2F del script de R
+    df_siglado: IndiceSigladoSenado o DataFrame de leer_siglado_senado
     """
     partidos = obtener_partidos_por_anio(anio)
     resultado_mr = {partido: 0 for partido in partidos}
     resultado_mr['CI'] = 0
     
+    # Ganador y segundo lugar (Primera Minoría) de todas las entidades a la vez
+    entidades, ganadores, segundos = primeros_lugares(df_boleta, anio)
+    lugares = {e: (g, s) for e, g, s in zip(entidades, ganadores, segundos)}
+    
+    # Siglado indexado y respaldo por coalición resueltos antes del recorrido
+    indice = df_siglado if isinstance(df_siglado, IndiceSigladoSenado) else IndiceSigladoSenado.desde_siglado(df_siglado)
+    respaldo = respaldos_coalicion(df_acred, anio)
+    
+    def grupo(entidad, coalicion, formula):
+        return indice.grupo(entidad, coalicion, formula, respaldo, anio)
+    
     # Para cada entidad
-    for _, fila_acred in df_acred.iterrows():
-        entidad = fila_acred['ENTIDAD']
-        
-        # Determinar coalición ganadora
-        coalicion_ganadora = determinar_coalicion_ganadora(entidad, df_boleta, anio)
+    for entidad in df_acred['ENTIDAD']:
+        coalicion_ganadora, coalicion_segunda = lugares.get(entidad, ('', ''))
         
         if not coalicion_ganadora:
             continue
         
-        # Determinar segunda coalición si es sistema MR+PM (3 fórmulas)
-        coalicion_segunda = ''
-        if formulas_por_entidad == 3:
-            # Para sistema vigente (MR+PM), necesitamos segunda coalición para Primera Minoría
-            coaliciones = obtener_coaliciones_por_anio(anio)
-            votos_coalicion = {}
-            
-            for nombre_coalicion, partidos_coal in coaliciones.items():
-                votos = 0
-                fila_boleta = df_boleta[df_boleta['ENTIDAD'] == entidad]
-                if not fila_boleta.empty:
-                    fila_boleta = fila_boleta.iloc[0]
-                    for col in df_boleta.columns:
-                        if col == 'ENTIDAD':
-                            continue
-                        tokens = col.split('_')
-                        if all(token in partidos_coal for token in tokens if token):
-                            votos += fila_boleta[col]
-                votos_coalicion[nombre_coalicion] = votos
-            
-            # Agregar partidos independientes
-            fila_boleta = df_boleta[df_boleta['ENTIDAD'] == entidad]
-            if not fila_boleta.empty:
-                fila_boleta = fila_boleta.iloc[0]
-                for col in df_boleta.columns:
-                    if col == 'ENTIDAD':
-                        continue
-                    tokens = col.split('_')
-                    if len(tokens) == 1 and tokens[0] in partidos:
-                        en_coalicion = False
-                        for partidos_coal in coaliciones.values():
-                            if tokens[0] in partidos_coal:
-                                en_coalicion = True
-                                break
-                        if not en_coalicion:
-                            votos_coalicion[tokens[0]] = fila_boleta[col]
-            
-            # Ordenar por votos y tomar segunda
-            coaliciones_ordenadas = sorted(votos_coalicion.items(), key=lambda x: x[1], reverse=True)
-            if len(coaliciones_ordenadas) >= 2:
-                coalicion_segunda = coaliciones_ordenadas[1][0]
-        
         # Asignar fórmulas
         if formulas_por_entidad == 2:
             # Plan C: 2 fórmulas para el ganador
             for formula in [1, 2]:
-                gp = buscar_grupo_parlamentario(entidad, coalicion_ganadora, formula, 
-                                              df_siglado, fila_acred, anio)
+                gp = grupo(entidad, coalicion_ganadora, formula)
                 if gp and gp != 'CI':
                     if gp in resultado_mr:
                         resultado_mr[gp] += 1
@@ -367,8 +387,7 @@ def calcular_mr_senado(df_boleta: pd.DataFrame, df_acred: pd.DataFrame,
             # Sistema Vigente: 2 fórmulas para ganador + 1 para segunda
             # Fórmulas 1 y 2 para ganador
             for formula in [1, 2]:
-                gp = buscar_grupo_parlamentario(entidad, coalicion_ganadora, formula, 
-                                              df_siglado, fila_acred, anio)
+                gp = grupo(entidad, coalicion_ganadora, formula)
                 if gp and gp != 'CI':
                     if gp in resultado_mr:
                         resultado_mr[gp] += 1
@@ -377,8 +396,7 @@ def calcular_mr_senado(df_boleta: pd.DataFrame, df_acred: pd.DataFrame,
             
             # Fórmula 1 para segunda coalición (Primera Minoría)
             if coalicion_segunda:
-                gp = buscar_grupo_parlamentario(entidad, coalicion_segunda, 1, 
-                                              df_siglado, fila_acred, anio)
+                gp = grupo(entidad, coalicion_segunda, 1)
                 if gp and gp != 'CI':
                     if gp in resultado_mr:
                         resultado_mr[gp] += 1
@@ -514,6 +532,7 @@ def procesar_senado(votos_csv: str, siglado_csv: str, mr_escanos: int = 0,
         df_raw = pd.read_csv(votos_csv, encoding='latin1', sep='|', skiprows=6)
     
     df_siglado = leer_siglado_senado(siglado_csv)
+    indice_siglado = IndiceSigladoSenado.desde_siglado(df_siglado)
     
     # Procesar votos
     df_boleta, df_acred = procesar_votos_senado(df_raw, anio)
@@ -534,9 +553,9 @@ def procesar_senado(votos_csv: str, siglado_csv: str, mr_escanos: int = 0,
             # Cálculo flexible para otros números
             formulas_por_entidad = mr_escanos // num_entidades
             if mr_escanos % num_entidades != 0:
-                print(f"Advertencia: {mr_escanos} no es divisible entre {num_entidades} entidades")
+                logger.warning('Advertencia: %s no es divisible entre %s entidades', mr_escanos, num_entidades)
         
-        resultado_mr = calcular_mr_senado(df_boleta, df_acred, df_siglado, anio, formulas_por_entidad)
+        resultado_mr = calcular_mr_senado(df_boleta, df_acred, indice_siglado, anio, formulas_por_entidad)
         
         # Sumar al resultado final
         for partido in partidos:
@@ -551,7 +570,7 @@ def procesar_senado(votos_csv: str, siglado_csv: str, mr_escanos: int = 0,
             num_entidades = len(df_acred)
             escanos_por_estado = rp_escanos // num_entidades
             if rp_escanos % num_entidades != 0:
-                print(f"Advertencia: {rp_escanos} no es divisible entre {num_entidades} entidades")
+                logger.warning('Advertencia: %s no es divisible entre %s entidades', rp_escanos, num_entidades)
             resultado_rp = calcular_rp_estatal_senado(df_acred, anio, escanos_por_estado, umbral)
         else:
             raise ValueError(f"rp_tipo debe ser 'nacional' o 'estatal', no '{rp_tipo}'")
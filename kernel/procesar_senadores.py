@@ -1,7 +1,13 @@
+import logging
 import pandas as pd
+import numpy as np
 import unicodedata
 import re
 from kernel.asignasen import asignasen_v1
+from kernel.entidades import nombre_entidad
+from kernel.tiempos import etapa
+
+logger = logging.getLogger(__name__)
 
 def normalizar_texto(x):
     if pd.isnull(x): return ''
@@ -11,29 +17,46 @@ def normalizar_texto(x):
     return x
 
 def normalize_entidad(x):
-    if pd.isnull(x): return ''
-    x = str(x).strip().upper()
-    # Primero reemplazos con acentos
-    x = x.replace('MEXICO', 'MÉXICO')
-    x = x.replace('NUEVO LEON', 'NUEVO LEÓN')
-    x = x.replace('QUERETARO', 'QUERÉTARO')
-    x = x.replace('SAN LUIS POTOSI', 'SAN LUIS POTOSÍ')
-    x = x.replace('MICHOACAN', 'MICHOACÁN')
-    x = x.replace('YUCATAN', 'YUCATÁN')
-    x = x.replace('CIUDAD DE MEXICO', 'CIUDAD DE MÉXICO')
-    x = x.replace('ESTADO DE MÉXICO', 'MÉXICO')
-    x = x.replace('MICHOACÁN DE OCAMPO', 'MICHOACÁN')
-    x = x.replace('VERACRUZ DE IGNACIO DE LA LLAVE', 'VERACRUZ')
-    x = x.replace('COAHUILA DE ZARAGOZA', 'COAHUILA')
-    # Luego normaliza a ASCII solo si necesitas comparar internamente, pero para mostrar deja los acentos
-    # x = unicodedata.normalize('NFKD', x).encode('ASCII', 'ignore').decode('ASCII')
-    x = re.sub(r'\s+', ' ', x)
-    return x
+    # Catálogo único de entidades (kernel/entidades.py); conserva los acentos para mostrar
+    return nombre_entidad(x)
+
+def conteo_formulas_senado(sig):
+    """
+    Conteo de fórmulas del siglado de senado por grupo parlamentario.
+    sig: siglado normalizado (FORMULA entero nullable, GRUPO_PARLAMENTARIO categórico)
+    Regresa DataFrame indexado por partido con:
+    - mr / pm: fórmulas 1-2 (MR) y fórmula 1 (PM)
+    - primer_mr / primer_pm: primera fila en que aparece, para conservar el
+      orden de aparición del siglado
+    """
+    partido = pd.Categorical(sig['GRUPO_PARLAMENTARIO'])
+    formula = pd.array(sig['FORMULA'], dtype='Int64').fillna(0).to_numpy(dtype=np.int64)
+    codigos = partido.codes
+    filas = np.arange(len(codigos))
+    k = len(partido.categories)
+    sin_fila = len(codigos)
+
+    conteo = {}
+    for nombre, mascara in (('mr', (formula == 1) | (formula == 2)), ('pm', formula == 1)):
+        mascara &= codigos >= 0
+        conteo[nombre] = np.bincount(codigos[mascara], minlength=k)
+        primer = np.full(k, sin_fila, dtype=np.int64)
+        np.minimum.at(primer, codigos[mascara], filas[mascara])
+        conteo[f'primer_{nombre}'] = primer
+    return pd.DataFrame(conteo, index=pd.Index(partido.categories.astype(object), name='partido'))
+
+
+def _lista_por_aparicion(conteo, partidos_base, columna):
+    # [partido] repetido tantas veces como fórmulas, en orden de primera aparición
+    presentes = [p for p in partidos_base if p in conteo.index and conteo.at[p, columna] > 0]
+    presentes.sort(key=lambda p: conteo.at[p, f'primer_{columna}'])
+    return [p for p in presentes for _ in range(int(conteo.at[p, columna]))]
+
 
 def procesar_senadores_parquet(path_parquet, partidos_base, anio, path_siglado=None, total_rp_seats=32, total_mr_seats=None, umbral=0.03, quota_method='hare', divisor_method='dhondt', primera_minoria=True, limite_escanos_pm=None):
     """
     Procesa la base Parquet de senadores y regresa lista de dicts lista para el orquestador y seat chart.
-    - path_parquet: ruta al archivo Parquet
+    - path_parquet: DatasetElectoral precargado o ruta al archivo Parquet
     - partidos_base: lista de partidos válidos
     - anio: año de elección
     - path_siglado: CSV largo de siglado por entidad/fórmula
@@ -42,105 +65,52 @@ def procesar_senadores_parquet(path_parquet, partidos_base, anio, path_siglado=N
     """
     import numpy as np
     from .kpi_utils import kpis_votos_escanos
-    import os
+    from kernel.datos_electorales import resolver_dataset
     try:
-        print(f"[DEBUG] Leyendo Parquet: {path_parquet}")
-        print(f"[DEBUG] Path Parquet absoluto: {os.path.abspath(path_parquet)}")
-        if os.path.exists(path_parquet):
-            print(f"[DEBUG] Size Parquet (bytes): {os.path.getsize(path_parquet)}")
-        else:
-            print(f"[ERROR] El archivo Parquet no existe: {path_parquet}")
-        try:
-            print(f"[DEBUG] Leyendo Parquet Senado: {path_parquet}")
-            df = pd.read_parquet(path_parquet)
-        except Exception as e:
-            print(f"[WARN] Error leyendo Parquet normal, intentando forzar a string y decodificar UTF-8: {e}")
-            import pyarrow.parquet as pq
-            table = pq.read_table(path_parquet)
-            df = table.to_pandas()
-            for col in df.columns:
-                if df[col].dtype == object:
-                    df[col] = df[col].apply(lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x)
-        print(f"[DEBUG] Parquet Senado columnas: {df.columns.tolist()}")
-        print(f"[DEBUG] Parquet Senado shape: {df.shape}")
-        df.columns = [normalizar_texto(c) for c in df.columns]
-        if 'ENTIDAD' in df.columns:
-            df['ENTIDAD'] = df['ENTIDAD'].apply(lambda x: x.decode('utf-8', errors='replace') if isinstance(x, bytes) else x)
-            df['ENTIDAD'] = df['ENTIDAD'].apply(normalize_entidad)
+        with etapa('datos'):
+            dataset = resolver_dataset(path_parquet, 'senado', anio=anio, path_siglado=path_siglado)
+        logger.debug('Dataset Senado: %s', dataset.path_parquet)
+        df = dataset.computos
+        logger.debug('Parquet Senado columnas: %s', df.columns.tolist())
+        logger.debug('Parquet Senado shape: %s', df.shape)
         votos_cols = [c for c in df.columns if c in partidos_base]
-        print(f"[DEBUG] Columnas de votos detectadas Senado: {votos_cols}")
+        logger.debug('Columnas de votos detectadas Senado: %s', votos_cols)
         if not votos_cols:
-            print(f"[WARN] No se detectaron columnas de votos válidas en Senado. Partidos base: {partidos_base}")
+            logger.warning('No se detectaron columnas de votos válidas en Senado. Partidos base: %s', partidos_base)
         votos_partido = df[votos_cols].sum().to_dict()
-        print(f"[DEBUG] votos_partido Senado: {votos_partido}")
+        logger.debug('votos_partido Senado: %s', votos_partido)
         indep = int(df['CI'].sum()) if 'CI' in df.columns else 0
-        print(f"[DEBUG] Independientes Senado: {indep}")
+        logger.debug('Independientes Senado: %s', indep)
         mr_list = []
         pm_list = []
-        if path_siglado is not None:
-            print(f"[DEBUG] Leyendo siglado Senado: {path_siglado}")
-            if path_siglado.lower().endswith('.csv'):
-                try:
-                    sig = pd.read_csv(path_siglado, encoding='utf-8')
-                except UnicodeDecodeError:
-                    print('[WARN] Error de codificación UTF-8, intentando con latin1...')
-                    sig = pd.read_csv(path_siglado, encoding='latin1')
-            else:
-                sig = pd.read_parquet(path_siglado)
-            print(f"[DEBUG] Siglado Senado columnas: {sig.columns.tolist()}")
-            print(f"[DEBUG] Siglado Senado shape: {sig.shape}")
-            sig.columns = [normalizar_texto(c) for c in sig.columns]
-            if 'ENTIDAD_ASCII' not in sig.columns and 'ENTIDAD' not in sig.columns:
-                print(f"[WARN] No existe columna 'ENTIDAD_ASCII' ni 'ENTIDAD' en siglado Senado")
-            # Usar 'ENTIDAD_ASCII' si existe, si no 'ENTIDAD'
-            if 'ENTIDAD_ASCII' in sig.columns:
-                sig['ENTIDAD'] = sig['ENTIDAD_ASCII']
-            elif 'ENTIDAD' not in sig.columns:
-                raise ValueError("El archivo de siglado no contiene columna 'ENTIDAD' ni 'ENTIDAD_ASCII'")
-            sig['ENTIDAD'] = sig['ENTIDAD'].apply(normalize_entidad)
-            # MR: F1 y F2 por entidad
-            for idx, row in sig.iterrows():
-                partido = row.get('GRUPO_PARLAMENTARIO', None)
-                # Validar y convertir FORMULA de forma robusta
-                formula_val = row.get('FORMULA', 0)
-                try:
-                    if pd.isnull(formula_val) or formula_val == '' or formula_val is None:
-                        formula = 0
-                    elif isinstance(formula_val, (list, tuple)):
-                        if len(formula_val) > 0:
-                            formula = int(formula_val[0])
-                        else:
-                            print(f"[WARN] Fila {idx} FORMULA es lista/tupla vacía: {formula_val}")
-                            formula = 0
-                    elif isinstance(formula_val, str) and formula_val.strip() == '':
-                        formula = 0
-                    else:
-                        formula = int(float(formula_val))  # Convertir a float primero por si es decimal
-                except (IndexError, ValueError, TypeError) as e:
-                    print(f"[WARN] Fila {idx} FORMULA inválida: {formula_val} (Error: {e})"); formula = 0
-                except Exception as e:
-                    print(f"[ERROR] Fila {idx} Error inesperado procesando FORMULA: {formula_val} (Error: {e})"); formula = 0
-                if partido in partidos_base:
-                    if formula == 1 or formula == 2:
-                        mr_list.append(partido)
-                    if formula == 1:
-                        pm_list.append(partido)  # F1 del segundo lugar es PM
-        # Cuenta MR y PM
-        mr_count = {p: mr_list.count(p) for p in partidos_base}
-        pm_count = {p: pm_list.count(p) for p in partidos_base}
+        mr_count = {p: 0 for p in partidos_base}
+        pm_count = {p: 0 for p in partidos_base}
+        sig = dataset.siglado
+        if sig is not None:
+            logger.debug('Siglado Senado: %s', dataset.path_siglado)
+            logger.debug('Siglado Senado columnas: %s', sig.columns.tolist())
+            logger.debug('Siglado Senado shape: %s', sig.shape)
+            # MR: F1 y F2 por entidad; PM: F1 (del segundo lugar). Conteo
+            # precalculado al cargar el dataset, aquí solo se filtra por partido
+            conteo = dataset.formulas_senado if dataset.formulas_senado is not None else conteo_formulas_senado(sig)
+            mr_list = _lista_por_aparicion(conteo, partidos_base, 'mr')
+            pm_list = _lista_por_aparicion(conteo, partidos_base, 'pm')
+            # Cuenta MR y PM
+            for p in partidos_base:
+                if p in conteo.index:
+                    mr_count[p] = int(conteo.at[p, 'mr'])
+                    pm_count[p] = int(conteo.at[p, 'pm'])
         
-        print(f"[DEBUG] mr_list: {mr_list}")
-        print(f"[DEBUG] pm_list: {pm_list}")
-        print(f"[DEBUG] mr_count: {mr_count}")
-        print(f"[DEBUG] pm_count: {pm_count}")
+        logger.debug('mr_count: %s', mr_count)
+        logger.debug('pm_count: %s', pm_count)
         
         # RP nacional: votos totales por partido
         resultados_rp = [{'party': p, 'votes': votos_partido.get(p, 0)} for p in partidos_base]
-        print(f"[DEBUG] resultados_rp: {resultados_rp}")
+        logger.debug('resultados_rp: %s', resultados_rp)
         
         # Validar que tenemos datos mínimos antes de llamar asignasen_v1
         if not mr_list and not pm_list and not any(votos_partido.values()):
-            print("[WARN] No hay datos de MR, PM o votos. Devolviendo resultado vacío.")
+            logger.warning('No hay datos de MR, PM o votos. Devolviendo resultado vacío.')
             salida = []
             for p in partidos_base:
                 salida.append({
@@ -161,18 +131,19 @@ def procesar_senadores_parquet(path_parquet, partidos_base, anio, path_siglado=N
                 'kpis': {'mae_votos_vs_escanos': 0.0, 'indice_gallagher': 0.0}
             }
         # Llama orquestador de senadores
-        res = asignasen_v1(
-            [{'party': p} for p in mr_list],
-            [{'party': p} for p in pm_list],
-            resultados_rp,
-            total_rp_seats=total_rp_seats,
-            total_mr_seats=total_mr_seats,
-            umbral=umbral,
-            quota_method=quota_method,
-            divisor_method=divisor_method,
-            primera_minoria=primera_minoria,
-            limite_escanos_pm=limite_escanos_pm
-        )
+        with etapa('asignacion'):
+            res = asignasen_v1(
+                [{'party': p} for p in mr_list],
+                [{'party': p} for p in pm_list],
+                resultados_rp,
+                total_rp_seats=total_rp_seats,
+                total_mr_seats=total_mr_seats,
+                umbral=umbral,
+                quota_method=quota_method,
+                divisor_method=divisor_method,
+                primera_minoria=primera_minoria,
+                limite_escanos_pm=limite_escanos_pm
+            )
         # Salida: lista de dicts por partido
         salida = []
         votos_dict = {}
@@ -197,10 +168,11 @@ def procesar_senadores_parquet(path_parquet, partidos_base, anio, path_siglado=N
             votos_dict['CI'] = indep
             escanos_dict['CI'] = indep
         # KPIs robustos: calcular SIEMPRE con los escaños finales (ajustados)
-        kpis = kpis_votos_escanos(votos_dict, escanos_dict)
-        print("[DEBUG] votos_dict:", votos_dict)
-        print("[DEBUG] escanos_dict:", escanos_dict)
-        print("[DEBUG] KPIs:", kpis)
+        with etapa('kpis'):
+            kpis = kpis_votos_escanos(votos_dict, escanos_dict)
+        logger.debug('votos_dict: %s', votos_dict)
+        logger.debug('escanos_dict: %s', escanos_dict)
+        logger.debug('KPIs: %s', kpis)
         
         # Formato compatible con main.py (similar a asignadip_v2)
         mr_dict = {p: mr_count.get(p, 0) for p in partidos_base}
@@ -221,5 +193,5 @@ def procesar_senadores_parquet(path_parquet, partidos_base, anio, path_siglado=N
         
         return resultado_formato_main
     except Exception as e:
-        print(f"[ERROR] procesar_senadores_parquet: {e}")
+        logger.error('procesar_senadores_parquet: %s', e)
         return {'salida': [], 'kpis': {}, 'error': str(e)}
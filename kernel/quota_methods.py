@@ -1,50 +1,143 @@
-from decimal import Decimal
-from math import floor
+from fractions import Fraction
+
+import numpy as np
+
+# Cuotas como racionales num/den con aritmética entera: un partido con v votos
+# recibe floor(v * den / num) escaños y su resto, escalado por den, es
+# v * den - escaños * num (comparar restos = comparar enteros, sin contexto decimal).
+# Votos no enteros (p. ej. proporciones en float, Decimal o Fraction) se
+# aceptan como antes y se operan como Fraction exactas.
+
+
+def _exacto(v):
+    # Entero si lo es (camino rápido); si no, su valor racional exacto
+    return int(v) if int(v) == v else Fraction(v)
+
+
+def _cuota(method, total_seats, total_votes):
+    # (numerador, denominador) de la cuota
+    if method == 'hare':
+        return total_votes, total_seats
+    if method == 'droop':
+        return 1 + total_votes // (total_seats + 1), 1
+    if method == 'droop_exact':
+        return total_votes, total_seats + 1
+    raise ValueError(f"Método de cuota desconocido: {method}")
+
+
+def _partes_enteras(votes, num, den):
+    if num <= 0:
+        raise ZeroDivisionError("Cuota nula")
+    seats, restos = {}, {}
+    for party, v in votes.items():
+        seats[party], restos[party] = divmod(_exacto(v) * den, num)
+    return seats, restos
+
+
+def _completar_restos(seats, restos, total_seats):
+    # Repartir los escaños restantes por restos mayores (empates por nombre),
+    # a lo más uno por partido
+    seats_left = total_seats - sum(seats.values())
+    if seats_left > 0:
+        for party in sorted(restos, key=lambda p: (-restos[p], p))[:seats_left]:
+            seats[party] += 1
+    return seats
+
 
 def largest_remainder_formula(quota, total_seats, votes):
     """
     Asigna escaños usando el método de restos mayores (LR-Hare, LR-Droop, etc).
-    :param quota: cuota calculada (float o Decimal)
+    :param quota: cuota exacta; entero, Fraction, float o (numerador, denominador)
     :param total_seats: número total de escaños a repartir (int)
-    :param votes: dict {partido: votos}
+    :param votes: dict {partido: votos}; enteros o no (float, Decimal, Fraction)
     :return: dict {partido: escaños}
     """
     # Si no hay votos válidos, retornar dict vacío
     if not votes or total_seats <= 0:
         return {}
-    
-    seats = {}
-    remainders = {}
-    total_assigned = 0
-    for party, v in votes.items():
-        s = int(Decimal(v) // quota)
-        seats[party] = s
-        remainders[party] = Decimal(v) - s * quota
-        total_assigned += s
-    # Repartir los escaños restantes por restos mayores
-    seats_left = total_seats - total_assigned
-    if seats_left > 0 and remainders:
-        # Ordenar partidos por resto (descendente)
-        sorted_parties = sorted(remainders.items(), key=lambda x: (-x[1], x[0]))
-        # Solo asignar hasta el número de partidos disponibles
-        max_assignments = min(seats_left, len(sorted_parties))
-        for i in range(max_assignments):
-            party = sorted_parties[i][0]
-            seats[party] += 1
-    return seats
+    if isinstance(quota, tuple):
+        num, den = quota
+    else:
+        quota = Fraction(quota)
+        num, den = quota.numerator, quota.denominator
+    seats, restos = _partes_enteras(votes, num, den)
+    return _completar_restos(seats, restos, total_seats)
+
+
+def _por_partido(method, total_seats, votes, total_votes):
+    if not votes or total_seats <= 0:
+        return {}
+    total_votes = _exacto(total_votes)
+    seats, restos = _partes_enteras(votes, *_cuota(method, total_seats, total_votes))
+    if method == 'droop_exact' and sum(seats.values()) > total_seats:
+        # Con cuota exacta las partes enteras pueden pasarse del total: se usa Droop
+        seats, restos = _partes_enteras(votes, *_cuota('droop', total_seats, total_votes))
+    return _completar_restos(seats, restos, total_seats)
 
 def hare_quota(total_seats, votes, total_votes):
-    quota = Decimal(total_votes) / total_seats
-    return largest_remainder_formula(quota, total_seats, votes)
+    return _por_partido('hare', total_seats, votes, total_votes)
 
 def droop_quota(total_seats, votes, total_votes):
-    quota = Decimal(1 + floor(Decimal(total_votes) / (total_seats + 1)))
-    return largest_remainder_formula(quota, total_seats, votes)
+    return _por_partido('droop', total_seats, votes, total_votes)
 
 def exact_droop_quota(total_seats, votes, total_votes):
-    quota = Decimal(total_votes) / (total_seats + 1)
-    assignment = largest_remainder_formula(quota, total_seats, votes)
-    if sum(assignment.values()) > total_seats:
-        return droop_quota(total_seats, votes, total_votes)
-    else:
-        return assignment
+    return _por_partido('droop_exact', total_seats, votes, total_votes)
+
+
+# --- Por lotes: escenarios × partidos ---
+
+def _votos_enteros(votes):
+    V = np.asarray(votes)
+    if V.dtype.kind == 'f' and not np.all(V == np.floor(V)):
+        raise ValueError("Los votos deben ser enteros")
+    return V.astype(np.int64)
+
+
+def largest_remainder_batch(votes, total_seats, quota_num, quota_den=1):
+    """
+    Restos mayores por lotes con cuota exacta quota_num / quota_den.
+    :param votes: votos enteros (escenarios × partidos) o (partidos,)
+    :param total_seats: escaños por escenario (escalar o arreglo)
+    :param quota_num, quota_den: numerador y denominador enteros de la cuota
+    :return: ndarray int con escaños; empates de resto por orden de columna
+    """
+    una_fila = np.ndim(votes) == 1
+    V = np.atleast_2d(_votos_enteros(votes))
+    n, k = V.shape
+    S = np.broadcast_to(np.asarray(total_seats, dtype=np.int64), (n,))
+    num = np.broadcast_to(np.asarray(quota_num, dtype=np.int64), (n,))[:, None]
+    den = np.broadcast_to(np.asarray(quota_den, dtype=np.int64), (n,))[:, None]
+    if (num <= 0).any():
+        raise ZeroDivisionError("Cuota nula")
+
+    escalado = V * den
+    seats = escalado // num
+    restos = escalado - seats * num
+    seats_left = np.clip(S - seats.sum(axis=1), 0, k)
+    orden = np.argsort(-restos, axis=1, kind='stable')
+    rango = np.empty_like(orden)
+    np.put_along_axis(rango, orden, np.broadcast_to(np.arange(k), (n, k)), axis=1)
+    seats = seats + (rango < seats_left[:, None])
+    return seats[0] if una_fila else seats
+
+
+def quota_batch(method, votes, total_seats, total_votes):
+    """
+    Hare, Droop o Droop exacta por lotes.
+    :param method: 'hare', 'droop' o 'droop_exact'
+    :param votes: votos enteros (escenarios × partidos) o (partidos,)
+    :param total_seats, total_votes: escalar o uno por escenario
+    :return: ndarray int con escaños; empates de resto por orden de columna
+    """
+    una_fila = np.ndim(votes) == 1
+    V = np.atleast_2d(_votos_enteros(votes))
+    n = len(V)
+    S = np.broadcast_to(np.asarray(total_seats, dtype=np.int64), (n,))
+    T = np.broadcast_to(np.asarray(total_votes, dtype=np.int64), (n,))
+    seats = largest_remainder_batch(V, S, *_cuota(method, S, T))
+    if method == 'droop_exact':
+        # Solo los escenarios donde la cuota exacta asigna de más usan Droop
+        excede = seats.sum(axis=1) > S
+        if excede.any():
+            seats[excede] = largest_remainder_batch(V[excede], S[excede], *_cuota('droop', S[excede], T[excede]))
+    return seats[0] if una_fila else seats
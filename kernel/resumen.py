@@ -0,0 +1,200 @@
+"""
+Resúmenes precalculados de los modelos (vigente, plan a, plan c, ...).
+
+Los dos archivos resumen (diputados y senado) se leen una sola vez y se
+indexan por (camara, anio, modelo en minúsculas). Cada llave guarda ya
+armados el seat chart y los KPIs del modelo, así que responder un modelo
+precalculado es una búsqueda en diccionario.
+
+Además, las respuestas completas de esos modelos (con sus parámetros por
+defecto) se guardan ya serializadas: cuerpo JSON, variante gzip y ETag
+fuerte, listas para enviarse tal cual o contestar 304.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from kernel.datos_electorales import DATA_DIR
+from kernel.serializacion import dumps
+
+logger = logging.getLogger(__name__)
+
+ARCHIVOS_RESUMEN = {
+    'diputados': 'resumen-modelos-votos-escanos-diputados.parquet',
+    'senado': 'senado-resumen-modelos-votos-escanos.parquet',
+}
+
+
+@dataclass(frozen=True)
+class ResumenModelo:
+    """
+    Un modelo precalculado para (camara, anio, modelo).
+    - filas: renglones del resumen en el orden del archivo
+    - seat_chart: partidos con escaños (party, seats, color, percent, votes); solo lectura
+    - kpis: gallagher, mae_votos_vs_escanos y total_votos (sin total_seats,
+      que depende de la magnitud pedida)
+    """
+    camara: str
+    anio: int
+    modelo: str
+    filas: pd.DataFrame = field(repr=False)
+    seat_chart: List[dict] = field(repr=False)
+    kpis: Dict[str, float] = field(repr=False)
+
+
+@dataclass(frozen=True)
+class RespuestaSerializada:
+    """
+    Cuerpo JSON (bytes) y su variante gzip, cada uno con su ETag fuerte
+    (RFC 9110: codificaciones distintas, validadores distintos).
+    """
+    cuerpo: bytes = field(repr=False)
+    cuerpo_gzip: bytes = field(repr=False)
+    etag: str
+    etag_gzip: str
+
+
+_REGISTRO: Dict[Tuple[str, int, str], ResumenModelo] = {}
+# llave de escenario -> respuesta ya serializada
+_RESPUESTAS: Dict[tuple, RespuestaSerializada] = {}
+_COLORES: Dict[str, str] = {}
+_LOCK = threading.Lock()
+
+
+def _total_votos(valor):
+    # total_votos viene como texto (con "NA") en diputados y como número en senado
+    if pd.isna(valor) or str(valor).strip() == "NA":
+        return 0
+    try:
+        return int(float(valor))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _armar_resumen(camara, anio, modelo, filas, colores):
+    seat_chart = [
+        {
+            "party": partido,
+            "seats": int(asientos),
+            "color": colores.get(partido, "#888"),
+            "percent": round(float(pct_escanos) * 100, 2),
+            "votes": float(pct_votos),
+        }
+        for partido, asientos, pct_escanos, pct_votos in zip(
+            filas['partido'], filas['asientos_partido'], filas['pct_escanos'], filas['pct_votos']
+        )
+        if int(asientos) > 0
+    ]
+    primera = filas.iloc[0]
+    kpis = {
+        "gallagher": float(primera['indice_gallagher']),
+        "mae_votos_vs_escanos": float(primera['mae_votos_vs_escanos']),
+        "total_votos": _total_votos(primera['total_votos']),
+    }
+    return ResumenModelo(camara, anio, modelo, filas, seat_chart, kpis)
+
+
+def cargar_resumenes(data_dir=DATA_DIR, colores=None):
+    """
+    Lee los archivos resumen de data_dir y arma el registro en memoria. El
+    registro nuevo sustituye al anterior de una vez: quien lo consulta sin
+    lock ve el anterior o el nuevo, nunca uno vacío.
+    colores: {partido: color} para el seat chart (se recuerda para recargas).
+    """
+    global _COLORES, _REGISTRO
+    if colores is not None:
+        _COLORES = dict(colores)
+    nuevos = {}
+    for camara, archivo in ARCHIVOS_RESUMEN.items():
+        path = os.path.join(data_dir, archivo)
+        if not os.path.exists(path):
+            continue
+        df = pd.read_parquet(path)
+        anios = pd.to_numeric(df['anio'], errors='coerce')
+        modelos = df['modelo'].astype(str).str.lower()
+        for (anio, modelo), filas in df.groupby([anios, modelos], sort=False):
+            llave = (camara, int(anio), modelo)
+            nuevos[llave] = _armar_resumen(camara, int(anio), modelo, filas.reset_index(drop=True), _COLORES)
+        logger.info('Resumen cargado: %s (%s filas)', camara, len(df))
+    with _LOCK:
+        _REGISTRO = nuevos
+    return dict(nuevos)
+
+
+def obtener_resumen(camara, anio, modelo) -> Optional[ResumenModelo]:
+    """
+    Modelo precalculado para (camara, anio, modelo), o None si no existe.
+    Solo consulta el registro; se carga al arrancar con cargar_resumenes.
+    """
+    try:
+        llave = (camara.lower(), int(anio), modelo.lower())
+    except (TypeError, ValueError):
+        return None
+    return _REGISTRO.get(llave)
+
+
+def llaves_resumen():
+    """(camara, anio, modelo) de todos los modelos precalculados."""
+    return list(_REGISTRO)
+
+
+def limpiar_resumenes():
+    global _REGISTRO, _RESPUESTAS
+    with _LOCK:
+        _REGISTRO = {}
+        _RESPUESTAS = {}
+
+
+# --- Respuestas ya serializadas ---
+
+def serializar_respuesta(contenido) -> RespuestaSerializada:
+    """JSON con el mismo codificador que las respuestas dinámicas, gzip determinista y ETags."""
+    cuerpo = dumps(contenido)
+    huella = hashlib.sha256(cuerpo).hexdigest()[:32]
+    return RespuestaSerializada(
+        cuerpo, gzip.compress(cuerpo, compresslevel=9, mtime=0), f'"{huella}"', f'"{huella}-gz"'
+    )
+
+
+def registrar_respuestas(respuestas):
+    """Sustituye de una vez las respuestas serializadas ({llave de escenario: RespuestaSerializada})."""
+    global _RESPUESTAS
+    with _LOCK:
+        _RESPUESTAS = dict(respuestas)
+
+
+def obtener_respuesta(llave) -> Optional[RespuestaSerializada]:
+    return _RESPUESTAS.get(llave)
+
+
+def etag_coincide(if_none_match, *etags):
+    """
+    If-None-Match contra los ETags de la representación elegida (comparación
+    débil, como pide RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    etiquetas = [e.strip() for e in if_none_match.split(',')]
+    return '*' in etiquetas or any(e.removeprefix('W/') in etags for e in etiquetas)
+
+
+def acepta_gzip(accept_encoding):
+    """True si Accept-Encoding admite gzip (q > 0)."""
+    for parte in (accept_encoding or '').split(','):
+        nombre, _, params = parte.strip().partition(';')
+        if nombre.strip().lower() in ('gzip', '*'):
+            q = params.strip()
+            if q.startswith('q='):
+                try:
+                    return float(q[2:]) > 0
+                except ValueError:
+                    return False
+            return True
+    return False
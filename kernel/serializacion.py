@@ -0,0 +1,46 @@
+"""
+Serialización JSON de las respuestas de simulación.
+
+Con orjson instalado se usa su codificador, que además serializa arreglos y
+escalares de NumPy sin convertirlos antes. Sin orjson se usa json de la
+biblioteca estándar con el mismo formato compacto de JSONResponse y una
+conversión de los tipos de NumPy.
+"""
+
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def _convertir(obj):
+    # Lo que el codificador no sabe serializar: tipos de NumPy
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+
+if orjson is not None:
+    _OPCIONES = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(contenido) -> bytes:
+        return orjson.dumps(contenido, default=_convertir, option=_OPCIONES)
+else:
+    def dumps(contenido) -> bytes:
+        return json.dumps(
+            contenido, ensure_ascii=False, allow_nan=False, indent=None,
+            separators=(",", ":"), default=_convertir,
+        ).encode("utf-8")
+
+
+def sin_tabla(contenido):
+    """Respuesta de /simulacion sin la copia 'tabla' del seatChart."""
+    if isinstance(contenido, dict) and 'tabla' in contenido:
+        return {k: v for k, v in contenido.items() if k != 'tabla'}
+    return contenido
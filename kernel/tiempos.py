@@ -0,0 +1,161 @@
+"""
+Tiempos por etapa de las simulaciones.
+
+Cada petición abre una medición (medicion()) y las etapas del cálculo se
+envuelven en `with etapa('mr'): ...`; los segundos se acumulan por nombre
+en un diccionario de la petición (variable de contexto). Al terminar, la
+medición se reporta en el encabezado Server-Timing y se agrega a
+histogramas de latencia por (ruta, etapa) con percentiles p50/p95/p99.
+
+Fuera de una medición (o con la medición desactivada) etapa() regresa un
+contexto nulo compartido: una lectura de la variable de contexto, sin
+llamadas al reloj.
+
+Configuración (variables de entorno):
+- TIEMPOS_ETAPAS: 0 desactiva la medición (activa por defecto)
+"""
+
+import bisect
+import contextvars
+import math
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Dict, Optional
+
+HABILITADO = os.environ.get("TIEMPOS_ETAPAS", "1") != "0"
+
+# Límites de los buckets en segundos: de 10 µs a ~100 s con razón 2**(1/8)
+# (error relativo de un percentil < 9%)
+_RAZON = 2 ** 0.125
+LIMITES = [1e-5 * _RAZON ** i for i in range(187)]
+
+_TIEMPOS = contextvars.ContextVar("tiempos_etapas", default=None)
+_NULO = nullcontext()
+
+
+class _Etapa:
+    __slots__ = ("nombre", "tiempos", "inicio")
+
+    def __init__(self, nombre, tiempos):
+        self.nombre = nombre
+        self.tiempos = tiempos
+
+    def __enter__(self):
+        self.inicio = perf_counter()
+
+    def __exit__(self, *exc):
+        self.tiempos[self.nombre] = self.tiempos.get(self.nombre, 0.0) + perf_counter() - self.inicio
+        return False
+
+
+def etapa(nombre):
+    """Contexto que suma su duración a la etapa `nombre` de la medición en curso."""
+    tiempos = _TIEMPOS.get()
+    if tiempos is None:
+        return _NULO
+    return _Etapa(nombre, tiempos)
+
+
+@contextmanager
+def medicion(habilitado=None):
+    """
+    Abre una medición para el bloque y entrega su diccionario {etapa: segundos}
+    (None si la medición está desactivada).
+    """
+    if not (HABILITADO if habilitado is None else habilitado):
+        yield None
+        return
+    tiempos = {}
+    token = _TIEMPOS.set(tiempos)
+    try:
+        yield tiempos
+    finally:
+        _TIEMPOS.reset(token)
+
+
+def agregar_tiempos(otros):
+    """Suma a la medición en curso los tiempos medidos en otro proceso."""
+    tiempos = _TIEMPOS.get()
+    if tiempos is None or not otros:
+        return
+    for nombre, segundos in otros.items():
+        tiempos[nombre] = tiempos.get(nombre, 0.0) + segundos
+
+
+def server_timing(tiempos):
+    """Valor del encabezado Server-Timing: 'mr;dur=1.23, total;dur=4.56' (ms)."""
+    return ", ".join(f"{nombre};dur={segundos * 1000:.2f}" for nombre, segundos in tiempos.items())
+
+
+class HistogramaLatencias:
+    """
+    Histograma de latencias con buckets logarítmicos fijos: observar es O(log
+    buckets) y la memoria no crece con el número de observaciones.
+    """
+
+    def __init__(self):
+        self.conteos = [0] * (len(LIMITES) + 1)
+        self.n = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        self.conteos[bisect.bisect_left(LIMITES, segundos)] += 1
+        self.n += 1
+        self.suma += segundos
+        self.maximo = max(self.maximo, segundos)
+
+    def cuantil(self, q):
+        """Límite superior del bucket que contiene el cuantil q (acotado al máximo)."""
+        if self.n == 0:
+            return 0.0
+        rango = max(1, math.ceil(q * self.n))
+        acumulado = 0
+        for i, conteo in enumerate(self.conteos):
+            acumulado += conteo
+            if acumulado >= rango:
+                return min(LIMITES[i], self.maximo) if i < len(LIMITES) else self.maximo
+        return self.maximo
+
+    def resumen(self):
+        """Conteo, promedio, p50/p95/p99 y máximo en milisegundos."""
+        return {
+            "n": self.n,
+            "promedio_ms": round(self.suma / self.n * 1000, 3) if self.n else 0.0,
+            "p50_ms": round(self.cuantil(0.50) * 1000, 3),
+            "p95_ms": round(self.cuantil(0.95) * 1000, 3),
+            "p99_ms": round(self.cuantil(0.99) * 1000, 3),
+            "max_ms": round(self.maximo * 1000, 3),
+        }
+
+
+_HISTOGRAMAS: Dict[tuple, HistogramaLatencias] = {}
+_LOCK = threading.Lock()
+
+
+def registrar_tiempos(ruta, tiempos: Optional[dict]):
+    """Agrega una medición a los histogramas de (ruta, etapa)."""
+    if not tiempos:
+        return
+    with _LOCK:
+        for nombre, segundos in tiempos.items():
+            histograma = _HISTOGRAMAS.get((ruta, nombre))
+            if histograma is None:
+                histograma = _HISTOGRAMAS[(ruta, nombre)] = HistogramaLatencias()
+            histograma.observar(segundos)
+
+
+def resumen_tiempos():
+    """{ruta: {etapa: resumen del histograma}}."""
+    with _LOCK:
+        salida = {}
+        for (ruta, nombre), histograma in _HISTOGRAMAS.items():
+            salida.setdefault(ruta, {})[nombre] = histograma.resumen()
+        return salida
+
+
+def limpiar_tiempos():
+    with _LOCK:
+        _HISTOGRAMAS.clear()
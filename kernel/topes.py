@@ -0,0 +1,171 @@
+"""
+Topes de escaños por partido.
+
+resolver_topes: fase de topes de asignadip_v2 (tope de sobrerrepresentación
++max_pp y tope absoluto max_seats). Es un reparto por restos mayores acotado
+(water-filling): en cada ronda los partidos que rebasan su tope quedan fijos
+en él y los escaños RP restantes se reparten entre los demás. Un partido
+fijo no vuelve a entrar, así que el punto fijo se alcanza en a lo más una
+ronda por partido.
+
+redistribuir_con_topes: tope de escaños por partido sobre una asignación ya
+hecha (max_seats_per_party, límite de sobrerrepresentación del tablero). Los
+sobrantes se reparten proporcional a los votos con completado entero; acepta
+un lote de escenarios (una fila por escenario).
+"""
+
+import numpy as np
+
+from kernel.lr_ties import lr_ties, derivar_semilla
+
+
+def limites_partido(v_nacional, s_mr, S, max_pp, max_seats):
+    """
+    Tope por partido: min(max(MR, floor((v + max_pp) * S)), max_seats).
+    Regresa (limite, tipo) con tipo 'max_pp' o 'max_seats' según cuál es
+    el tope efectivo.
+    """
+    v = np.asarray(v_nacional, dtype=float)
+    s_mr = np.asarray(s_mr, dtype=np.int64)
+    lim_dist = np.maximum(s_mr, ((v + max_pp) * S).astype(np.int64))
+    limite = np.minimum(lim_dist, max_seats)
+    tipo = np.where(lim_dist <= max_seats, 'max_pp', 'max_seats')
+    return limite, tipo
+
+
+def resolver_topes(v_nacional, s_mr, s_rp, limite, elegibles, m, seed=None):
+    """
+    Ajusta la asignación RP para que ningún partido rebase su tope.
+
+    Args:
+        v_nacional: proporción de votos válidos por partido (arreglo)
+        s_mr: escaños MR por partido
+        s_rp: asignación RP inicial (sin topes)
+        limite: tope total (MR + RP) por partido
+        elegibles: partidos que pasan el umbral (bool)
+        m: escaños RP a repartir
+        seed: semilla del escenario; la ronda r usa derivar_semilla(seed, r)
+
+    Returns:
+        (s_rp ajustado, vinculantes, rondas): vinculantes marca los partidos
+        que quedaron fijos en su tope; rondas es el número de repartos hechos
+    """
+    v = np.asarray(v_nacional, dtype=float)
+    s_mr = np.asarray(s_mr, dtype=np.int64)
+    s_rp = np.array(s_rp, dtype=np.int64)
+    limite = np.asarray(limite, dtype=np.int64)
+    elegibles = np.asarray(elegibles, dtype=bool)
+    fijo = np.zeros(len(v), dtype=bool)
+    rp_tope = np.maximum(0, limite - s_mr)
+
+    rondas = 0
+    for ronda in range(1, len(v) + 1):
+        excede = (s_mr + s_rp > limite) & ~fijo
+        if not excede.any():
+            break
+        rondas = ronda
+        fijo |= excede
+        s_rp[fijo] = rp_tope[fijo]
+
+        # Reparto de los escaños restantes entre los partidos no fijos
+        libres = elegibles & ~fijo
+        v_eff = np.where(libres, v, 0.0)
+        n_rest = max(0, int(m - rp_tope[fijo].sum()))
+        if n_rest == 0 or v_eff.sum() <= 0:
+            s_rp[libres] = 0
+        else:
+            adicional = lr_ties(v_eff, n_rest, q=v_eff.sum() / n_rest, seed=derivar_semilla(seed, ronda))
+            s_rp[libres] = adicional[libres]
+            s_rp[~fijo & ~elegibles] = 0
+    return s_rp, fijo, rondas
+
+
+def _llenado_proporcional(holgura, pesos, repartir):
+    """
+    Reparto continuo de `repartir` escaños proporcional a `pesos`, sin rebasar
+    la holgura de cada partido (water-filling). Filas = escenarios.
+    Se ordenan los partidos por holgura/peso: los primeros se llenan por
+    completo y el resto recibe lambda * peso, con lambda común por fila.
+    """
+    n, k = holgura.shape
+    activo = (pesos > 0) & (holgura > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        razon = np.where(activo, holgura / np.where(activo, pesos, 1.0), np.inf)
+    orden = np.argsort(razon, axis=1, kind='stable')
+    razon_o = np.take_along_axis(razon, orden, axis=1)
+    holgura_o = np.take_along_axis(np.where(activo, holgura, 0.0), orden, axis=1)
+    pesos_o = np.take_along_axis(np.where(activo, pesos, 0.0), orden, axis=1)
+
+    llenos_antes = np.cumsum(holgura_o, axis=1) - holgura_o
+    pesos_desde = np.cumsum(pesos_o[:, ::-1], axis=1)[:, ::-1]
+    # Total repartido si lambda = razón del j-ésimo partido
+    with np.errstate(invalid='ignore'):
+        alcanza = np.where(np.isfinite(razon_o), llenos_antes + razon_o * pesos_desde, np.inf) >= repartir[:, None]
+    j = np.argmax(alcanza, axis=1)
+    filas = np.arange(n)
+    hay = alcanza[filas, j] & (pesos_desde[filas, j] > 0)
+    lam = np.full(n, np.inf)
+    lam[hay] = (repartir[hay] - llenos_antes[filas, j][hay]) / pesos_desde[filas, j][hay]
+    sin_limite = ~np.isfinite(lam)[:, None]
+    lam = np.where(np.isfinite(lam), lam, 0.0)[:, None]
+    cuota = np.where(sin_limite, holgura, np.minimum(holgura, lam * pesos))
+    return np.where(activo, cuota, 0.0)
+
+
+def _completar_enteros(cuota, holgura, repartir):
+    """Parte entera de la cuota + restos mayores (empates por orden de partido)."""
+    base = np.minimum(np.floor(cuota + 1e-9), holgura).astype(np.int64)
+    faltan = repartir - base.sum(axis=1)
+    resto = np.where(base < holgura, cuota - base, -np.inf)
+    orden = np.argsort(-resto, axis=1, kind='stable')
+    rango = np.empty_like(orden)
+    np.put_along_axis(rango, orden, np.arange(orden.shape[1])[None, :].repeat(len(orden), axis=0), axis=1)
+    extra = (rango < faltan[:, None]) & np.isfinite(resto)
+    return base + extra
+
+
+def redistribuir_con_topes(escanos, votos, topes, elegibles=None):
+    """
+    Tope de escaños por partido con reparto de los sobrantes.
+
+    Los partidos por encima de su tope se recortan a él y los escaños
+    recortados se reparten entre los partidos elegibles que siguen por debajo
+    de su tope, proporcional a sus votos y sin rebasar ningún tope (con
+    completado entero por restos mayores). Si los partidos con votos se
+    llenan, lo que sobre se reparte por igual entre los demás elegibles.
+    El total de escaños se conserva mientras quepa bajo los topes.
+
+    Args:
+        escanos: escaños por partido, (partidos,) o (escenarios × partidos)
+        votos: votos (o proporciones) por partido, misma forma
+        topes: tope por partido; escalar, (partidos,) o (escenarios × partidos)
+        elegibles: máscara de partidos que pueden recibir sobrantes (todos por defecto)
+
+    Returns:
+        ndarray int con la forma de `escanos`
+    """
+    escanos = np.asarray(escanos, dtype=np.int64)
+    una_fila = escanos.ndim == 1
+    E = np.atleast_2d(escanos)
+    V = np.broadcast_to(np.asarray(votos, dtype=float), E.shape)
+    T = np.broadcast_to(np.asarray(topes, dtype=np.int64), E.shape)
+    if elegibles is None:
+        M = np.ones(E.shape, dtype=bool)
+    else:
+        M = np.broadcast_to(np.asarray(elegibles, dtype=bool), E.shape)
+
+    recortado = np.minimum(E, T)
+    sobrantes = (E - recortado).sum(axis=1)
+    holgura = np.where(M, T - recortado, 0)
+
+    # Primero por votos; si los partidos con votos se llenan, el resto por igual
+    for pesos in (V, (holgura > 0).astype(float)):
+        repartir = np.minimum(sobrantes, holgura.sum(axis=1))
+        if not repartir.any():
+            break
+        cuota = _llenado_proporcional(holgura.astype(float), pesos, repartir.astype(float))
+        adicional = _completar_enteros(cuota, holgura, repartir)
+        recortado = recortado + adicional
+        holgura = holgura - adicional
+        sobrantes = sobrantes - adicional.sum(axis=1)
+    return recortado[0] if una_fila else recortado
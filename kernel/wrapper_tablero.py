@@ -4,11 +4,15 @@ Funciones wrapper para integrar asignación RP por estado en el tablero
 """
 
 # IMPORTAR LA VERSIÓN CORREGIDA de procesar_diputados
+import logging
 from kernel.procesar_diputados import procesar_diputados_parquet as procesar_diputados_corregido
 from kernel.asignacion_por_estado import procesar_diputados_por_estado
 from kernel.procesar_senadores import procesar_senadores_parquet as procesar_senadores_original
 import pandas as pd
-from kernel.lr_ties import lr_ties
+from kernel.lr_ties import lr_ties, derivar_semilla
+from kernel.datos_electorales import resolver_computos, resolver_matriz
+
+logger = logging.getLogger(__name__)
 
 
 def procesar_diputados_tablero(path_parquet, partidos_base, anio, path_siglado=None, 
@@ -21,13 +25,13 @@ def procesar_diputados_tablero(path_parquet, partidos_base, anio, path_siglado=N
     
     MÉTODO CORRECTO: RP siempre por estado, MR puede ser tradicional.
     """
-    print(f"[WRAPPER] Sistema: {sistema}, MR: {mr_seats}, RP: {rp_seats}")
+    logger.debug('Sistema: %s, MR: %s, RP: %s', sistema, mr_seats, rp_seats)
     
     sistema_tipo = sistema.lower() if sistema else 'mixto'
     
     # Si es sistema RP puro, usar asignación por estado
     if sistema_tipo == 'rp':
-        print(f"[WRAPPER] Sistema RP puro - usando asignación por estado")
+        logger.debug('Sistema RP puro - usando asignación por estado')
         resultado = procesar_diputados_por_estado(
             path_parquet, partidos_base, anio,
             quota_method=quota_method, divisor_method=divisor_method, 
@@ -35,10 +39,8 @@ def procesar_diputados_tablero(path_parquet, partidos_base, anio, path_siglado=N
         )
         
         # Agregar información de votos para compatibilidad
-        import pandas as pd
-        df = pd.read_parquet(path_parquet)
-        df.columns = [str(c).strip().upper() for c in df.columns]
-        votos_cols = [c for c in df.columns if c in partidos_base]
+        matriz = resolver_matriz(path_parquet, 'diputados', anio=anio)
+        votos_cols = matriz.columnas(partidos_base)
         
         # Aplicar umbral a votos
         if umbral is None:
@@ -46,7 +48,7 @@ def procesar_diputados_tablero(path_parquet, partidos_base, anio, path_siglado=N
         if umbral >= 1:
             umbral = umbral / 100
             
-        votos_partido = df[votos_cols].sum().to_dict()
+        votos_partido = dict(zip(votos_cols, matriz.totales_nacionales(votos_cols).tolist()))
         total_votos = sum(votos_partido.values())
         
         votos_ok = {}
@@ -59,7 +61,7 @@ def procesar_diputados_tablero(path_parquet, partidos_base, anio, path_siglado=N
     
     # Si es sistema mixto, usar método tradicional completo (MR + RP nacional)
     elif sistema_tipo == 'mixto':
-        print(f"[WRAPPER] Sistema mixto - usando método tradicional completo")
+        logger.debug('Sistema mixto - usando método tradicional completo')
         
         # Para el sistema mixto tradicional, usar la función CORREGIDA que maneja
         # correctamente MR + RP con topes nacionales y cálculo MR por votos
@@ -70,13 +72,13 @@ def procesar_diputados_tablero(path_parquet, partidos_base, anio, path_siglado=N
             divisor_method=divisor_method, umbral=umbral, max_seats_per_party=max_seats_per_party
         )
         
-        print(f"[WRAPPER] Mixto tradicional - MR: {sum(resultado_mixto['mr'].values())}, RP: {sum(resultado_mixto['rp'].values())}, Total: {sum(resultado_mixto['tot'].values())}")
+        logger.debug('Mixto tradicional - MR: %s, RP: %s, Total: %s', sum(resultado_mixto['mr'].values()), sum(resultado_mixto['rp'].values()), sum(resultado_mixto['tot'].values()))
         
         return resultado_mixto
     
     # Si es sistema MR puro, usar método tradicional CORREGIDO
     else:
-        print(f"[WRAPPER] Sistema MR puro - usando método tradicional")
+        logger.debug('Sistema MR puro - usando método tradicional')
         return procesar_diputados_corregido(
             path_parquet, partidos_base, anio, path_siglado=path_siglado, 
             max_seats=max_seats, sistema=sistema_tipo, mr_seats=mr_seats, rp_seats=rp_seats,
@@ -154,7 +156,7 @@ def asignar_senado_rp_dinamico_tablero(df, partidos_base, magnitud_total=96, umb
     detalle_por_estado = {}
     
     # Procesar cada estado (la magia sucede aquí)
-    for _, row in df.iterrows():
+    for i, (_, row) in enumerate(df.iterrows()):
         estado = row['ENTIDAD']
         
         # Votos por partido en este estado
@@ -184,7 +186,7 @@ def asignar_senado_rp_dinamico_tablero(df, partidos_base, magnitud_total=96, umb
         q = total_votos_ok / senadores_por_estado if senadores_por_estado > 0 else None
         
         # La fórmula secreta
-        senadores_list = lr_ties(votos_list, senadores_por_estado, q=q, seed=seed)
+        senadores_list = lr_ties(votos_list, senadores_por_estado, q=q, seed=derivar_semilla(seed, i))
         
         # Convertir a diccionario
         senadores_estado = {partidos_base[i]: int(senadores_list[i]) for i in range(len(partidos_base))}
@@ -219,8 +221,7 @@ def procesar_senadores_tablero(path_parquet, partidos_base, anio, path_siglado=N
     # Si es sistema RP, usar la magia dinámica RP
     if sistema_tipo == 'rp':
         # Cargar datos
-        df = pd.read_parquet(path_parquet)
-        df.columns = [str(c).strip().upper() for c in df.columns]
+        df = resolver_computos(path_parquet, 'senado', anio=anio)
         
         # Aplicar la magia electoral secreta RP
         resultado_magico = asignar_senado_rp_dinamico_tablero(
@@ -255,8 +256,7 @@ def procesar_senadores_tablero(path_parquet, partidos_base, anio, path_siglado=N
     # Si es sistema MR, usar la magia dinámica MR
     elif sistema_tipo == 'mr':
         # Cargar datos
-        df = pd.read_parquet(path_parquet)
-        df.columns = [str(c).strip().upper() for c in df.columns]
+        df = resolver_computos(path_parquet, 'senado', anio=anio)
         
         # Aplicar la magia electoral secreta MR
         resultado_magico = asignar_senado_mr_dinamico_tablero(
@@ -1,7 +1,14 @@
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-import duckdb
+import logging
 import os
+import time
+from kernel.bitacora import configurar_logging, contexto_escenario, nuevo_escenario_id, ESCENARIO_ID
+from kernel.tiempos import etapa, medicion, agregar_tiempos, server_timing, registrar_tiempos, resumen_tiempos
+
+# Bitácora: nivel y formato por LOG_LEVEL / LOG_FORMAT
+configurar_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -27,18 +34,89 @@ PARTY_COLORS = {
 	"FXM": "#FF69B4",
 }
 
-from fastapi.responses import JSONResponse
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from kernel.serializacion import dumps, sin_tabla
+
+
+class RespuestaJSON(JSONResponse):
+	"""JSONResponse con el codificador rápido (orjson si está) y tipos de NumPy nativos."""
+	def render(self, content) -> bytes:
+		with etapa('json'):
+			return dumps(content)
+
+from pydantic import BaseModel
+from typing import List, Optional
 
 
-from kernel.magnitud import get_magnitud
+from kernel.magnitud import get_magnitud, barrido_magnitudes, tope_automatico, ajustar_sliders_mixto
 from kernel.sobrerrepresentacion import aplicar_limite_sobrerrepresentacion
+from kernel.topes import redistribuir_con_topes
 from kernel.umbral import aplicar_umbral
 from kernel.regla_electoral import aplicar_regla_electoral
 from kernel.wrapper_tablero import procesar_diputados_tablero as procesar_diputados_parquet
 from kernel.asignacion_por_estado import procesar_diputados_por_estado
 from kernel.procesar_senadores import procesar_senadores_parquet
-from kernel.plan_c import procesar_plan_c_diputados
+from kernel.resumen import (
+	cargar_resumenes, obtener_resumen, llaves_resumen,
+	serializar_respuesta, registrar_respuestas, obtener_respuesta, etag_coincide, acepta_gzip,
+)
 from kernel.kpi_utils import kpis_votos_escanos
+from kernel.datos_electorales import cargar_registro, obtener_dataset, resolver_matriz
+from kernel.cache_escenarios import CacheEscenarios, escenario_canonico, llave_escenario
+from kernel.ejecutor import EjecutorSimulaciones
+import asyncio
+
+@app.middleware("http")
+async def contexto_peticion(request: Request, call_next):
+	"""
+	Contexto de la petición:
+	- id de escenario para la bitácora: el X-Request-ID del cliente o uno
+	  nuevo; todos los registros de la petición lo llevan y se regresa en la
+	  respuesta
+	- tiempos por etapa: se reportan en Server-Timing y se agregan a los
+	  histogramas de /simulacion/metricas
+	"""
+	escenario_id = request.headers.get("x-request-id", "")[:64] or nuevo_escenario_id()
+	inicio = time.perf_counter()
+	with contexto_escenario(escenario_id), medicion() as tiempos:
+		respuesta = await call_next(request)
+	respuesta.headers["X-Request-ID"] = escenario_id
+	if tiempos is not None:
+		tiempos['total'] = time.perf_counter() - inicio
+		respuesta.headers["Server-Timing"] = server_timing(tiempos)
+		ruta = request.scope.get("route")
+		if ruta is not None:
+			registrar_tiempos(ruta.path, tiempos)
+	return respuesta
+
+@app.on_event("startup")
+def precargar_datos():
+	# Lee y normaliza una sola vez todos los cómputos/siglados de data/
+	cargar_registro()
+	cargar_resumenes(colores=PARTY_COLORS)
+	precalcular_respuestas()
+	EJECUTOR.iniciar()
+
+@app.on_event("shutdown")
+def detener_ejecutor():
+	EJECUTOR.detener()
+
+def recargar_datos():
+	# Cambió algún archivo de data/: volver a leer todo. Corre en el hilo de
+	# recarga de la caché; cada registro se sustituye completo al terminar
+	# de leerse, así que las peticiones en curso siguen con los datos anteriores
+	cargar_registro()
+	cargar_resumenes(colores=PARTY_COLORS)
+	precalcular_respuestas()
+	# Los procesos del pool leyeron data/ al arrancar: se cambian por unos nuevos
+	EJECUTOR.reiniciar()
+
+# Resultados de /simulacion por escenario canónico (LRU)
+CACHE_ESCENARIOS = CacheEscenarios(al_invalidar=recargar_datos)
+
+# Pool de procesos para escenarios personalizados (CPU)
+EJECUTOR = EjecutorSimulaciones()
 
 def safe_mae(v, s):
 	v = [x for x in v if x is not None]
@@ -52,66 +130,51 @@ def safe_gallagher(v, s):
 	if not v or not s or len(v) != len(s): return 0
 	return (0.5 * sum((100*(a/(sum(v) or 1)) - 100*(b/(sum(s) or 1)))**2 for a,b in zip(v,s)))**0.5
 
-@app.get("/simulacion")
-def simulacion(
+# Partidos base por año del modelo personalizado (otros años: los de 2024)
+PARTIDOS_POR_ANIO = {
+	2018: ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","NA"],
+	2021: ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","RSP","FXM"],
+	2024: ["PAN","PRI","PRD","PVEM","PT","MC","MORENA"],
+}
+
+def calcular_simulacion(
 	anio: int,
 	camara: str,
 	modelo: str,
-	magnitud: int = Query(None),
-	sobrerrepresentacion: float = Query(None),
-	umbral: float = Query(None),
-	regla_electoral: str = Query(None),
-	mixto_mr_seats: int = Query(None),
-	mixto_rp_seats: int = Query(None),
-	sistema: str = Query('mixto'),
-	quota_method: str = Query('hare'),
-	divisor_method: str = Query('dhondt'),
-	max_seats_per_party: int = Query(None),
-	primera_minoria: bool = Query(True),  # Parámetro para senado
-	limite_escanos_pm: int = Query(None)  # Límite de escaños para primera minoría
+	magnitud: int = None,
+	sobrerrepresentacion: float = None,
+	umbral: float = None,
+	regla_electoral: str = None,
+	mixto_mr_seats: int = None,
+	mixto_rp_seats: int = None,
+	sistema: str = 'mixto',
+	quota_method: str = 'hare',
+	divisor_method: str = 'dhondt',
+	max_seats_per_party: int = None,
+	primera_minoria: bool = True,  # Parámetro para senado
+	limite_escanos_pm: int = None  # Límite de escaños para primera minoría
 ):
-	import logging
+	"""
+	Núcleo de /simulacion: regresa (contenido, status_code) sin construir la
+	respuesta HTTP, para poder evaluarlo también desde /simulacion/batch.
+	"""
 	camara_lower = camara.lower()
 	
 	# Inicializar variables por defecto
 	seat_chart = []
 	kpis = {"total_seats": 0, "gallagher": 0, "mae_votos_vs_escanos": 0, "total_votos": 0}
 	
-	# Verificar si se debe usar Plan C precomputado para diputados
-	if camara_lower == "diputados" and modelo.lower() == "plan c":
-		seat_chart, kpis = procesar_plan_c_diputados(anio)
-		if seat_chart is None or kpis is None:
-			kpis = {'error': 'Fallo el procesamiento de Plan C precomputado. Revisa logs y archivos.'}
-			seat_chart = []
-	
 	# Si modelo personalizado, procesar datos reales
 	if modelo.lower() == "personalizado":
 		# Nuevo: tope máximo de escaños por partido (puede venir como parámetro, si no, None)
-		logging.debug(f"[DEBUG] max_seats_per_party recibido en petición: {max_seats_per_party}")
+		logger.debug('max_seats_per_party recibido en petición: %s', max_seats_per_party)
 		
-		# INTELIGENCIA: Si no se especifica tope, derivarlo automáticamente
-		if max_seats_per_party is None and magnitud is not None:
-			# Tope automático: 60% de la magnitud (evita mayorías absolutas)
-			max_seats_per_party_auto = int(magnitud * 0.6)
-			logging.debug(f"[DEBUG] 🤖 Tope automático calculado: {max_seats_per_party_auto} (60% de {magnitud})")
-			# Solo aplicar si es razonable (mínimo 10 escaños)
-			if max_seats_per_party_auto >= 10:
-				max_seats_per_party = max_seats_per_party_auto
-				logging.debug(f"[DEBUG] ✅ Aplicando tope automático: {max_seats_per_party}")
-			else:
-				logging.debug(f"[DEBUG] ❌ Tope automático muy bajo ({max_seats_per_party_auto}), no se aplica")
+		max_seats_per_party = tope_automatico(magnitud, max_seats_per_party)
 		
 		if camara_lower == "diputados":
 			# Lógica existente para diputados personalizado
 			# Define partidos base según año
-			if anio == 2018:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","NA"]
-			elif anio == 2021:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","RSP","FXM"]
-			elif anio == 2024:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA"]
-			else:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA"]
+			partidos_base = PARTIDOS_POR_ANIO.get(anio, PARTIDOS_POR_ANIO[2024])
 			# Selecciona archivo y siglado
 			if anio == 2018:
 				parquet_path = "data/computos_diputados_2018.parquet"
@@ -126,85 +189,22 @@ def simulacion(
 				parquet_path = "data/computos_diputados_2021.parquet"
 				siglado_path = "data/siglado-diputados-2021.csv"
 			# Determina magnitud (número de escaños) si viene del frontend
-			print(f"[DEBUG] magnitud recibida en petición: {magnitud}")
-			print(f"[DEBUG] umbral recibido en petición: {umbral}")
+			logger.debug('magnitud recibida en petición: %s', magnitud)
+			logger.debug('umbral recibido en petición: %s', umbral)
 			max_seats = magnitud if magnitud is not None else 300
 			
-			# ✨ VALIDACIONES INTELIGENTES Y ROBUSTAS ✨
-			print(f"[INFO] Aplicando validaciones inteligentes...")
-			
-			# === 1. VALIDAR QUE LA SUMA NO EXCEDA EL TOTAL ===
-			if mixto_mr_seats is not None and mixto_rp_seats is not None:
-				suma_total = mixto_mr_seats + mixto_rp_seats
-				if suma_total != max_seats:
-					print(f"[ERROR] Suma inválida: MR({mixto_mr_seats}) + RP({mixto_rp_seats}) = {suma_total} ≠ {max_seats} total")
-					# AJUSTE INTELIGENTE: Si se especificaron ambos pero no suman bien, ajustar RP
-					if suma_total > max_seats:
-						mixto_rp_seats = max_seats - mixto_mr_seats
-						print(f"[FIX] Auto-ajustando RP: {mixto_rp_seats} para que sume {max_seats}")
-					elif suma_total < max_seats:
-						mixto_rp_seats = max_seats - mixto_mr_seats  
-						print(f"[FIX] Auto-completando RP: {mixto_rp_seats} para que sume {max_seats}")
-			
-			# === 2. SLIDERS INTELIGENTES (si solo se especifica uno) ===
-			elif mixto_mr_seats is not None and mixto_rp_seats is None:
-				# Usuario movió slider MR → ajustar RP automáticamente
-				mixto_rp_seats = max_seats - mixto_mr_seats
-				print(f"[AUTO]  Slider inteligente: MR={mixto_mr_seats} → RP auto-ajustado a {mixto_rp_seats}")
-				
-			elif mixto_rp_seats is not None and mixto_mr_seats is None:
-				# Usuario movió slider RP → ajustar MR automáticamente  
-				mixto_mr_seats = max_seats - mixto_rp_seats
-				print(f"[AUTO]  Slider inteligente: RP={mixto_rp_seats} → MR auto-ajustado a {mixto_mr_seats}")
-			
-			# === 3. VALIDACIONES DE RANGOS SENSATOS ===
-			if mixto_mr_seats is not None:
-				# Validar que MR esté en rango sensato (mínimo 10%, máximo 90%)
-				min_mr = max(1, max_seats // 10)  # Mínimo 10% pero al menos 1
-				max_mr = max_seats - max(1, max_seats // 10)  # Máximo 90%
-				
-				if mixto_mr_seats < min_mr:
-					print(f"[WARN]  mixto_mr_seats={mixto_mr_seats} muy bajo (min {min_mr}), ajustando...")
-					mixto_mr_seats = min_mr
-					mixto_rp_seats = max_seats - mixto_mr_seats
-				elif mixto_mr_seats > max_mr:
-					print(f"[WARN]  mixto_mr_seats={mixto_mr_seats} muy alto (max {max_mr}), ajustando...")
-					mixto_mr_seats = max_mr
-					mixto_rp_seats = max_seats - mixto_mr_seats
-			
-			if mixto_rp_seats is not None:
-				# Validar que RP esté en rango sensato (mínimo 10%, máximo 90%)
-				min_rp = max(1, max_seats // 10)
-				max_rp = max_seats - max(1, max_seats // 10)
-				
-				if mixto_rp_seats < min_rp:
-					print(f"[WARN]  mixto_rp_seats={mixto_rp_seats} muy bajo (min {min_rp}), ajustando...")
-					mixto_rp_seats = min_rp
-					mixto_mr_seats = max_seats - mixto_rp_seats
-				elif mixto_rp_seats > max_rp:
-					print(f"[WARN]  mixto_rp_seats={mixto_rp_seats} muy alto (max {max_rp}), ajustando...")
-					mixto_rp_seats = max_rp
-					mixto_mr_seats = max_seats - mixto_rp_seats
-			
-			# === 4. VALIDACIÓN FINAL: ASEGURAR QUE SUMA SEA EXACTA ===
-			if mixto_mr_seats is not None and mixto_rp_seats is not None:
-				suma_final = mixto_mr_seats + mixto_rp_seats
-				if suma_final != max_seats:
-					# Esto no debería pasar, pero por seguridad
-					print(f"[ERROR] Suma final incorrecta: {suma_final} ≠ {max_seats}")
-					mixto_rp_seats = max_seats - mixto_mr_seats
-					print(f"[FIX] Forzando corrección: RP = {mixto_rp_seats}")
-			
-			print(f"[RESULT] Validaciones completadas: MR={mixto_mr_seats}, RP={mixto_rp_seats}, Total={max_seats}")
+			mixto_mr_seats, mixto_rp_seats = ajustar_sliders_mixto(max_seats, mixto_mr_seats, mixto_rp_seats)
 			
 			# Determinar sistema y escaños MR/RP
 			sistema_tipo = sistema.lower() if sistema else 'mixto'
 			mr_seats = mixto_mr_seats if mixto_mr_seats is not None else (max_seats // 2 if sistema_tipo == 'mixto' else (max_seats if sistema_tipo == 'mr' else 0))
 			rp_seats = mixto_rp_seats if mixto_rp_seats is not None else (max_seats - mr_seats if sistema_tipo == 'mixto' else (max_seats if sistema_tipo == 'rp' else 0))
-			print(f"[DEBUG] sistema: {sistema_tipo}, MR: {mr_seats}, RP: {rp_seats}, Total: {max_seats}")
+			logger.debug('sistema: %s, MR: %s, RP: %s, Total: %s', sistema_tipo, mr_seats, rp_seats, max_seats)
 			try:
+				# Dataset precargado; si el año no está en el registro se resuelve por ruta
+				fuente_datos = obtener_dataset(anio, 'diputados') or parquet_path
 				resultado_asignadip = procesar_diputados_parquet(
-					parquet_path, partidos_base, anio, path_siglado=siglado_path, max_seats=max_seats,
+					fuente_datos, partidos_base, anio, path_siglado=siglado_path, max_seats=max_seats,
 					sistema=sistema_tipo, mr_seats=mr_seats, rp_seats=rp_seats,
 					regla_electoral=regla_electoral, quota_method=quota_method, divisor_method=divisor_method, umbral=umbral, max_seats_per_party=max_seats_per_party
 				)
@@ -239,91 +239,64 @@ def simulacion(
 				]
 				
 				# Aplicar filtro de umbral si está definido
-				logging.debug(f"[DEBUG] umbral recibido en petición: {umbral}")
+				logger.debug('umbral recibido en petición: %s', umbral)
 				if umbral is not None and umbral > 0:
-					logging.debug(f"[DEBUG] Aplicando filtro de umbral: {umbral}")
+					logger.debug('Aplicando filtro de umbral: %s', umbral)
 					seat_chart = aplicar_umbral(seat_chart, umbral)
 					# Validar suma de votos tras filtros
 					total_votos_filtrados = sum([p.get('votes', 0) for p in seat_chart])
 					if total_votos_filtrados == 0:
-						logging.error("[ERROR] La suma de votos tras aplicar umbral es cero. No se pueden calcular escaños.")
-						return JSONResponse(
-							content={
-								"error": "La suma de votos tras aplicar el umbral es cero. No se pueden calcular escaños.",
-								"seatChart": [],
-								"kpis": {},
-								"tabla": []
-							},
-							headers={"Access-Control-Allow-Origin": "*"},
-							status_code=400
-						)
+						logger.error('La suma de votos tras aplicar umbral es cero. No se pueden calcular escaños.')
+						return {
+							"error": "La suma de votos tras aplicar el umbral es cero. No se pueden calcular escaños.",
+							"seatChart": [],
+							"kpis": {},
+							"tabla": []
+						}, 400
 				else:
-					logging.debug("[DEBUG] No se aplica filtro de umbral (None, vacío o 0)")
+					logger.debug('No se aplica filtro de umbral (None, vacío o 0)')
 				
 				# Aplicar límite de sobrerrepresentación solo para Diputados
-				print(f"[DEBUG] ⚖️ SOBRERREPRESENTACIÓN recibida en petición: {sobrerrepresentacion}")
+				logger.debug('⚖️ SOBRERREPRESENTACIÓN recibida en petición: %s', sobrerrepresentacion)
 				if camara_lower == "diputados":
 					if sobrerrepresentacion is not None and sobrerrepresentacion > 0:
-						print(f"[DEBUG] Aplicando sobrerrepresentación para DIPUTADOS")
+						logger.debug('Aplicando sobrerrepresentación para DIPUTADOS')
 						limite_sobre = sobrerrepresentacion
 						if limite_sobre >= 1:
-							print(f"[WARN] El límite de sobrerrepresentación recibido es {limite_sobre}, se interpreta como porcentaje: {limite_sobre/100}")
+							logger.warning('El límite de sobrerrepresentación recibido es %s, se interpreta como porcentaje: %s', limite_sobre, limite_sobre / 100)
 							limite_sobre = limite_sobre / 100
-						print(f"[DEBUG] Aplicando límite de sobrerrepresentación: {limite_sobre}")
-						seat_chart_antes = [{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]]
-						print(f"[DEBUG] ANTES sobrerrepresentación: {seat_chart_antes}")
-						seat_chart = aplicar_limite_sobrerrepresentacion(seat_chart, limite_sobre)
-						seat_chart_despues = [{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]]
-						print(f"[DEBUG] DESPUÉS sobrerrepresentación: {seat_chart_despues}")
+						logger.debug('Aplicando límite de sobrerrepresentación: %s', limite_sobre)
+						if logger.isEnabledFor(logging.DEBUG):
+							logger.debug('ANTES sobrerrepresentación: %s', [{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]])
+						with etapa('sobrerrepresentacion'):
+							seat_chart = aplicar_limite_sobrerrepresentacion(seat_chart, limite_sobre)
+						if logger.isEnabledFor(logging.DEBUG):
+							logger.debug('DESPUÉS sobrerrepresentación: %s', [{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]])
 					else:
-						print(f"[DEBUG] No se aplica límite de sobrerrepresentación (valor={sobrerrepresentacion})")
+						logger.debug('No se aplica límite de sobrerrepresentación (valor=%s)', sobrerrepresentacion)
 				else:
-					print(f"[DEBUG] No se aplica límite de sobrerrepresentación para cámara: {camara_lower}")
+					logger.debug('No se aplica límite de sobrerrepresentación para cámara: %s', camara_lower)
 				
 				# Aplicar tope de escaños por partido si está definido (solo para Diputados)
 				if camara_lower == "diputados":
-					print(f"[DEBUG] TOPE DE ESCAÑOS max_seats_per_party: {max_seats_per_party}")
+					logger.debug('TOPE DE ESCAÑOS max_seats_per_party: %s', max_seats_per_party)
 					if max_seats_per_party is not None and max_seats_per_party > 0:
-						print(f"[DEBUG] Aplicando TOPE DE ESCAÑOS por partido: {max_seats_per_party}")
-						sobrantes = 0
-						# 1. Recortar partidos que superan el tope y acumular sobrantes
-						seat_chart_antes_tope = [{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]]
-						print(f"[DEBUG] ANTES tope escaños: {seat_chart_antes_tope}")
+						logger.debug('Aplicando TOPE DE ESCAÑOS por partido: %s', max_seats_per_party)
+						# Recortar partidos que superan el tope y repartir los sobrantes proporcional
+						# a los votos entre los partidos que no han alcanzado el tope
+						if logger.isEnabledFor(logging.DEBUG):
+							logger.debug('ANTES tope escaños: %s', [{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]])
 						for p in seat_chart:
 							if p['seats'] > max_seats_per_party:
-								sobrantes += p['seats'] - max_seats_per_party
-								print(f"[WARN] Tope de escaños aplicado: {p['party']} tenía {p['seats']} → {max_seats_per_party}")
-								p['seats'] = max_seats_per_party
-						# 2. Reasignar sobrantes proporcionalmente a los partidos que no han alcanzado el tope
-						while sobrantes > 0:
-							elegibles = [p for p in seat_chart if p['seats'] < max_seats_per_party]
-							if not elegibles:
-								break
-							total_votos_elegibles = sum(p.get('votes', 0) for p in elegibles)
-							if total_votos_elegibles == 0:
-								for p in elegibles:
-									if sobrantes == 0:
-										break
-									p['seats'] += 1
-									sobrantes -= 1
-								break
-							asignaciones = []
-							for p in elegibles:
-								asignar = min(sobrantes, max_seats_per_party - p['seats'])
-								prop = p.get('votes', 0) / total_votos_elegibles
-								seats_to_add = min(asignar, int(round(prop * sobrantes)))
-								asignaciones.append(seats_to_add)
-							total_asignados = sum(asignaciones)
-							faltan = sobrantes - total_asignados
-							for i, p in enumerate(elegibles):
-								if faltan <= 0:
-									break
-								if p['seats'] + asignaciones[i] < max_seats_per_party:
-									asignaciones[i] += 1
-									faltan -= 1
-							for i, p in enumerate(elegibles):
-								p['seats'] += asignaciones[i]
-								sobrantes -= asignaciones[i]
+								logger.warning('Tope de escaños aplicado: %s tenía %s → %s', p['party'], p['seats'], max_seats_per_party)
+						with etapa('topes'):
+							escanos = redistribuir_con_topes(
+								[p['seats'] for p in seat_chart],
+								[p.get('votes', 0) for p in seat_chart],
+								max_seats_per_party,
+							)
+						for p, e in zip(seat_chart, escanos):
+							p['seats'] = int(e)
 						# Ajuste final: asegurar que la suma total de escaños no cambió
 						total_curules_after_cap = sum(p['seats'] for p in seat_chart)
 						ajuste = total_curules_after_cap - max_seats
@@ -342,15 +315,15 @@ def simulacion(
 									if ajuste == 0:
 										break
 					else:
-						print(f"[DEBUG] No se aplica tope de escaños (valor={max_seats_per_party})")
+						logger.debug('No se aplica tope de escaños (valor=%s)', max_seats_per_party)
 				else:
-					print(f"[DEBUG] No se aplica tope de escaños para cámara: {camara_lower}")
+					logger.debug('No se aplica tope de escaños para cámara: %s', camara_lower)
 				
 				# Recalcular totales finales después de aplicar TODOS los filtros
 				total_curules = sum([p["seats"] for p in seat_chart]) or 1
-				print(f"[DEBUG] RESULTADO FINAL después de sobrerrepresentación y tope:")
-				final_top3 = [{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]]
-				print(f"[DEBUG] Top 3 final: {final_top3}, Total escaños: {total_curules}")
+				if logger.isEnabledFor(logging.DEBUG):
+					logger.debug('RESULTADO FINAL después de sobrerrepresentación y tope: top 3 %s, total escaños %s',
+						[{'party': p['party'], 'seats': p['seats']} for p in seat_chart[:3]], total_curules)
 				
 				# Recalcular porcentajes después de todos los filtros
 				for p in seat_chart:
@@ -360,31 +333,23 @@ def simulacion(
 				votos = [p.get('votes', 0) for p in seat_chart]
 				curules = [p.get('seats', 0) for p in seat_chart]
 				
-				kpis = {
-					"total_seats": total_curules,
-					"mae_votos_vs_escanos": safe_mae(votos, curules),
-					"gallagher": safe_gallagher(votos, curules),
-					"total_votos": sum(votos)
-				}
+				with etapa('kpis'):
+					kpis = {
+						"total_seats": total_curules,
+						"mae_votos_vs_escanos": safe_mae(votos, curules),
+						"gallagher": safe_gallagher(votos, curules),
+						"total_votos": sum(votos)
+					}
 				
 			except Exception as e:
-				import traceback
-				print(f"[ERROR] Procesando diputados: {e}")
-				traceback.print_exc()
-				seat_chart = []
-				kpis = {'error': 'Fallo el procesamiento de diputados. Revisa logs y archivos.'}
+				logger.exception('Procesando diputados: %s', e)
+				# 500: un fallo (p. ej. archivo a medio escribir) no se guarda en la caché
+				return {"seatChart": [], "kpis": {'error': 'Fallo el procesamiento de diputados. Revisa logs y archivos.'}, "tabla": []}, 500
 		
 		elif camara_lower == "senado":
 			# Nueva lógica para senado personalizado
 			# Define partidos base según año
-			if anio == 2018:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","NA"]
-			elif anio == 2021:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","RSP","FXM"]
-			elif anio == 2024:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA"]
-			else:
-				partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA"]
+			partidos_base = PARTIDOS_POR_ANIO.get(anio, PARTIDOS_POR_ANIO[2024])
 			
 			# Selecciona archivos de senado
 			if anio == 2018:
@@ -406,12 +371,13 @@ def simulacion(
 			total_mr_seats = mixto_mr_seats if mixto_mr_seats is not None else None  # MR puede limitarse con slider
 			umbral_senado = umbral if umbral is not None else 0.03  # 3% por defecto para senado
 			
-			print(f"[DEBUG] Senado - magnitud: {max_seats}, RP seats: {total_rp_seats}, MR seats: {total_mr_seats}, umbral: {umbral_senado}")
-			print(f"[DEBUG] Senado - primera_minoria: {primera_minoria}")
+			logger.debug('Senado - magnitud: %s, RP seats: %s, MR seats: %s, umbral: %s', max_seats, total_rp_seats, total_mr_seats, umbral_senado)
+			logger.debug('Senado - primera_minoria: %s', primera_minoria)
 			
 			try:
+				fuente_datos = obtener_dataset(anio, 'senado') or parquet_path
 				resultado_asignasen = procesar_senadores_parquet(
-					parquet_path, partidos_base, anio, path_siglado=siglado_path, 
+					fuente_datos, partidos_base, anio, path_siglado=siglado_path, 
 					total_rp_seats=total_rp_seats, total_mr_seats=total_mr_seats, umbral=umbral_senado,
 					quota_method=quota_method, divisor_method=divisor_method,
 					primera_minoria=primera_minoria, limite_escanos_pm=limite_escanos_pm
@@ -420,6 +386,8 @@ def simulacion(
 				# Validación del resultado
 				if not isinstance(resultado_asignasen, dict):
 					raise ValueError(f"Error interno: el resultado de asignación de senadores no es un diccionario. Tipo recibido: {type(resultado_asignasen)}")
+				if 'error' in resultado_asignasen:
+					raise ValueError(f"Error en procesar_senadores_parquet: {resultado_asignasen['error']}")
 				
 				# Para senado, normalmente se usa el total
 				dict_escanos = resultado_asignasen.get('tot', {})
@@ -427,7 +395,7 @@ def simulacion(
 				
 				# Si primera_minoria es False, ajustar los resultados eliminando PM
 				if not primera_minoria:
-					logging.debug("[DEBUG] Eliminando escaños de Primera Minoría (PM)")
+					logger.debug('Eliminando escaños de Primera Minoría (PM)')
 					mr_escanos = resultado_asignasen.get('mr', {})
 					rp_escanos = resultado_asignasen.get('rp', {})
 					pm_escanos = resultado_asignasen.get('pm', {})
@@ -437,9 +405,9 @@ def simulacion(
 					for partido in mr_escanos.keys() | rp_escanos.keys():
 						dict_escanos[partido] = mr_escanos.get(partido, 0) + rp_escanos.get(partido, 0)
 					
-					logging.debug(f"[DEBUG] Escaños sin PM - MR: {mr_escanos}, RP: {rp_escanos}, Total: {dict_escanos}")
+					logger.debug('Escaños sin PM - MR: %s, RP: %s, Total: %s', mr_escanos, rp_escanos, dict_escanos)
 				else:
-					logging.debug("[DEBUG] Incluyendo Primera Minoría (PM) en el cálculo")
+					logger.debug('Incluyendo Primera Minoría (PM) en el cálculo')
 				
 				if not isinstance(dict_escanos, dict):
 					raise ValueError(f"Error interno: el resultado de escaños para senado no es un diccionario. Tipo recibido: {type(dict_escanos)}")
@@ -447,7 +415,7 @@ def simulacion(
 				# Validar y ajustar magnitud si es necesario
 				total_escanos_calculados = sum(dict_escanos.values())
 				if total_escanos_calculados != max_seats:
-					logging.warning(f"[WARN] Total de escaños calculados ({total_escanos_calculados}) difiere de magnitud especificada ({max_seats})")
+					logger.warning('Total de escaños calculados (%s) difiere de magnitud especificada (%s)', total_escanos_calculados, max_seats)
 					if max_seats < total_escanos_calculados:
 						# Necesitamos reducir escaños proporcionalmente
 						factor = max_seats / total_escanos_calculados
@@ -461,7 +429,7 @@ def simulacion(
 								dict_escanos[partidos_ordenados[i % len(partidos_ordenados)]] += 1
 							elif diferencia < 0 and dict_escanos[partidos_ordenados[i % len(partidos_ordenados)]] > 0:
 								dict_escanos[partidos_ordenados[i % len(partidos_ordenados)]] -= 1
-					logging.debug(f"[DEBUG] Escaños ajustados a magnitud {max_seats}: {dict_escanos}")
+					logger.debug('Escaños ajustados a magnitud %s: %s', max_seats, dict_escanos)
 				
 				total_curules = sum(dict_escanos.values()) or 1
 				seat_chart = [
@@ -482,72 +450,33 @@ def simulacion(
 				votos = [p.get('votes', 0) for p in seat_chart]
 				curules = [p.get('seats', 0) for p in seat_chart]
 				
-				kpis = {
-					"total_seats": total_curules,
-					"mae_votos_vs_escanos": safe_mae(votos, curules),
-					"gallagher": safe_gallagher(votos, curules),
-					"total_votos": sum(votos)
-				}
+				with etapa('kpis'):
+					kpis = {
+						"total_seats": total_curules,
+						"mae_votos_vs_escanos": safe_mae(votos, curules),
+						"gallagher": safe_gallagher(votos, curules),
+						"total_votos": sum(votos)
+					}
 				
 			except Exception as e:
-				import traceback
-				print(f"[ERROR] Procesando senadores: {e}")
-				traceback.print_exc()
-				seat_chart = []
-				kpis = {'error': 'Fallo el procesamiento de senadores. Revisa logs y archivos.'}
+				logger.exception('Procesando senadores: %s', e)
+				# 500: un fallo (p. ej. archivo a medio escribir) no se guarda en la caché
+				return {"seatChart": [], "kpis": {'error': 'Fallo el procesamiento de senadores. Revisa logs y archivos.'}, "tabla": []}, 500
 	else:
 		# Lógica para modelos vigente, rp, mr, mixto usando archivos resumen
 		try:
-			# Selecciona el archivo Parquet según la cámara (ruta relativa)
 			if camara.lower() == "senado":
-				parquet_path = "data/senado-resumen-modelos-votos-escanos.parquet"
 				magnitud_camara = 128  # Senado tiene 128 escaños
 			else:
-				parquet_path = "data/resumen-modelos-votos-escanos-diputados.parquet"
 				magnitud_camara = magnitud if magnitud is not None else 500  # Diputados por defecto
 			
-			con = duckdb.connect()
-			query = f'''
-				SELECT partido, asientos_partido, pct_escanos, total_escanos, total_votos, mae_votos_vs_escanos, indice_gallagher, pct_votos
-				FROM '{parquet_path}'
-				WHERE anio = {anio}
-				  AND LOWER(modelo) = '{modelo.lower()}'
-			'''
-			df = con.execute(query).df()
-			
-			if df.empty:
+			# Seat chart y KPIs ya armados al cargar los resúmenes (búsqueda por llave)
+			resumen = obtener_resumen(camara_lower, anio, modelo)
+			if resumen is None:
 				# Devuelve respuesta vacía y CORS OK
-				return JSONResponse(
-					content={"seatChart": [], "kpis": {}, "tabla": []},
-					headers={"Access-Control-Allow-Origin": "*"},
-					status_code=200
-				)
-			
-			# Prepara el seat chart
-			seat_chart = [
-				{
-					"party": row["partido"],
-					"seats": int(row["asientos_partido"]),
-					"color": PARTY_COLORS.get(row["partido"], "#888"),
-					"percent": round(float(row["pct_escanos"]) * 100, 2),
-					"votes": float(row["pct_votos"]) if "pct_votos" in row else 0.0
-				}
-				for _, row in df.iterrows()
-				if int(row["asientos_partido"]) > 0
-			]
-
-			# KPIs (toma el primer registro, todos tienen el mismo total)
-			kpi_row = df.iloc[0] if not df.empty else None
+				return {"seatChart": [], "kpis": {}, "tabla": []}, 200
 			
-			# Manejar total_votos que puede ser "NA"
-			total_votos_val = 0
-			if kpi_row is not None:
-				tv = kpi_row["total_votos"]
-				if tv != "NA" and str(tv).strip() != "NA":
-					try:
-						total_votos_val = int(float(tv) if isinstance(tv, str) else tv)
-					except (ValueError, TypeError):
-						total_votos_val = 0
+			seat_chart = resumen.seat_chart
 			
 			# Determinar el total de escaños correcto
 			if modelo.lower() == "plan c":
@@ -555,32 +484,329 @@ def simulacion(
 			else:
 				total_seats_actual = int(magnitud_camara)
 			
-			kpis = {
-				"total_seats": total_seats_actual,
-				"gallagher": float(kpi_row["indice_gallagher"]) if kpi_row is not None else 0,
-				"mae_votos_vs_escanos": float(kpi_row["mae_votos_vs_escanos"]) if kpi_row is not None else 0,
-				"total_votos": total_votos_val,
-			}
+			kpis = {"total_seats": total_seats_actual, **resumen.kpis}
 			
 		except Exception as e:
-			import traceback
-			print(f"[ERROR] Procesando modelo {modelo}: {e}")
-			traceback.print_exc()
-			return JSONResponse(
-				content={"error": str(e)},
-				status_code=500,
-				headers={"Access-Control-Allow-Origin": "*"}
-			)
+			logger.exception('Procesando modelo %s: %s', modelo, e)
+			return {"error": str(e)}, 500
 
 	# Devuelve respuesta con seatChart y KPIs
-	return JSONResponse(
+	return {
+		"seatChart": seat_chart,
+		"kpis": kpis,
+		"tabla": seat_chart
+	}, 200
+
+
+def simular(**params):
+	"""calcular_simulacion con caché: escenarios equivalentes comparten resultado."""
+	canon = escenario_canonico(params)
+	return CACHE_ESCENARIOS.obtener_o_calcular(
+		llave_escenario(canon), lambda: calcular_simulacion(**canon)
+	)
+
+
+def precalcular_respuestas():
+	"""
+	Modelos precalculados con sus parámetros por defecto (la página de inicio):
+	se calculan una vez y se guardan como cuerpo JSON + gzip + ETag.
+	"""
+	respuestas = {}
+	for camara, anio, modelo in llaves_resumen():
+		canon = escenario_canonico(dict(anio=anio, camara=camara, modelo=modelo))
+		contenido, status_code = calcular_simulacion(**canon)
+		if status_code == 200:
+			llave = llave_escenario(canon)
+			respuestas[(llave, True)] = serializar_respuesta(contenido)
+			respuestas[(llave, False)] = serializar_respuesta(sin_tabla(contenido))
+	registrar_respuestas(respuestas)
+	logger.info('Respuestas precalculadas: %s', len(respuestas))
+
+
+def responder_serializada(respuesta, request):
+	"""
+	Cuerpo ya serializado: gzip si el cliente lo acepta y 304 si ya tiene esa
+	misma representación (cada codificación tiene su propio ETag).
+	"""
+	usa_gzip = acepta_gzip(request.headers.get("accept-encoding"))
+	etag = respuesta.etag_gzip if usa_gzip else respuesta.etag
+	headers = {"Access-Control-Allow-Origin": "*", "ETag": etag, "Vary": "Accept-Encoding"}
+	if etag_coincide(request.headers.get("if-none-match"), etag):
+		return Response(status_code=304, headers=headers)
+	if usa_gzip:
+		headers["Content-Encoding"] = "gzip"
+		return Response(content=respuesta.cuerpo_gzip, media_type="application/json", headers=headers)
+	return Response(content=respuesta.cuerpo, media_type="application/json", headers=headers)
+
+
+def _calcular_en_worker(canon, escenario_id='-'):
+	# Punto de entrada en los procesos del pool (debe ser importable); el
+	# contexto de la petición no cruza al proceso: el id de escenario se pasa
+	# y los tiempos por etapa regresan junto con el resultado
+	with contexto_escenario(escenario_id), medicion() as tiempos:
+		return calcular_simulacion(**canon), tiempos
+
+
+async def _calcular_en_pool(canon):
+	resultado, tiempos = await EJECUTOR.ejecutar(_calcular_en_worker, canon, ESCENARIO_ID.get())
+	agregar_tiempos(tiempos)
+	return resultado
+
+
+def _calcular_grupo_en_worker(anio, camara, canones, escenario_id='-'):
+	# Un grupo (anio, camara) de /simulacion/batch en un solo proceso: las
+	# reducciones del dataset (totales nacionales y por estado, ganadores MR)
+	# se calculan una vez y quedan en su MatrizVotos para todos los escenarios
+	with contexto_escenario(escenario_id), medicion() as tiempos:
+		dataset = obtener_dataset(anio, camara)
+		if dataset is not None and camara == 'diputados':
+			with etapa('datos'):
+				matriz = dataset.matriz
+				votos_cols = matriz.columnas(PARTIDOS_POR_ANIO.get(anio, PARTIDOS_POR_ANIO[2024]))
+				matriz.totales_nacionales(votos_cols)
+				matriz.totales_estado(votos_cols)
+				matriz.ganadores_mr(votos_cols)
+		return [calcular_simulacion(**canon) for canon in canones], tiempos
+
+
+async def _calcular_grupo_en_pool(anio, camara, canones):
+	resultados, tiempos = await EJECUTOR.ejecutar(
+		_calcular_grupo_en_worker, anio, camara, canones, ESCENARIO_ID.get()
+	)
+	agregar_tiempos(tiempos)
+	return resultados
+
+
+async def simular_async(**params):
+	"""
+	Versión asíncrona de simular: los modelos precalculados (consulta al
+	resumen) se responden en línea; los personalizados van al pool de procesos.
+	"""
+	canon = escenario_canonico(params)
+	if canon['modelo'] != 'personalizado':
+		return simular(**canon)
+	return await CACHE_ESCENARIOS.obtener_o_calcular_async(
+		llave_escenario(canon), lambda: _calcular_en_pool(canon)
+	)
+
+
+@app.get("/simulacion")
+async def simulacion(
+	request: Request,
+	anio: int,
+	camara: str,
+	modelo: str,
+	magnitud: int = Query(None),
+	sobrerrepresentacion: float = Query(None),
+	umbral: float = Query(None),
+	regla_electoral: str = Query(None),
+	mixto_mr_seats: int = Query(None),
+	mixto_rp_seats: int = Query(None),
+	sistema: str = Query('mixto'),
+	quota_method: str = Query('hare'),
+	divisor_method: str = Query('dhondt'),
+	max_seats_per_party: int = Query(None),
+	primera_minoria: bool = Query(True),  # Parámetro para senado
+	limite_escanos_pm: int = Query(None),  # Límite de escaños para primera minoría
+	tabla: bool = Query(True)  # False: omitir 'tabla' (copia de seatChart)
+):
+	params = dict(
+		anio=anio, camara=camara, modelo=modelo, magnitud=magnitud, sobrerrepresentacion=sobrerrepresentacion,
+		umbral=umbral, regla_electoral=regla_electoral, mixto_mr_seats=mixto_mr_seats,
+		mixto_rp_seats=mixto_rp_seats, sistema=sistema, quota_method=quota_method,
+		divisor_method=divisor_method, max_seats_per_party=max_seats_per_party,
+		primera_minoria=primera_minoria, limite_escanos_pm=limite_escanos_pm
+	)
+	if modelo.strip().lower() != 'personalizado':
+		# Modelos precalculados con parámetros por defecto: bytes listos para enviar.
+		# También aquí se revisa data/ (la recarga corre en segundo plano)
+		CACHE_ESCENARIOS.revisar_datos()
+		respuesta = obtener_respuesta((llave_escenario(escenario_canonico(params)), tabla))
+		if respuesta is not None:
+			return responder_serializada(respuesta, request)
+	contenido, status_code = await simular_async(**params)
+	return RespuestaJSON(
+		content=contenido if tabla else sin_tabla(contenido),
+		headers={"Access-Control-Allow-Origin": "*"},
+		status_code=status_code
+	)
+
+
+@app.get("/simulacion/cache")
+def simulacion_cache():
+	"""Contadores de la caché de escenarios (aciertos, fallos, desalojos...)."""
+	return RespuestaJSON(
+		content=CACHE_ESCENARIOS.estadisticas(),
+		headers={"Access-Control-Allow-Origin": "*"},
+		status_code=200
+	)
+
+
+@app.get("/simulacion/metricas")
+def simulacion_metricas():
+	"""
+	Estado de la caché y del pool de simulación (cola, en ejecución,
+	completadas) y latencias por ruta y etapa (p50/p95/p99 en ms).
+	"""
+	return RespuestaJSON(
 		content={
-			"seatChart": seat_chart,
-			"kpis": kpis,
-			"tabla": seat_chart
+			"cache": CACHE_ESCENARIOS.estadisticas(),
+			"ejecutor": EJECUTOR.estadisticas(),
+			"etapas": resumen_tiempos(),
 		},
 		headers={"Access-Control-Allow-Origin": "*"},
 		status_code=200
 	)
 
 
+class EscenarioSimulacion(BaseModel):
+	"""Mismos parámetros que GET /simulacion."""
+	anio: int
+	camara: str
+	modelo: str
+	magnitud: Optional[int] = None
+	sobrerrepresentacion: Optional[float] = None
+	umbral: Optional[float] = None
+	regla_electoral: Optional[str] = None
+	mixto_mr_seats: Optional[int] = None
+	mixto_rp_seats: Optional[int] = None
+	sistema: str = 'mixto'
+	quota_method: str = 'hare'
+	divisor_method: str = 'dhondt'
+	max_seats_per_party: Optional[int] = None
+	primera_minoria: bool = True
+	limite_escanos_pm: Optional[int] = None
+
+class SolicitudBatch(BaseModel):
+	escenarios: List[EscenarioSimulacion]
+	tabla: bool = True  # False: omitir 'tabla' en cada resultado
+
+MAX_ESCENARIOS_BATCH = 200
+
+@app.post("/simulacion/batch")
+async def simulacion_batch(solicitud: SolicitudBatch):
+	"""
+	Evalúa muchos escenarios en una sola petición. Los personalizados que no
+	están en la caché se agrupan por (anio, camara) y cada grupo va al pool
+	como una sola tarea: un proceso resuelve el dataset, calcula una vez los
+	totales nacionales y ganadores MR y evalúa ahí todos los escenarios del
+	grupo. Escenarios repetidos se calculan una vez.
+	'resultados' conserva el orden de entrada y cada elemento tiene la misma
+	forma que la respuesta de /simulacion.
+	"""
+	escenarios = solicitud.escenarios
+	if len(escenarios) > MAX_ESCENARIOS_BATCH:
+		return RespuestaJSON(
+			content={"error": f"Máximo {MAX_ESCENARIOS_BATCH} escenarios por petición"},
+			headers={"Access-Control-Allow-Origin": "*"},
+			status_code=400
+		)
+	
+	calculados = [None] * len(escenarios)
+	pendientes = {}  # llave -> (escenario canónico, índices de entrada)
+	grupos = {}      # (anio, camara) -> llaves pendientes
+	for i, escenario in enumerate(escenarios):
+		canon = escenario_canonico(escenario.model_dump())
+		if canon['modelo'] != 'personalizado':
+			calculados[i] = simular(**canon)
+			continue
+		llave = llave_escenario(canon)
+		if llave not in pendientes:
+			valor = CACHE_ESCENARIOS.obtener(llave)
+			if valor is not None:
+				calculados[i] = valor
+				continue
+			pendientes[llave] = (canon, [])
+			grupos.setdefault((canon['anio'], canon['camara']), []).append(llave)
+		pendientes[llave][1].append(i)
+	
+	# Una tarea del pool por grupo; lo calculado antes de una recarga no se guarda
+	generacion = CACHE_ESCENARIOS.generacion
+	por_grupo = await asyncio.gather(*(
+		_calcular_grupo_en_pool(anio, camara, [pendientes[llave][0] for llave in llaves])
+		for (anio, camara), llaves in grupos.items()
+	))
+	for llaves, valores in zip(grupos.values(), por_grupo):
+		for llave, valor in zip(llaves, valores):
+			if valor[1] == 200:
+				CACHE_ESCENARIOS.guardar(llave, valor, generacion)
+			for i in pendientes[llave][1]:
+				calculados[i] = valor
+	
+	resultados = []
+	for contenido, status_code in calculados:
+		if status_code != 200:
+			contenido = dict(contenido, status_code=status_code)
+		resultados.append(contenido if solicitud.tabla else sin_tabla(contenido))
+	
+	return RespuestaJSON(
+		content={"resultados": resultados},
+		headers={"Access-Control-Allow-Origin": "*"},
+		status_code=200
+	)
+
+# Qué calcula /simulacion/magnitudes (va en la respuesta para el cliente)
+REGLAS_BARRIDO = (
+	"RP nacional por método de divisores con umbral; sin MR, reparto por estado, "
+	"cuotas, topes ni límite de sobrerrepresentación: no coincide con /simulacion"
+)
+
+@app.get("/simulacion/magnitudes")
+def simulacion_magnitudes(
+	anio: int,
+	camara: str,
+	umbral: float = Query(None),
+	divisor_method: str = Query('dhondt'),
+	magnitud_min: int = Query(1),
+	magnitud_max: int = Query(700)
+):
+	"""
+	Reparto RP nacional por método de divisores para todas las magnitudes
+	de magnitud_min a magnitud_max en una sola respuesta. 'orden' es la
+	secuencia de escaños: los de la magnitud m son el conteo de cada índice
+	de partido en orden[:m], así el slider no necesita volver al servidor.
+
+	Es el reparto proporcional puro de los votos nacionales con umbral, una
+	referencia para comparar magnitudes: no aplica MR, reparto por estado,
+	cuotas, topes por partido ni límite de sobrerrepresentación, así que no
+	coincide con /simulacion para la misma magnitud ('reglas' lo indica).
+	"""
+	camara_lower = camara.lower()
+	if camara_lower not in ("diputados", "senado"):
+		return RespuestaJSON(content={"error": f"Cámara desconocida: {camara}"}, status_code=400, headers={"Access-Control-Allow-Origin": "*"})
+	if magnitud_min < 1 or magnitud_max < magnitud_min or magnitud_max > 5000:
+		return RespuestaJSON(content={"error": "Rango de magnitudes inválido (1 <= magnitud_min <= magnitud_max <= 5000)"}, status_code=400, headers={"Access-Control-Allow-Origin": "*"})
+	try:
+		partidos_base = PARTIDOS_POR_ANIO.get(anio, PARTIDOS_POR_ANIO[2024])
+		fuente_datos = obtener_dataset(anio, camara_lower) or f"data/computos_{camara_lower}_{anio}.parquet"
+		matriz = resolver_matriz(fuente_datos, camara_lower, anio=anio)
+		votos_cols = matriz.columnas(partidos_base)
+		votos = dict(zip(votos_cols, matriz.totales_nacionales(votos_cols).tolist()))
+		barrido = barrido_magnitudes(votos, magnitud_max, divisor_method=divisor_method, umbral=umbral if umbral is not None else 0.03)
+	except ValueError as e:
+		return RespuestaJSON(content={"error": str(e)}, status_code=400, headers={"Access-Control-Allow-Origin": "*"})
+	except Exception as e:
+		logger.exception('Barrido de magnitudes: %s', e)
+		return RespuestaJSON(content={"error": str(e)}, status_code=500, headers={"Access-Control-Allow-Origin": "*"})
+
+	# Escaños en magnitud_min como punto de partida del slider
+	base = [0] * len(barrido["partidos"])
+	for i in barrido["orden"][:magnitud_min]:
+		base[i] += 1
+	return RespuestaJSON(
+		content={
+			"anio": anio,
+			"camara": camara_lower,
+			"divisor_method": barrido["divisor_method"],
+			"reglas": REGLAS_BARRIDO,
+			"magnitud_min": magnitud_min,
+			"magnitud_max": magnitud_max,
+			"partidos": barrido["partidos"],
+			"colores": [PARTY_COLORS.get(p, "#888") for p in barrido["partidos"]],
+			"votos": barrido["votos"],
+			"escanos_magnitud_min": base,
+			"orden": barrido["orden"],
+		},
+		headers={"Access-Control-Allow-Origin": "*"},
+		status_code=200
+	)
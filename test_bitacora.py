@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+TEST: Bitácora (formato JSON, contexto de escenario y mensajes perezosos)
+"""
+
+import io
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+import main
+from kernel.bitacora import configurar_logging, contexto_escenario
+from kernel.cache_escenarios import escenario_canonico
+
+
+class Caro:
+    """Argumento que cuenta cuántas veces se formatea."""
+    veces = 0
+
+    def __str__(self):
+        Caro.veces += 1
+        return "caro"
+
+
+def test_json_con_escenario():
+    salida = io.StringIO()
+    try:
+        configurar_logging(nivel="INFO", formato="json", stream=salida)
+        logger = logging.getLogger("kernel.prueba")
+        with contexto_escenario("abc123"):
+            logger.info("votos: %s", {"PAN": 10})
+        logger.warning("fuera")
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("falló")
+    finally:
+        configurar_logging()
+
+    registros = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert registros[0]["mensaje"] == "votos: {'PAN': 10}"
+    assert registros[0]["escenario"] == "abc123"
+    assert registros[0]["nivel"] == "INFO" and registros[0]["logger"] == "kernel.prueba"
+    assert registros[1]["escenario"] == "-"
+    assert "ZeroDivisionError" in registros[2]["exc"]
+
+
+def test_debug_apagado_no_formatea():
+    salida = io.StringIO()
+    try:
+        configurar_logging(nivel="INFO", stream=salida)
+        Caro.veces = 0
+        logging.getLogger("kernel.prueba").debug("valor: %s", Caro())
+        assert Caro.veces == 0 and salida.getvalue() == ""
+        configurar_logging(nivel="DEBUG", stream=salida)
+        logging.getLogger("kernel.prueba").debug("valor: %s", Caro())
+        assert Caro.veces >= 1 and "valor: caro" in salida.getvalue()
+        # Reconfigurar no duplica el handler
+        assert sum(getattr(h, "_bitacora", False) for h in logging.getLogger().handlers) == 1
+    finally:
+        configurar_logging()
+
+
+def test_simulacion_sin_ruido_en_info():
+    """
+    Una simulación personalizada normal no escribe nada en nivel INFO
+    """
+    salida = io.StringIO()
+    try:
+        configurar_logging(nivel="INFO", stream=salida)
+        canon = escenario_canonico({"anio": 2021, "camara": "diputados", "modelo": "personalizado", "magnitud": 400})
+        contenido, status_code = main.calcular_simulacion(**canon)
+        assert status_code == 200 and contenido["kpis"]["total_seats"] == 400
+        assert salida.getvalue() == ""
+    finally:
+        configurar_logging()
+
+
+def test_id_de_escenario_en_respuesta():
+    with TestClient(main.app) as cliente:
+        r = cliente.get("/simulacion", params={"anio": 2024, "camara": "senado", "modelo": "vigente"},
+                        headers={"X-Request-ID": "mi-escenario"})
+        assert r.headers["x-request-id"] == "mi-escenario"
+        r = cliente.get("/simulacion", params={"anio": 2024, "camara": "senado", "modelo": "vigente"})
+        assert len(r.headers["x-request-id"]) == 12
+
+
+if __name__ == "__main__":
+    test_json_con_escenario()
+    test_debug_apagado_no_formatea()
+    test_simulacion_sin_ruido_en_info()
+    test_id_de_escenario_en_respuesta()
+    print("✅ Bitácora OK")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+TEST: Caché de escenarios canónicos
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from kernel.cache_escenarios import CacheEscenarios, escenario_canonico, llave_escenario
+
+
+def test_escenarios_equivalentes_misma_llave():
+    """
+    Porcentaje vs proporción y parámetros que no aplican dan la misma llave
+    """
+    base = dict(anio=2024, camara='diputados', modelo='personalizado', sistema='mixto', magnitud=300)
+    a = escenario_canonico(dict(base, umbral=3, sobrerrepresentacion=8))
+    b = escenario_canonico(dict(base, umbral=0.03, sobrerrepresentacion=0.08, primera_minoria=False, camara='Diputados'))
+    assert llave_escenario(a) == llave_escenario(b)
+
+    # Tope automático (60% de la magnitud) y sliders ya aplicados
+    assert a['max_seats_per_party'] == 180
+    c = escenario_canonico(dict(base, mixto_mr_seats=200))
+    d = escenario_canonico(dict(base, mixto_mr_seats=200, mixto_rp_seats=100, max_seats_per_party=180))
+    assert (c['mixto_mr_seats'], c['mixto_rp_seats']) == (200, 100)
+    assert llave_escenario(c) == llave_escenario(d)
+
+    # Modelos precalculados ignoran parámetros del personalizado
+    e = escenario_canonico(dict(anio=2018, camara='senado', modelo='Vigente', umbral=5, magnitud=96))
+    f = escenario_canonico(dict(anio=2018, camara='senado', modelo='vigente'))
+    assert llave_escenario(e) == llave_escenario(f)
+
+    # Lo que sí cambia el resultado no se mezcla
+    assert llave_escenario(escenario_canonico(dict(base, umbral=5))) != llave_escenario(a)
+
+
+def test_cache_lru_y_contadores():
+    """
+    Desalojo LRU, contadores y errores sin guardar
+    """
+    cache = CacheEscenarios(max_entradas=2)
+    calculos = []
+    calcular = lambda llave: (lambda: calculos.append(llave) or ({'llave': llave}, 200))
+
+    cache.obtener_o_calcular('a', calcular('a'))
+    cache.obtener_o_calcular('b', calcular('b'))
+    cache.obtener_o_calcular('a', calcular('a'))      # acierto, 'a' pasa a ser la más reciente
+    cache.obtener_o_calcular('c', calcular('c'))      # desaloja 'b'
+    cache.obtener_o_calcular('b', calcular('b'))      # fallo de nuevo
+    assert calculos == ['a', 'b', 'c', 'b']
+
+    cache.obtener_o_calcular('error', lambda: ({'error': 'x'}, 500))
+    cache.obtener_o_calcular('error', lambda: ({'error': 'x'}, 500))
+    stats = cache.estadisticas()
+    print(f"📊 Estadísticas: {stats}")
+    assert stats['aciertos'] == 1
+    assert stats['fallos'] == 6
+    assert stats['desalojos'] == 2
+    assert stats['entradas'] == 2
+
+
+def test_peticiones_concurrentes_se_coalescen():
+    """
+    N hilos con la misma llave: un solo cálculo, todos reciben el mismo resultado
+    """
+    cache = CacheEscenarios()
+    calculos = []
+
+    def calcular():
+        calculos.append(1)
+        time.sleep(0.2)
+        return {'seatChart': []}, 200
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener_o_calcular('preset', calcular)))
+             for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    print(f"📊 Estadísticas: {cache.estadisticas()}")
+    assert len(calculos) == 1
+    assert len(resultados) == 8
+    assert all(r is resultados[0] for r in resultados)
+    assert cache.estadisticas()['coalescidas'] == 7
+    assert cache.estadisticas()['en_curso'] == 0
+
+
+def test_cancelar_al_que_calcula_no_afecta_a_los_demas():
+    """
+    Si se cancela la petición que inició el cálculo, las coalescidas reciben
+    el resultado y este queda en la caché
+    """
+    cache = CacheEscenarios()
+    calculos = []
+
+    async def calcular():
+        calculos.append(1)
+        await asyncio.sleep(0.2)
+        return {'seatChart': []}, 200
+
+    async def escenario():
+        duena = asyncio.create_task(cache.obtener_o_calcular_async('preset', calcular))
+        await asyncio.sleep(0.01)
+        espera = asyncio.create_task(cache.obtener_o_calcular_async('preset', calcular))
+        await asyncio.sleep(0.01)
+        duena.cancel()
+        resultado = await espera
+        assert duena.cancelled()
+        return resultado
+
+    assert asyncio.run(escenario()) == ({'seatChart': []}, 200)
+    assert len(calculos) == 1
+    stats = cache.estadisticas()
+    assert stats['entradas'] == 1 and stats['en_curso'] == 0 and stats['coalescidas'] == 1
+
+
+def test_recarga_en_segundo_plano():
+    """
+    Un cambio en data/ se recarga una sola vez y fuera de la petición; hasta
+    que termina se sigue respondiendo con los datos anteriores
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        archivo = os.path.join(data_dir, 'computos.csv')
+        with open(archivo, 'w') as f:
+            f.write('a')
+        recargas = []
+        liberar = threading.Event()
+
+        def recargar():
+            recargas.append(1)
+            liberar.wait(5)
+
+        cache = CacheEscenarios(data_dir=data_dir, al_invalidar=recargar)
+        cache.obtener_o_calcular('a', lambda: ({'datos': 'viejos'}, 200))
+        with open(archivo, 'w') as f:
+            f.write('ab')
+
+        # Varios hilos revisan a la vez: una sola recarga, sin bloquear a nadie
+        cache._ultima_revision -= 10
+        inicio = time.monotonic()
+        hilos = [threading.Thread(target=cache.obtener, args=('a',)) for _ in range(8)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        assert time.monotonic() - inicio < 1
+        assert cache.obtener('a') == ({'datos': 'viejos'}, 200)
+
+        # Lo calculado antes de que termine la recarga no se guarda después
+        generacion = cache.generacion
+        liberar.set()
+        cache.esperar_recarga(5)
+        cache.guardar('b', ({'datos': 'viejos'}, 200), generacion)
+        stats = cache.estadisticas()
+        assert len(recargas) == 1
+        assert stats['invalidaciones'] == 1 and stats['entradas'] == 0
+        assert cache.obtener_o_calcular('a', lambda: ({'datos': 'nuevos'}, 200)) == ({'datos': 'nuevos'}, 200)
+
+
+def test_fallo_del_kernel_no_se_guarda():
+    """
+    Un fallo transitorio del kernel responde 500 y no queda en la caché
+    """
+    import main
+    params = dict(anio=2024, camara='diputados', modelo='personalizado', magnitud=321)
+    original = main.procesar_diputados_parquet
+
+    def falla(*args, **kwargs):
+        raise OSError("archivo a medio escribir")
+
+    main.CACHE_ESCENARIOS.limpiar()
+    main.procesar_diputados_parquet = falla
+    try:
+        contenido, status_code = main.simular(**params)
+    finally:
+        main.procesar_diputados_parquet = original
+    assert status_code == 500 and 'error' in contenido['kpis']
+    assert main.CACHE_ESCENARIOS.estadisticas()['entradas'] == 0
+
+    # Al siguiente intento se recalcula con éxito
+    contenido, status_code = main.simular(**params)
+    assert status_code == 200 and contenido['kpis']['total_seats'] == 321
+
+
+if __name__ == "__main__":
+    test_escenarios_equivalentes_misma_llave()
+    test_cache_lru_y_contadores()
+    test_peticiones_concurrentes_se_coalescen()
+    test_cancelar_al_que_calcula_no_afecta_a_los_demas()
+    test_recarga_en_segundo_plano()
+    test_fallo_del_kernel_no_se_guarda()
+    print("✅ Caché de escenarios OK")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+TEST: Registro en memoria de datasets electorales
+"""
+
+import pandas as pd
+
+from kernel.datos_electorales import cargar_registro, obtener_dataset, resolver_dataset
+from kernel.entidades import ascii_entidad
+from kernel.procesar_diputados import distribuir_votos_coaliciones
+from kernel.wrapper_tablero import procesar_diputados_tablero as procesar_diputados_parquet
+
+
+def test_registro_carga_todos_los_pares():
+    """
+    Todos los cómputos de data/ quedan precargados y normalizados
+    """
+    registro = cargar_registro()
+    print(f"📦 Datasets cargados: {sorted(registro)}")
+
+    for clave in [(2018, 'diputados'), (2021, 'diputados'), (2024, 'diputados'), (2018, 'senado'), (2024, 'senado')]:
+        assert clave in registro, f"Falta dataset {clave}"
+
+    ds = obtener_dataset(2018, 'diputados')
+    assert ds.siglado is not None
+    assert 'ENTIDAD' in ds.computos.columns
+    assert ds.computos['DISTRITO'].dtype.kind == 'i'
+    assert 'MÉXICO' in set(ds.computos['ENTIDAD'])
+
+
+def test_ruta_y_dataset_dan_mismo_resultado():
+    """
+    Pasar la ruta o el dataset precargado al kernel debe ser equivalente
+    """
+    partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","NA"]
+    parquet_path = "data/computos_diputados_2018.parquet"
+    siglado_path = "data/siglado-diputados-2018.csv"
+
+    ds = resolver_dataset(parquet_path, 'diputados', anio=2018, path_siglado=siglado_path)
+    assert resolver_dataset(parquet_path, 'diputados', anio=2018, path_siglado=siglado_path) is ds
+
+    por_ruta = procesar_diputados_parquet(
+        parquet_path, partidos_base, 2018, path_siglado=siglado_path,
+        max_seats=300, sistema='mixto', mr_seats=150, rp_seats=150, umbral=3.0
+    )
+    por_dataset = procesar_diputados_parquet(
+        ds, partidos_base, 2018,
+        max_seats=300, sistema='mixto', mr_seats=150, rp_seats=150, umbral=3.0
+    )
+    print(f"📊 Ruta: {por_ruta['tot']}")
+    print(f"📊 Dataset: {por_dataset['tot']}")
+    assert por_ruta['tot'] == por_dataset['tot']
+
+
+def test_matriz_coincide_con_groupby():
+    """
+    Las reducciones de MatrizVotos reproducen los groupby de pandas
+    """
+    ds = resolver_dataset("data/computos_diputados_2021.parquet", 'diputados', anio=2021)
+    df, matriz = ds.computos, ds.matriz
+    partidos = matriz.columnas(["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","RSP","FXM"])
+
+    assert matriz.totales_nacionales(partidos).tolist() == df[partidos].sum().astype(int).tolist()
+    por_estado = df.groupby('ENTIDAD')[partidos].sum()
+    assert list(por_estado.index) == list(matriz.entidades)
+    assert (por_estado.to_numpy() == matriz.totales_estado(partidos)).all()
+    assert matriz.distritos_por_estado().tolist() == df.groupby('ENTIDAD').size().tolist()
+
+    ganadores = df.groupby(['ENTIDAD','DISTRITO'])[partidos].sum().idxmax(axis=1).tolist()
+    assert [partidos[i] for i in matriz.ganadores_mr(partidos)] == ganadores
+
+
+def test_coaliciones_desde_siglado():
+    """
+    La matriz de coaliciones reparte la suma de la coalición según los
+    registros del siglado, igual con el DataFrame o con la matriz precargada
+    """
+    ds = resolver_dataset("data/computos_diputados_2018.parquet", 'diputados', anio=2018,
+                          path_siglado="data/siglado-diputados-2018.csv")
+    coaliciones = ds.coaliciones
+    assert coaliciones is not None
+    assert set(coaliciones.miembros('POR MEXICO AL FRENTE')) == {'PAN', 'PRD', 'MC'}
+
+    partidos_base = ["PAN","PRI","PRD","PVEM","PT","MC","MORENA","PES","NA"]
+    votos = {p: int(v) for p, v in zip(partidos_base, ds.matriz.totales_nacionales(partidos_base))}
+    por_matriz = distribuir_votos_coaliciones(dict(votos), ds.computos, coaliciones, partidos_base, 2018)
+    por_siglado = distribuir_votos_coaliciones(dict(votos), ds.computos, ds.siglado, partidos_base, 2018)
+    assert por_matriz == por_siglado
+
+    fila = coaliciones.coaliciones.index('POR MEXICO AL FRENTE')
+    suma = votos['PAN'] + votos['PRD'] + votos['MC']
+    for p in ('PAN', 'PRD', 'MC'):
+        assert por_matriz[p] == int(suma * coaliciones.pesos[fila, coaliciones.col[p]])
+
+
+def test_indice_mr_coincide_con_merge():
+    """
+    El índice (distrito, coalición) -> grupo parlamentario da el mismo MR
+    híbrido que el merge de pandas sobre (entidad_ascii, distrito, coalicion)
+    """
+    ds = resolver_dataset("data/computos_diputados_2024.parquet", 'diputados', anio=2024,
+                          path_siglado="data/siglado-diputados-2024.csv")
+    sig, matriz = ds.siglado, ds.matriz
+    partidos = matriz.columnas(["PAN","PRI","PRD","PVEM","PT","MC","MORENA"])
+
+    ganadores = ds.computos.groupby(['ENTIDAD','DISTRITO'])[partidos].sum().idxmax(axis=1)
+    coalicion = dict(zip(sig['grupo_parlamentario'], sig['coalicion']))
+    df_ganadores = pd.DataFrame({
+        'entidad_ascii': [ascii_entidad(e) for e, _ in ganadores.index],
+        'distrito': [d for _, d in ganadores.index],
+        'partido_ganador': ganadores.tolist(),
+        'coalicion': [coalicion.get(p) for p in ganadores],
+    })
+    hibrido = pd.merge(df_ganadores, sig, on=['entidad_ascii', 'distrito', 'coalicion'], how='left')
+    esperado = hibrido['grupo_parlamentario'].fillna(hibrido['partido_ganador']).value_counts().to_dict()
+
+    assert ds.indice_mr.conteo(matriz.ganadores_mr(partidos), partidos) == esperado
+    assert sum(esperado.values()) == 300
+
+
+if __name__ == "__main__":
+    test_registro_carga_todos_los_pares()
+    test_ruta_y_dataset_dan_mismo_resultado()
+    test_matriz_coincide_con_groupby()
+    test_coaliciones_desde_siglado()
+    test_indice_mr_coincide_con_merge()
+    print("✅ Registro de datasets OK")
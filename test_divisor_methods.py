@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+TEST: Motor de métodos de divisores
+"""
+
+from fastapi.testclient import TestClient
+
+import main
+from kernel.divisor_methods import asignar_divisor, dhondt_divisor, orden_asignacion
+from kernel.magnitud import barrido_magnitudes
+
+
+def test_metodos_divisores_ejemplo_clasico():
+    """
+    Ejemplo de libro: 7 escaños, cinco partidos
+    """
+    votos = {'A': 340000, 'B': 280000, 'C': 160000, 'D': 60000, 'E': 15000}
+    esperado = {
+        'dhondt': {'A': 3, 'B': 3, 'C': 1, 'D': 0, 'E': 0},
+        'sainte_lague': {'A': 3, 'B': 2, 'C': 1, 'D': 1, 'E': 0},
+        'huntington_hill': {'A': 2, 'B': 2, 'C': 1, 'D': 1, 'E': 1},
+        'adams': {'A': 2, 'B': 2, 'C': 1, 'D': 1, 'E': 1},
+    }
+    for metodo, escanos in esperado.items():
+        resultado = asignar_divisor(7, votos, metodo)
+        print(f"📊 {metodo}: {resultado}")
+        assert resultado == escanos, metodo
+    assert dhondt_divisor(7, votos) == esperado['dhondt']
+
+
+def test_divisores_desempate_y_magnitud_grande():
+    """
+    Empates deterministas y magnitudes grandes
+    """
+    # Mismo cociente: gana el de más votos; si empatan, el primero
+    assert orden_asignacion(2, {'X': 100, 'Y': 200}, 'dhondt') == ['Y', 'Y']
+    assert orden_asignacion(2, {'X': 100, 'Y': 100}, 'dhondt') == ['X', 'Y']
+
+    votos = {f"P{i}": 1000 * (i + 1) + 7 for i in range(12)}
+    for metodo in ['dhondt', 'sainte_lague', 'sainte_lague_modificado', 'danes', 'huntington_hill', 'adams']:
+        resultado = asignar_divisor(600, votos, metodo)
+        assert sum(resultado.values()) == 600, metodo
+
+
+def test_barrido_magnitudes_igual_a_asignacion_directa():
+    """
+    La secuencia de escaños reproduce la asignación de cada magnitud
+    """
+    votos = {'A': 340000, 'B': 280000, 'C': 160000, 'D': 60000, 'E': 5000}
+    for metodo in ['dhondt', 'sainte_lague', 'huntington_hill']:
+        barrido = barrido_magnitudes(votos, 60, divisor_method=metodo, umbral=3.0)
+        assert barrido['votos']['E'] == 0
+        for m in range(1, 61):
+            conteo = [barrido['orden'][:m].count(i) for i in range(len(barrido['partidos']))]
+            directo = asignar_divisor(m, barrido['votos'], metodo)
+            assert conteo == [directo[p] for p in barrido['partidos']], (metodo, m)
+
+
+def test_endpoint_magnitudes_indica_sus_reglas():
+    """
+    /simulacion/magnitudes es un reparto nacional por divisores y lo dice en la respuesta
+    """
+    with TestClient(main.app) as cliente:
+        r = cliente.get("/simulacion/magnitudes", params={"anio": 2018, "camara": "diputados", "magnitud_max": 300})
+        assert r.status_code == 200
+        datos = r.json()
+        assert "no coincide con /simulacion" in datos["reglas"]
+        assert set(datos["partidos"]) == set(main.PARTIDOS_POR_ANIO[2018])
+        escanos = {p: datos["orden"].count(i) for i, p in enumerate(datos["partidos"])}
+        print(f"📊 Barrido 2018, m=300: {escanos}")
+        assert escanos == asignar_divisor(300, datos["votos"], "dhondt")
+
+
+if __name__ == "__main__":
+    test_metodos_divisores_ejemplo_clasico()
+    test_divisores_desempate_y_magnitud_grande()
+    test_barrido_magnitudes_igual_a_asignacion_directa()
+    test_endpoint_magnitudes_indica_sus_reglas()
+    print("✅ Métodos de divisores OK")
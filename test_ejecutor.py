@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+TEST: Pool de simulación tras una recarga de data/
+"""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi.testclient import TestClient
+
+import main
+from kernel.ejecutor import EjecutorSimulaciones, generacion_worker
+
+
+def _forzar_revision():
+    main.CACHE_ESCENARIOS._ultima_revision -= 10
+    main.CACHE_ESCENARIOS.revisar_datos()
+    main.CACHE_ESCENARIOS.esperar_recarga(120)
+
+
+def test_workers_recargan_con_data():
+    """
+    Un cambio en data/ reinicia el pool: los procesos nuevos vuelven a leer
+    los datos y los escenarios personalizados se recalculan con ellos
+    """
+    params = {"anio": 2024, "camara": "senado", "modelo": "personalizado", "magnitud": 96}
+    archivo = "data/computos_senado_2024.parquet"
+    st = os.stat(archivo)
+    with TestClient(main.app) as cliente:
+        if main.EJECUTOR._pool is None:
+            return  # sin pool (SIMULACION_WORKERS=0) no hay procesos que recargar
+        antes = main.EJECUTOR.generacion
+        assert main.EJECUTOR._pool.submit(generacion_worker).result(60) == antes
+        assert cliente.get("/simulacion", params=params).status_code == 200
+        assert main.CACHE_ESCENARIOS.estadisticas()['entradas'] >= 1
+        try:
+            os.utime(archivo, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+            _forzar_revision()
+            assert main.EJECUTOR.generacion == antes + 1
+            # Los procesos del pool arrancaron después de la recarga
+            assert main.EJECUTOR._pool.submit(generacion_worker).result(60) == antes + 1
+            assert main.CACHE_ESCENARIOS.estadisticas()['entradas'] == 0
+            r = cliente.get("/simulacion", params=params)
+            assert r.status_code == 200 and r.json()['kpis']['total_seats'] == 96
+        finally:
+            os.utime(archivo, ns=(st.st_atime_ns, st.st_mtime_ns))
+            _forzar_revision()
+
+
+def test_pool_roto_se_repone():
+    """
+    Si muere un proceso del pool, las tareas siguientes corren en un pool nuevo
+    """
+    ejecutor = EjecutorSimulaciones(workers=1, concurrencia=1)
+    ejecutor.iniciar()
+    try:
+        # Sin fork: los procesos no heredan locks tomados por hilos del servidor
+        assert ejecutor._pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+        async def escenario():
+            try:
+                await ejecutor.ejecutar(os._exit, 1)
+            except BrokenProcessPool:
+                pass
+            else:
+                raise AssertionError('la tarea debía romper el pool')
+            return await ejecutor.ejecutar(generacion_worker)
+
+        assert asyncio.run(escenario()) == 0
+        stats = ejecutor.estadisticas()
+        # Se repuso al romperse y de nuevo en el reintento (que también muere)
+        assert stats['pools_rotos'] == 2 and stats['errores'] == 1 and stats['completadas'] == 2
+    finally:
+        ejecutor.detener()
+
+
+if __name__ == "__main__":
+    test_workers_recargan_con_data()
+    test_pool_roto_se_repone()
+    print("✅ Ejecutor OK")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+TEST: Catálogo único de entidades federativas
+"""
+
+import pandas as pd
+
+from kernel.entidades import ENTIDADES, id_entidad, nombre_entidad, ascii_entidad, normalizar_entidades, ids_entidades
+
+
+def test_variantes_mismo_id():
+    """
+    Acentos, nombres oficiales largos, siglas y espacios partidos llevan al mismo id
+    """
+    assert len(ENTIDADES) == 32
+    for variante in ['MÉXICO', 'Mexico', 'ESTADO DE MÉXICO', 'ESTAD O DE MEXICO', 'edomex']:
+        assert id_entidad(variante) == 15, variante
+    for variante in ['CIUDAD DE MÉXICO', 'CIUDAD D E MEXICO', 'Distrito Federal', 'CDMX']:
+        assert id_entidad(variante) == 9, variante
+    assert id_entidad('MICHOACAN DE OCAMPO') == 16
+    assert id_entidad('BAJA CALIFORNIA') != id_entidad('BAJA CALIFORNIA SUR')
+    assert id_entidad('ATLANTIS') is None
+
+    assert nombre_entidad('san luis pot osi') == 'SAN LUIS POTOSÍ'
+    assert ascii_entidad('SAN LUIS POTOSÍ') == 'SAN LUIS POTOSI'
+    assert nombre_entidad('  atlantis  ') == 'ATLANTIS'
+
+
+def test_columnas_por_valores_unicos():
+    """
+    Normalizar una columna equivale a normalizar cada valor
+    """
+    serie = pd.Series(['Nuevo Leon', 'NUEVO LEÓN', None, 'QUERE TARO', 'Nuevo Leon'])
+    assert normalizar_entidades(serie).tolist() == ['NUEVO LEÓN', 'NUEVO LEÓN', '', 'QUERÉTARO', 'NUEVO LEÓN']
+    assert normalizar_entidades(serie, ascii=True).tolist() == ['NUEVO LEON', 'NUEVO LEON', '', 'QUERETARO', 'NUEVO LEON']
+    assert ids_entidades(serie).tolist() == [19, 19, -1, 22, 19]
+
+
+if __name__ == "__main__":
+    test_variantes_mismo_id()
+    test_columnas_por_valores_unicos()
+    print("✅ Catálogo de entidades OK")
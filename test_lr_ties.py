@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+TEST: lr_ties vectorizado y su forma por lotes
+"""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from kernel.lr_ties import lr_ties, lr_ties_batch, derivar_semilla
+
+
+def test_lr_ties_desempates():
+    """
+    Residuo, luego votos totales, luego llave aleatoria reproducible
+    """
+    # Sin empates: Hare clásico
+    assert lr_ties([1000, 800, 600, 400, 200], 10).tolist() == [3, 3, 2, 1, 1]
+
+    # Mismo residuo (50): gana el de más votos totales
+    assert lr_ties([2050, 1050, 50], 4, q=1000).tolist() == [3, 1, 0]
+
+    # Empate total: decide la semilla, siempre igual para la misma semilla
+    r1 = lr_ties([1050, 1050, 900], 4, q=1000, seed=12345)
+    r2 = lr_ties([1050, 1050, 900], 4, q=1000, seed=12345)
+    print(f"📊 Empate con semilla: {r1}")
+    assert r1.tolist() == r2.tolist()
+    assert sorted(r1.tolist()[:2]) == [1, 2]
+
+    # Casos borde
+    assert lr_ties([0, 0, 0], 3).tolist() == [0, 0, 0]
+    assert lr_ties([100, 50], 0).tolist() == [0, 0]
+
+
+def test_lr_ties_batch_igual_a_filas():
+    """
+    La forma por lotes reproduce lr_ties fila por fila
+    """
+    rng = np.random.default_rng(7)
+    V = rng.integers(0, 100000, size=(32, 9))
+    n = rng.integers(1, 40, size=32)
+
+    lote = lr_ties_batch(V, n, seed=1)
+    for i in range(len(V)):
+        assert lote[i].tolist() == lr_ties(V[i], int(n[i]), seed=1).tolist()
+    assert (lote.sum(axis=1) == n).all()
+
+
+def test_batch_con_semilla_por_fila():
+    """
+    Con una semilla por fila, cada fila desempata igual que su llamada individual
+    """
+    V = np.array([[1000] * 6 + [999]] * 20)
+    semillas = [derivar_semilla(3, i) for i in range(len(V))]
+
+    lote = lr_ties_batch(V, 4, seed=semillas)
+    for i in range(len(V)):
+        assert lote[i].tolist() == lr_ties(V[i], 4, seed=semillas[i]).tolist()
+    # Los empates totales no se resuelven igual en todas las filas
+    assert len({tuple(f) for f in lote.tolist()}) > 1
+
+
+def test_desempates_sin_estado_global_y_en_hilos():
+    """
+    Mismo resultado con la misma semilla, sin tocar random/np.random y en paralelo
+    """
+    votos = [1000] * 12 + [999]
+    esperado = [lr_ties(votos, 5, seed=derivar_semilla(7, k)).tolist() for k in range(40)]
+
+    estado_random, estado_np = random.getstate(), np.random.get_state()[1].copy()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        en_hilos = list(pool.map(lambda k: lr_ties(votos, 5, seed=derivar_semilla(7, k)).tolist(), range(40)))
+    assert en_hilos == esperado
+    assert random.getstate() == estado_random
+    assert (np.random.get_state()[1] == estado_np).all()
+
+    # Flujos distintos por clave: no todos los desempates salen iguales
+    assert len({tuple(r) for r in esperado}) > 1
+    # Sin semilla explícita también es reproducible
+    assert lr_ties(votos, 5).tolist() == lr_ties(votos, 5).tolist()
+
+
+if __name__ == "__main__":
+    test_lr_ties_desempates()
+    test_lr_ties_batch_igual_a_filas()
+    test_batch_con_semilla_por_fila()
+    test_desempates_sin_estado_global_y_en_hilos()
+    print("✅ lr_ties OK")
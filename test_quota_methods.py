@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+TEST: Métodos de cuota (restos mayores) con aritmética entera
+"""
+
+import random
+from decimal import Decimal
+from fractions import Fraction
+
+import numpy as np
+from kernel.quota_methods import hare_quota, droop_quota, exact_droop_quota, largest_remainder_formula, quota_batch
+
+
+def test_cuotas_ejemplo_clasico():
+    votos = {'A': 340000, 'B': 280000, 'C': 160000, 'D': 60000, 'E': 15000}
+    total = sum(votos.values())
+    assert hare_quota(7, votos, total) == {'A': 3, 'B': 2, 'C': 1, 'D': 1, 'E': 0}
+    assert droop_quota(7, votos, total) == {'A': 3, 'B': 3, 'C': 1, 'D': 0, 'E': 0}
+    assert exact_droop_quota(7, votos, total) == {'A': 3, 'B': 3, 'C': 1, 'D': 0, 'E': 0}
+
+
+def test_empates_exactos():
+    # Restos idénticos: desempate por nombre, sin depender de redondeos
+    assert hare_quota(1, {'B': 5, 'A': 5}, 10) == {'A': 1, 'B': 0}
+    assert largest_remainder_formula(30, 2, {'Z': 10, 'Y': 10, 'X': 10}) == {'X': 1, 'Y': 1, 'Z': 0}
+    # Droop exacta que asigna de más cae a Droop
+    assert exact_droop_quota(2, {'A': 1, 'B': 1, 'C': 1}, 3) == {'A': 1, 'B': 1, 'C': 0}
+
+
+def test_votos_no_enteros():
+    # Proporciones (float, Decimal, Fraction) se aceptan como antes, con restos exactos
+    votos = {'A': 340000, 'B': 280000, 'C': 160000, 'D': 60000, 'E': 15000}
+    total = sum(votos.values())
+    proporciones = {p: v / total for p, v in votos.items()}
+    for funcion in (hare_quota, exact_droop_quota):
+        assert funcion(7, proporciones, sum(proporciones.values())) == funcion(7, votos, total)
+    assert hare_quota(3, {'A': Decimal('0.5'), 'B': Fraction(1, 3), 'C': 1 / 6}, 1) == {'A': 2, 'B': 1, 'C': 0}
+
+
+def test_lote_igual_a_diccionario():
+    rng = random.Random(11)
+    partidos = ['A', 'B', 'C', 'D', 'E', 'F']
+    votos = np.array([[rng.randint(0, 10**6) for _ in partidos] for _ in range(300)])
+    escanos = np.array([rng.randint(1, 500) for _ in range(300)])
+    for metodo, funcion in (('hare', hare_quota), ('droop', droop_quota), ('droop_exact', exact_droop_quota)):
+        lote = quota_batch(metodo, votos, escanos, votos.sum(axis=1))
+        for i in range(len(votos)):
+            esperado = funcion(int(escanos[i]), dict(zip(partidos, votos[i].tolist())), int(votos[i].sum()))
+            assert dict(zip(partidos, lote[i].tolist())) == esperado, metodo
+        assert (lote.sum(axis=1) == escanos).all(), metodo
+
+
+if __name__ == "__main__":
+    test_cuotas_ejemplo_clasico()
+    test_empates_exactos()
+    test_votos_no_enteros()
+    test_lote_igual_a_diccionario()
+    print("✅ Métodos de cuota OK")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+TEST: Resúmenes precalculados en memoria y sus respuestas serializadas
+"""
+
+import os
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import main
+from kernel.resumen import cargar_resumenes, obtener_resumen, etag_coincide, acepta_gzip
+
+
+def test_resumen_por_llave():
+    cargar_resumenes()
+    df = pd.read_parquet("data/resumen-modelos-votos-escanos-diputados.parquet")
+    filas = df[(df['anio'] == 2018) & (df['modelo'] == 'Vigente')]
+
+    resumen = obtener_resumen('Diputados', '2018', 'VIGENTE')
+    assert resumen is not None and resumen.modelo == 'vigente'
+    assert [p['party'] for p in resumen.seat_chart] == filas.loc[filas['asientos_partido'] > 0, 'partido'].tolist()
+    assert sum(p['seats'] for p in resumen.seat_chart) == 500
+    assert resumen.kpis['total_votos'] == int(filas['total_votos'].iloc[0])
+    # El senado guarda el año como texto; la llave es la misma
+    assert obtener_resumen('senado', 2018, 'plan a') is not None
+
+
+def test_resumen_inexistente():
+    assert obtener_resumen('diputados', 2018, 'mr') is None
+    assert obtener_resumen('senado', 2021, 'vigente') is None
+    assert obtener_resumen('diputados', 2018, "vigente' OR 1=1 --") is None
+
+
+def test_respuesta_precalculada_etag_y_gzip():
+    params = {"anio": 2018, "camara": "diputados", "modelo": "Vigente"}
+    with TestClient(main.app) as cliente:
+        r = cliente.get("/simulacion", params=params, headers={"Accept-Encoding": "identity"})
+        assert r.status_code == 200 and "content-encoding" not in r.headers
+        etag = r.headers["etag"]
+        # Mismo contenido que el cálculo directo
+        assert r.json() == main.calcular_simulacion(anio=2018, camara="diputados", modelo="vigente")[0]
+
+        r_gzip = cliente.get("/simulacion", params=params, headers={"Accept-Encoding": "gzip"})
+        assert r_gzip.headers["content-encoding"] == "gzip" and r_gzip.json() == r.json()
+        # Cada codificación con su propio ETag fuerte
+        etag_gzip = r_gzip.headers["etag"]
+        assert etag_gzip == etag[:-1] + '-gz"'
+
+        for encoding, propio, otro in (("identity", etag, etag_gzip), ("gzip", etag_gzip, etag)):
+            r_304 = cliente.get("/simulacion", params=params, headers={"Accept-Encoding": encoding, "If-None-Match": propio})
+            assert r_304.status_code == 304 and r_304.content == b"" and r_304.headers["etag"] == propio
+            # El ETag de la otra codificación no valida esta representación
+            r_200 = cliente.get("/simulacion", params=params, headers={"Accept-Encoding": encoding, "If-None-Match": otro})
+            assert r_200.status_code == 200 and r_200.headers["etag"] == propio
+
+        # Otra magnitud: se calcula normal, sin ETag
+        r_otra = cliente.get("/simulacion", params={**params, "magnitud": 400})
+        assert r_otra.status_code == 200 and "etag" not in r_otra.headers
+
+
+def test_respuesta_precalculada_revisa_datos():
+    """
+    El camino de respuestas precalculadas también detecta cambios en data/
+    """
+    cache = main.CACHE_ESCENARIOS
+    archivo = "data/computos_senado_2024.parquet"
+    st = os.stat(archivo)
+    recargas = []
+    original = cache.al_invalidar
+    with TestClient(main.app) as cliente:
+        cache.al_invalidar = lambda: recargas.append(1)
+        try:
+            os.utime(archivo, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+            cache._ultima_revision -= 10
+            r = cliente.get("/simulacion", params={"anio": 2018, "camara": "diputados", "modelo": "vigente"})
+            assert r.status_code == 200 and "etag" in r.headers
+            cache.esperar_recarga(30)
+            assert recargas == [1]
+        finally:
+            os.utime(archivo, ns=(st.st_atime_ns, st.st_mtime_ns))
+            cache._ultima_revision -= 10
+            cache.revisar_datos()
+            cache.esperar_recarga(30)
+            cache.al_invalidar = original
+
+
+def test_encabezados_condicionales():
+    assert etag_coincide('"abc"', '"abc"')
+    assert etag_coincide('W/"abc", "def"', '"abc"')
+    assert etag_coincide('*', '"abc"')
+    assert etag_coincide('"abc-gz"', '"abc"', '"abc-gz"')
+    assert not etag_coincide('"abd"', '"abc"') and not etag_coincide(None, '"abc"')
+    assert acepta_gzip('br, gzip;q=0.8') and acepta_gzip('*')
+    assert not acepta_gzip('gzip;q=0') and not acepta_gzip('identity') and not acepta_gzip(None)
+
+
+if __name__ == "__main__":
+    test_resumen_por_llave()
+    test_resumen_inexistente()
+    test_respuesta_precalculada_etag_y_gzip()
+    test_respuesta_precalculada_revisa_datos()
+    test_encabezados_condicionales()
+    print("✅ Resúmenes OK")
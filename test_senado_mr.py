@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+TEST: Primer y segundo lugar del Senado por matriz de membresía
+"""
+
+import pandas as pd
+
+from kernel.procesar_senado import (
+    membresia_candidaturas, primeros_lugares, determinar_coalicion_ganadora,
+    IndiceSigladoSenado, respaldos_coalicion, buscar_grupo_parlamentario,
+)
+from kernel.procesar_senadores import conteo_formulas_senado
+
+
+def test_membresia_candidaturas():
+    """
+    Cada columna de candidatura cuenta para la coalición que contiene a todos sus partidos
+    """
+    columnas = ('PAN', 'PRI', 'PRD', 'PAN_PRI_PRD', 'MORENA_PT', 'MC', 'CI')
+    contendientes, membresia = membresia_candidaturas(columnas, 2024)
+    assert contendientes == ('SIGAMOS HACIENDO HISTORIA', 'FUERZA Y CORAZON POR MEXICO', 'MC')
+    assert membresia.tolist() == [
+        [0, 0, 0, 0, 1, 0, 0],
+        [1, 1, 1, 1, 0, 0, 0],
+        [0, 0, 0, 0, 0, 1, 0],
+    ]
+
+
+def test_primeros_lugares_todas_las_entidades():
+    """
+    Ganador y segundo lugar por entidad; empates a favor del contendiente listado antes
+    """
+    df_boleta = pd.DataFrame({
+        'ENTIDAD': ['A', 'B', 'C'],
+        'PAN_PRI_PRD': [100, 10, 50],
+        'MORENA_PT_PVEM': [300, 10, 50],
+        'MC': [200, 30, 0],
+    })
+    entidades, ganadores, segundos = primeros_lugares(df_boleta, 2024)
+    assert entidades == ['A', 'B', 'C']
+    assert ganadores == ['SIGAMOS HACIENDO HISTORIA', 'MC', 'SIGAMOS HACIENDO HISTORIA']
+    assert segundos == ['MC', 'SIGAMOS HACIENDO HISTORIA', 'FUERZA Y CORAZON POR MEXICO']
+    assert determinar_coalicion_ganadora('B', df_boleta, 2024) == 'MC'
+
+
+def test_indice_siglado_senado():
+    """
+    Siglado por (entidad, coalición, fórmula) con respaldo de PARTIDO_ORIGEN y de votos
+    """
+    siglado = pd.DataFrame({
+        'ENTIDAD_ASCII': ['NUEVO LEON', 'NUEVO LEON', 'NUEVO LEON'],
+        'COALICION': ['SIGAMOS HACIENDO HISTORIA', 'SIGAMOS HACIENDO HISTORIA', 'SIGAMOS HACIENDO HISTORIA'],
+        'FORMULA': [1, 2, 1],
+        'GRUPO_PARLAMENTARIO': ['PT', '', 'MORENA'],
+        'PARTIDO_ORIGEN': ['MORENA', 'PVEM', ''],
+    })
+    df_acred = pd.DataFrame({'ENTIDAD': ['NUEVO LEÓN'], 'MORENA': [10], 'PT': [30], 'PVEM': [30], 'MC': [5]})
+    indice = IndiceSigladoSenado.desde_siglado(siglado)
+    respaldo = respaldos_coalicion(df_acred, 2024)
+
+    coalicion = 'sigamos haciendo historia'
+    assert indice.grupo('Nuevo León', coalicion, 1, respaldo, 2024) == 'PT'    # primer registro
+    assert indice.grupo('NUEVO LEON', coalicion, 2, respaldo, 2024) == 'PVEM'  # PARTIDO_ORIGEN
+    assert indice.grupo('NUEVO LEON', coalicion, 3, respaldo, 2024) == 'PT'    # más votado, empate al listado antes
+    assert indice.grupo('NUEVO LEON', 'MC', 1, respaldo, 2024) == 'MC'
+    assert indice.grupo('NUEVO LEON', 'XYZ', 1, respaldo, 2024) == ''
+    assert buscar_grupo_parlamentario('NUEVO LEON', coalicion, 3, siglado, df_acred.iloc[0], 2024) == 'PT'
+
+
+def test_conteo_formulas_senado():
+    """
+    Conteo MR (fórmulas 1-2) y PM (fórmula 1) por partido con orden de primera aparición
+    """
+    siglado = pd.DataFrame({
+        'FORMULA': pd.array([2, 1, None, 1, 2, 3], dtype='Int64'),
+        'GRUPO_PARLAMENTARIO': pd.Categorical(['PT', 'MORENA', 'PAN', 'PT', None, 'PAN']),
+    })
+    conteo = conteo_formulas_senado(siglado)
+    assert conteo['mr'].to_dict() == {'MORENA': 1, 'PAN': 0, 'PT': 2}
+    assert conteo['pm'].to_dict() == {'MORENA': 1, 'PAN': 0, 'PT': 1}
+    assert conteo.at['PT', 'primer_mr'] < conteo.at['MORENA', 'primer_mr']
+    assert conteo.at['MORENA', 'primer_pm'] < conteo.at['PT', 'primer_pm']
+
+
+if __name__ == "__main__":
+    test_membresia_candidaturas()
+    test_primeros_lugares_todas_las_entidades()
+    test_indice_siglado_senado()
+    test_conteo_formulas_senado()
+    print("✅ MR Senado OK")
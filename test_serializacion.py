@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+TEST: Serialización JSON de respuestas (tipos de NumPy y opción sin 'tabla')
+"""
+
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from kernel.serializacion import dumps, sin_tabla, _convertir
+
+
+def test_tipos_numpy():
+    contenido = {
+        "seats": np.int64(12),
+        "percent": np.float64(2.5),
+        "ok": np.bool_(True),
+        "vector": np.arange(4, dtype=np.int32),
+        "matriz": np.ones((2, 2))[:, :1],  # no contigua
+        3: "llave entera",
+    }
+    esperado = {"seats": 12, "percent": 2.5, "ok": True, "vector": [0, 1, 2, 3], "matriz": [[1.0], [1.0]], "3": "llave entera"}
+    assert json.loads(dumps(contenido)) == esperado
+    # La ruta sin orjson convierte igual
+    assert json.loads(json.dumps(contenido, default=_convertir)) == esperado
+
+
+def test_sin_tabla():
+    contenido = {"seatChart": [{"party": "A"}], "kpis": {}, "tabla": [{"party": "A"}]}
+    assert sin_tabla(contenido) == {"seatChart": [{"party": "A"}], "kpis": {}}
+    assert "tabla" in contenido
+    assert sin_tabla({"error": "x"}) == {"error": "x"}
+
+    with TestClient(main.app) as cliente:
+        for params in ({"anio": 2024, "camara": "senado", "modelo": "vigente"},
+                       {"anio": 2024, "camara": "senado", "modelo": "personalizado"}):
+            completo = cliente.get("/simulacion", params=params).json()
+            corto = cliente.get("/simulacion", params={**params, "tabla": False}).json()
+            assert "tabla" not in corto and corto["seatChart"] == completo["tabla"] == completo["seatChart"]
+        lote = cliente.post("/simulacion/batch", json={"escenarios": [params], "tabla": False}).json()
+        assert "tabla" not in lote["resultados"][0]
+
+
+if __name__ == "__main__":
+    test_tipos_numpy()
+    test_sin_tabla()
+    print("✅ Serialización OK")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+TEST: /simulacion/batch devuelve lo mismo que /simulacion escenario por escenario
+"""
+
+from fastapi.testclient import TestClient
+
+import main
+from kernel.cache_escenarios import escenario_canonico
+
+
+def test_batch_igual_a_peticiones_individuales():
+    """
+    Varios escenarios del mismo año/cámara y uno de senado en una sola petición
+    """
+    escenarios = [
+        {"anio": 2021, "camara": "diputados", "modelo": "personalizado", "sistema": "mixto"},
+        {"anio": 2021, "camara": "diputados", "modelo": "personalizado", "sistema": "rp", "umbral": 5},
+        {"anio": 2024, "camara": "senado", "modelo": "personalizado"},
+        {"anio": 2021, "camara": "diputados", "modelo": "personalizado", "sistema": "mr", "magnitud": 38,
+         "max_seats_per_party": 15, "quota_method": "droop"},
+        # Repetido (umbral en porcentaje vs proporción): se calcula una vez
+        {"anio": 2021, "camara": "diputados", "modelo": "personalizado", "sistema": "rp", "umbral": 0.05},
+        {"anio": 2018, "camara": "diputados", "modelo": "vigente"},
+    ]
+    with TestClient(main.app) as cliente:
+        # Sin caché: todo lo personalizado se calcula dentro del batch
+        main.CACHE_ESCENARIOS.limpiar()
+        completadas = main.EJECUTOR.estadisticas()["completadas"]
+        r = cliente.post("/simulacion/batch", json={"escenarios": escenarios})
+        assert r.status_code == 200
+        resultados = r.json()["resultados"]
+        assert len(resultados) == len(escenarios)
+        # Una tarea del pool por grupo (anio, camara): diputados 2021 y senado 2024
+        assert main.EJECUTOR.estadisticas()["completadas"] - completadas == 2
+
+        escanos = lambda res: sorted((p["party"], p["seats"]) for p in res["seatChart"])
+        for escenario, resultado in zip(escenarios, resultados):
+            esperado, status_code = main.calcular_simulacion(**escenario_canonico(escenario))
+            print(f"📊 {escenario}: {escanos(resultado)}")
+            assert status_code == 200
+            assert escanos(resultado) == escanos(esperado)
+            assert resultado["kpis"]["total_seats"] == esperado["kpis"]["total_seats"]
+        assert resultados[1] == resultados[4]
+
+
+if __name__ == "__main__":
+    test_batch_igual_a_peticiones_individuales()
+    print("✅ Batch OK")
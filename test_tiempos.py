@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+TEST: Tiempos por etapa (Server-Timing e histogramas de latencia)
+"""
+
+import random
+
+from fastapi.testclient import TestClient
+
+import main
+from kernel.tiempos import HistogramaLatencias, etapa, medicion, agregar_tiempos, server_timing
+
+
+def test_etapas_se_acumulan():
+    with medicion(True) as tiempos:
+        for _ in range(3):
+            with etapa('mr'):
+                pass
+        agregar_tiempos({'mr': 1.0, 'json': 0.5})
+    assert set(tiempos) == {'mr', 'json'}
+    assert 1.0 < tiempos['mr'] < 1.1 and tiempos['json'] == 0.5
+    assert server_timing({'mr': 0.00123, 'total': 0.5}) == "mr;dur=1.23, total;dur=500.00"
+
+    # Sin medición (o desactivada) etapa() no mide nada
+    with etapa('mr'):
+        pass
+    with medicion(False) as tiempos:
+        assert tiempos is None
+        with etapa('mr'):
+            pass
+        agregar_tiempos({'mr': 1.0})
+
+
+def test_percentiles_histograma():
+    rng = random.Random(3)
+    muestras = [rng.lognormvariate(-5, 1) for _ in range(20000)]
+    h = HistogramaLatencias()
+    for s in muestras:
+        h.observar(s)
+    ordenadas = sorted(muestras)
+    for q in (0.5, 0.95, 0.99):
+        exacto = ordenadas[int(q * len(ordenadas)) - 1]
+        # Límite superior del bucket: a lo más 2**(1/8) por encima del valor exacto
+        assert exacto <= h.cuantil(q) <= exacto * 2 ** 0.125
+    assert h.cuantil(1.0) == max(muestras)
+    resumen = h.resumen()
+    assert resumen['n'] == 20000 and resumen['p50_ms'] <= resumen['p95_ms'] <= resumen['p99_ms'] <= resumen['max_ms']
+
+
+def test_server_timing_y_metricas():
+    with TestClient(main.app) as cliente:
+        r = cliente.get("/simulacion", params={"anio": 2024, "camara": "diputados", "modelo": "personalizado",
+                                                "max_seats_per_party": 200, "sobrerrepresentacion": 8})
+        etapas = dict(parte.split(";dur=") for parte in r.headers["server-timing"].split(", "))
+        assert {'asignacion', 'json', 'total'} <= set(etapas)
+        assert all(float(ms) >= 0 for ms in etapas.values())
+
+        metricas = cliente.get("/simulacion/metricas").json()["etapas"]
+        assert metricas["/simulacion"]["total"]["n"] >= 1
+        assert set(metricas["/simulacion"]["total"]) == {"n", "promedio_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+
+
+if __name__ == "__main__":
+    test_etapas_se_acumulan()
+    test_percentiles_histograma()
+    test_server_timing_y_metricas()
+    print("✅ Tiempos OK")
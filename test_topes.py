@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+TEST: topes de escaños (fase de topes de asignadip_v2 y reparto de sobrantes)
+"""
+
+import io
+import random
+import contextlib
+
+import numpy as np
+from kernel.asignadip import asignadip_v2
+from kernel.topes import redistribuir_con_topes
+
+
+def test_dos_topes_vinculantes():
+    """A queda en max_seats, lo que empuja a B sobre su +8pp: ambos fijos, RP completo."""
+    votos = {'A': 450, 'B': 300, 'C': 150, 'D': 100}
+    ssd = {'A': 200, 'B': 90, 'C': 10, 'D': 0}
+    r = asignadip_v2(votos, ssd, m=200, S=500, max_pp=0.08, max_seats=200, seed=3)
+
+    assert r['tot']['A'] == 200 and r['tot']['B'] == 190
+    assert r['topes']['vinculantes'] == {'A': 'max_seats', 'B': 'max_pp'}
+    assert r['topes']['rondas'] == 2
+    assert sum(r['rp'].values()) == 200
+
+
+def test_topes_se_respetan():
+    rng = random.Random(7)
+    for _ in range(300):
+        partidos = [f'P{i}' for i in range(rng.randint(2, 8))]
+        votos = {p: rng.randint(0, 10**6) for p in partidos}
+        ssd = {p: 0 for p in partidos}
+        for _ in range(rng.choice([50, 150, 300])):
+            ssd[rng.choice(partidos)] += 1
+        r = asignadip_v2(votos, ssd, m=rng.choice([32, 100, 200]), max_pp=rng.choice([0.0, 0.08]),
+                         max_seats=rng.choice([300, 150, 60]), seed=rng.randint(0, 99))
+        limite = r['topes']['limite']
+        assert r['topes']['rondas'] <= len(partidos)
+        for p in partidos:
+            # Un partido solo rebasa su tope con sus propios triunfos MR
+            assert r['tot'][p] <= max(limite[p], ssd[p])
+            if p in r['topes']['vinculantes']:
+                assert r['rp'][p] == max(0, limite[p] - ssd[p])
+
+
+def test_redistribuir_conserva_total():
+    rng = np.random.default_rng(5)
+    escanos = rng.integers(0, 150, (2000, 8))
+    votos = rng.integers(0, 10**6, (2000, 8)) * (rng.random((2000, 8)) < 0.8)
+    topes = rng.integers(20, 120, (2000, 8))
+    r = redistribuir_con_topes(escanos, votos, topes)
+
+    recortado = np.minimum(escanos, topes)
+    cabe = recortado.sum(axis=1) + np.minimum((escanos - recortado).sum(axis=1), (topes - recortado).sum(axis=1))
+    assert (r.sum(axis=1) == cabe).all()
+    assert (r <= topes).all() and (r >= recortado).all()
+    # Todo el total se conserva cuando los topes alcanzan
+    holgado = topes.sum(axis=1) >= escanos.sum(axis=1)
+    assert (r.sum(axis=1)[holgado] == escanos.sum(axis=1)[holgado]).all()
+    # Por lotes = fila por fila
+    for i in range(0, 2000, 97):
+        assert (r[i] == redistribuir_con_topes(escanos[i], votos[i], topes[i])).all()
+
+
+def test_redistribuir_proporcional_a_votos():
+    # 10 sobrantes de B: solo C tiene votos y los recibe todos
+    assert redistribuir_con_topes([10, 50, 30, 10], [0.0, 0.5, 0.3, 0.0], 40).tolist() == [10, 40, 40, 10]
+    # Si C se llena, lo que sobra va por igual a los partidos sin votos
+    assert redistribuir_con_topes([10, 50, 30, 10], [0.0, 0.5, 0.3, 0.0], 35).tolist() == [15, 35, 35, 15]
+    # 5 sobrantes entre A, C, D en proporción 1:3:1
+    assert redistribuir_con_topes([10, 50, 30, 10], [0.1, 0.5, 0.3, 0.1], 45).tolist() == [11, 45, 33, 11]
+    # Partidos no elegibles no reciben sobrantes
+    assert redistribuir_con_topes([10, 50, 30, 10], [0.1, 0.5, 0.3, 0.1], 45, elegibles=[True, True, True, False]).tolist() == [11, 45, 34, 10]
+
+
+def test_tope_por_partido_todos_topados():
+    """Con todos los partidos en el tope el reparto termina (antes ciclaba)."""
+    from kernel.procesar_diputados import procesar_diputados_parquet
+    with contextlib.redirect_stdout(io.StringIO()):
+        r = procesar_diputados_parquet(
+            "data/computos_diputados_2018.parquet", ["PAN", "PRI", "PRD", "PVEM", "PT", "MC", "MORENA", "PES", "NA"], 2018,
+            path_siglado="data/siglado-diputados-2018.csv", max_seats=300, sistema='mixto',
+            mr_seats=150, rp_seats=150, max_seats_per_party=20
+        )
+    assert max(r['tot'].values()) == 20
+    assert all(r['tot'][p] == r['mr'][p] + r['rp'][p] for p in r['tot'])
+
+
+if __name__ == "__main__":
+    test_dos_topes_vinculantes()
+    test_topes_se_respetan()
+    test_redistribuir_conserva_total()
+    test_redistribuir_proporcional_a_votos()
+    test_tope_por_partido_todos_topados()
+    print("✅ Topes OK")